@@ -1,207 +1,105 @@
+"""Command line interface of the LeetCode manager
+
+Every subcommand imports what it needs when it runs, so read-only commands
+such as `stats` or `review-due` do not pay for the HTTP clients, NumPy or the
+crawl machinery.
+"""
 import argparse
-from leetcode.client import LeetCodeClient
-from database.db import drop_and_init_db, SessionLocal, init_db
-from database.models import Question, Solution, Attempt, DifficultyRating
-from datetime import datetime
-from tqdm import tqdm
-import asyncio
-from concurrent.futures import ProcessPoolExecutor
-from functools import partial
-from datasets import Dataset
-from itertools import islice
-import multiprocessing
-
-async def fetch_batch(client, session, skip, batch_size):
-    """Fetch a single batch of questions and their solutions"""
-    questions = client.get_questions(limit=batch_size, skip=skip)
-    batch_results = []
-    
-    for question_data in questions:
-        question = Question(
-            title=question_data['title'],
-            title_slug=question_data['titleSlug'],
-            difficulty=question_data['difficulty'],
-            frontend_id=question_data['frontendQuestionId'],
-            ac_rate=str(question_data['acRate'])
-        )
-        solutions = client.get_python_solutions(question_data['titleSlug'])
-        
-        batch_results.append({
-            'question': question,
-            'solutions': [
-                Solution(
-                    summary=sol['summary'],
-                    content=sol['content'],
-                    author_name=sol['author_name'],
-                    created_at=sol['created_at'],
-                    updated_at=sol['updated_at']
-                ) for sol in solutions
-            ]
-        })
-    
-    return batch_results
+import sys
+from config import ASYNC_MAX_IN_FLIGHT, FETCH_RATE_LIMIT, EXPORT_SHARD_ROWS, EXPORT_COMPRESSION, BULK_CHUNK_SIZE
 
-def process_batch(batch_data, storage_type='db'):
-    """Process a batch of questions in a worker process
-    Args:
-        batch_data (dict): Batch information containing start_idx and batch_size
-        storage_type (str): Storage type - 'db' for database or 'file' for file storage
-    """
-    client = LeetCodeClient()  # New client per process
-    session = None
-    batch_results = []
-    
-    try:
-        start_idx = batch_data['start_idx']
-        batch_size = batch_data['batch_size']
-        questions = client.get_questions(limit=batch_size, skip=start_idx)
-        
-        if storage_type == 'db':
-            session = SessionLocal()
-        
-        for question_data in questions:
-            question_obj = {
-                'title': question_data['title'],
-                'title_slug': question_data['titleSlug'],
-                'difficulty': question_data['difficulty'],
-                'frontend_id': question_data['frontendQuestionId'],
-                'ac_rate': str(question_data['acRate'])
-            }
-            
-            solutions = client.get_python_solutions(question_data['titleSlug'])
-            solution_objects = []
-            
-            if storage_type == 'db':
-                question = Question(**question_obj)
-                session.add(question)
-                session.flush()
-                
-                for sol in solutions:
-                    solution = Solution(
-                        question_id=question.id,
-                        summary=sol['summary'],
-                        content=sol['content'],
-                        author_name=sol['author_name'],
-                        created_at=sol['created_at'],
-                        updated_at=sol['updated_at']
-                    )
-                    session.add(solution)
-            else:
-                solution_objects = [{
-                    'summary': sol['summary'],
-                    'content': sol['content'],
-                    'author_name': sol['author_name'],
-                    'created_at': sol['created_at'],
-                    'updated_at': sol['updated_at']
-                } for sol in solutions]
-                
-                batch_results.append({
-                    'question': question_obj,
-                    'solutions': solution_objects
-                })
-        
-        if storage_type == 'db':
-            session.commit()
-        else:
-            import json
-            import os
-            
-            # Create a directory for batch files if it doesn't exist
-            os.makedirs('batch_data', exist_ok=True)
-            
-            # Save batch results to a JSON file
-            batch_file = f'batch_data/batch_{start_idx}_{start_idx + batch_size}.json'
-            with open(batch_file, 'w') as f:
-                json.dump(batch_results, f, indent=2)
-            
-        return None
-    except Exception as e:
-        print(f"Error processing batch at index {start_idx}: {str(e)}")
-        if storage_type == 'db' and session:
-            session.rollback()
-        raise Exception(f"Error processing batch at index {start_idx}: {str(e)}")
-    finally:
-        if session:
-            session.close()
+def print_json(data):
+    """Print a report as JSON for dashboards and scripts"""
+    import json
 
-def fetch_questions(client, session, total_questions, storage_type='db', batch_size=10):
-    """Fetch and store questions from LeetCode using HF datasets for parallel processing"""
-    print(f"Total available questions: {total_questions}")
-    print(f"Storage type: {storage_type}")
-    
-    # Configure batching
-    num_batches = (total_questions + batch_size - 1) // batch_size
-    
-    # Create batch data
-    batch_data = [
-        {
-            'start_idx': i * batch_size,
-            'batch_size': min(batch_size, total_questions - i * batch_size)
-        }
-        for i in range(num_batches)
-    ]
-    
-    # Create dataset and enable multiprocessing
-    dataset = Dataset.from_list(batch_data)
-    
-    # Process batches in parallel with progress bar
-    num_proc = multiprocessing.cpu_count()
-    print(f"Using {num_proc} workers")
-    
-    results = dataset.map(
-        lambda x: process_batch(x, storage_type),
-        num_proc=num_proc,
-        with_indices=False,
-        desc="Fetching questions",    
-    )
-    
-    # Calculate total fetched
-    total_fetched = sum(results)
-    print(f"\nFetched {total_fetched} questions with their solutions!")
+    print(json.dumps(data, indent=2, default=str))
 
-def show_statistics(session):
+def show_statistics(session, as_json=False):
     """Display various statistics about questions and attempts"""
-    total_questions = session.query(Question).count()
-    total_attempts = session.query(Attempt).count()
-    questions_with_solutions = session.query(Question).filter(Question.solutions.any()).count()
+    from database.stats import collect_statistics
+
+    stats = collect_statistics(session)
+    if as_json:
+        print_json(stats)
+        return
     
     print("\n=== LeetCode Statistics ===")
-    print(f"Total Questions: {total_questions}")
-    print(f"Questions with Solutions: {questions_with_solutions}")
-    print(f"Total Attempts Made: {total_attempts}")
+    print(f"Total Questions: {stats['total_questions']}")
+    print(f"Questions with Solutions: {stats['questions_with_solutions']}")
+    print(f"Total Solutions: {stats['total_solutions']}")
+    print(f"Total Attempts Made: {stats['total_attempts']}")
     
     # Difficulty breakdown
-    for difficulty in ['Easy', 'Medium', 'Hard']:
-        count = session.query(Question).filter(Question.difficulty == difficulty).count()
+    for difficulty, count in stats['questions_by_difficulty'].items():
         print(f"Total {difficulty} Questions: {count}")
     
     # Recent attempts
     print("\nRecent Attempts:")
-    recent_attempts = session.query(Attempt).order_by(Attempt.attempted_at.desc()).limit(5).all()
-    for attempt in recent_attempts:
-        question = attempt.question
-        print(f"- {question.title} ({attempt.difficulty_rating.name}) - Next review: {attempt.next_review_at}")
+    for attempt in stats['recent_attempts']:
+        print(f"- {attempt['title']} ({attempt['difficulty_rating']}) - Next review: {attempt['next_review_at']}")
     
     # Due reviews
-    due_reviews = session.query(Attempt).filter(Attempt.next_review_at <= datetime.utcnow()).count()
-    print(f"\nQuestions Due for Review: {due_reviews}")
+    print(f"\nQuestions Due for Review: {stats['due_reviews']}")
 
-def show_question_solutions(session):
+def show_question_solutions(session, as_json=False):
     """Display the number of solutions for each question"""
-    questions = session.query(Question).all()
+    from database.stats import solution_counts
+
+    counts = solution_counts(session)
+    if as_json:
+        print_json([{'title': title, 'solutions': count} for title, count in counts])
+        return
+
     print("\n=== Solutions per Question ===")
-    for question in questions:
-        solution_count = len(question.solutions)
-        print(f"{question.title}: {solution_count} solutions")
+    for title, solution_count in counts:
+        print(f"{title}: {solution_count} solutions")
+
+def search(session, query, difficulty=None, limit=20, as_json=False):
+    """Display ranked solutions matching a full-text query"""
+    import time
+    from database.search import search_solutions
+
+    start = time.perf_counter()
+    results = search_solutions(session, query, difficulty, limit)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if as_json:
+        print_json(results)
+        return
+
+    print(f"\n=== {len(results)} results for '{query}' ({elapsed_ms:.1f} ms) ===")
+    for result in results:
+        print(f"- {result['title']} ({result['difficulty']}) by {result['author_name']} [solution {result['solution_id']}]")
+        print(f"    {result['snippet']}")
 
-def load_json_to_db(session, json_dir):
-    """Load data from JSON files into database tables"""
+def iter_json_records(file_path):
+    """Yield question records from a JSONL file, or from a legacy JSON batch file"""
     import json
+    from storage.jsonl import iter_jsonl, is_jsonl
+
+    if is_jsonl(file_path):
+        yield from iter_jsonl(file_path)
+    else:
+        with open(file_path, 'r') as f:
+            yield from json.load(f)
+
+def load_json_to_db(session, json_dir, chunk_size=BULK_CHUNK_SIZE):
+    """Load data from JSONL (or legacy JSON) files into database tables
+
+    Records are streamed line by line and committed every `chunk_size`
+    questions, so memory use does not depend on file size.
+    """
     import os
+    from tqdm import tqdm
+    from database.bulk import bulk_store_questions, chunked
+    from storage.jsonl import is_jsonl
     
     try:
-        # Get all JSON files in the directory
-        json_files = [f for f in os.listdir(json_dir) if f.endswith('.json')]
+        # Get all data files in the directory, oldest first so that files
+        # written by later incremental crawls win
+        json_files = sorted(
+            (f for f in os.listdir(json_dir) if f.endswith('.json') or is_jsonl(f)),
+            key=lambda f: os.path.getmtime(os.path.join(json_dir, f))
+        )
         
         if not json_files:
             print(f"No JSON files found in {json_dir}")
@@ -213,80 +111,380 @@ def load_json_to_db(session, json_dir):
         for file_name in tqdm(json_files, desc="Processing JSON files"):
             file_path = os.path.join(json_dir, file_name)
             
-            with open(file_path, 'r') as f:
-                batch_data = json.load(f)
-                
-                for item in batch_data:
-                    # Create Question
-                    question = Question(**item['question'])
-                    session.add(question)
-                    session.flush()  # Get the question ID
-                    
-                    # Create Solutions
-                    for sol_data in item['solutions']:
-                        solution = Solution(
-                            question_id=question.id,
-                            **sol_data
-                        )
-                        session.add(solution)
-                    
-                    total_questions += 1
-                    total_solutions += len(item['solutions'])
-            
-            session.commit()
+            for chunk in chunked(iter_json_records(file_path), chunk_size):
+                questions, solutions = bulk_store_questions(session, chunk, chunk_size)
+                total_questions += questions
+                total_solutions += solutions
+                session.commit()
         
         print(f"\nSuccessfully imported {total_questions} questions and {total_solutions} solutions")
+        parse_stored_solutions(session)
         
     except Exception as e:
         print(f"Error loading JSON data: {str(e)}")
         session.rollback()
         raise
 
-def main():
-    parser = argparse.ArgumentParser(description='LeetCode Manager')
-    parser.add_argument('--init-db', action='store_true', help='Drop and initialize the database')
-    parser.add_argument('--fetch', type=int, metavar='N', help='Fetch N number of questions')
-    parser.add_argument('--storage-type', choices=['db', 'file'], default='db', help='Storage type (db or file)')
-    parser.add_argument('--stats', action='store_true', help='Show statistics')
-    parser.add_argument('--solutions', action='store_true', help='Show number of solutions per question')
-    parser.add_argument('--record-attempt', type=int, metavar='QUESTION_ID', help='Record an attempt for a question')
-    parser.add_argument('--difficulty', choices=['EASY', 'MEDIUM', 'HARD'], help='Difficulty rating for the attempt')
-    # batch size
-    parser.add_argument('--batch-size', type=int, default=1, help='Batch size for fetching questions')
-    parser.add_argument('--load-json', type=str, metavar='DIR',
-                       help='Load data from JSON files in the specified directory into database')
-    
-    args = parser.parse_args()
-    
-    client = LeetCodeClient()
-    session = SessionLocal()
+def export_dataset(session, output_dir, shard_rows=EXPORT_SHARD_ROWS, compression=EXPORT_COMPRESSION, tags=None,
+                   difficulty=None):
+    """Export the training dataset from the database as Parquet shards"""
+    from storage.export import export_parquet
+
+    rows, shards = export_parquet(session, output_dir, shard_rows, compression=compression, tags=tags,
+                                  difficulty=difficulty)
+    print(f"\nExported {rows} solutions into {len(shards)} shards under {output_dir}")
+    print(f"Load with: datasets.load_dataset('parquet', data_files='{output_dir}/*.parquet')")
+
+def check_plans():
+    """Report hot queries that no longer use their index; returns True when all do"""
+    from database.db import engine
+    from database.plans import check_query_plans
+
+    failures = check_query_plans(engine)
+    for name, index, plan in failures:
+        print(f"Query plan regression in '{name}': expected {index}")
+        for line in plan:
+            print(f"    {line}")
+    if not failures:
+        print("All hot queries use their indexes")
+    return not failures
+
+def import_reviews(session, csv_path):
+    """Schedule a CSV of graded reviews with the batch SM-2 engine and append them as attempts"""
+    import time
+    from database.scheduler import load_deck, apply_reviews, store_reviews, read_review_csv
 
-    if args.init_db:
-        print("Dropping and reinitializing database...")
-        drop_and_init_db()
+    question_ids, qualities, reviewed_at = read_review_csv(csv_path)
+    deck = load_deck(session)
 
-    if args.fetch:
-        fetch_questions(client, session, args.fetch, args.storage_type, args.batch_size)
+    start = time.perf_counter()
+    reviews = apply_reviews(deck, question_ids, qualities, reviewed_at)
+    elapsed = time.perf_counter() - start
 
-    if args.stats:
-        show_statistics(session)
+    try:
+        stored = store_reviews(session, reviews, deck)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    print(f"Scheduled {stored} reviews of {len(set(question_ids.tolist()))} questions in {elapsed * 1000:.1f} ms")
+
+def show_due_reviews(session, limit=20, as_json=False, tags=None, difficulty=None):
+    """List questions due for review, most overdue first"""
+    from database.reviews import due_reviews
 
-    if args.solutions:
-        show_question_solutions(session)
+    due = [
+        {
+            'question_id': question.id,
+            'title': question.title,
+            'difficulty': question.difficulty,
+            'next_review_at': state.next_review_at,
+            'interval': state.interval,
+            'attempts': state.attempt_count
+        }
+        for question, state in due_reviews(session, limit=limit, tags=tags, difficulty=difficulty)
+    ]
+    if as_json:
+        print_json(due)
+        return
 
-    if args.record_attempt:
-        if not args.difficulty:
-            print("Error: --difficulty is required when recording an attempt")
+    print(f"\n=== {len(due)} Questions Due for Review ===")
+    for item in due:
+        print(f"- [{item['question_id']}] {item['title']} ({item['difficulty']}) - due {item['next_review_at']}, "
+              f"interval {item['interval']} days, {item['attempts']} attempts")
+
+def review_questions(session, client, limit=None):
+    """Interactive review of due questions, most urgent first"""
+    from database.models import DifficultyRating
+    from leetcode.review_session import ReviewSession, plain_text
+
+    grades = {'e': DifficultyRating.EASY, 'm': DifficultyRating.MEDIUM, 'h': DifficultyRating.HARD}
+    with ReviewSession(session, client, limit=limit) as review:
+        total = len(review)
+        if not total:
+            print("No questions due for review")
             return
-        
-        difficulty = DifficultyRating[args.difficulty]
-        client.record_attempt(args.record_attempt, difficulty, session)
-        print(f"Recorded {args.difficulty} attempt for question {args.record_attempt}")
 
-    if args.load_json:
-        load_json_to_db(session, args.load_json)
+        try:
+            for number, card in enumerate(review, 1):
+                print(f"\n=== [{number}/{total}] {card['title']} ({card['difficulty']}) ===")
+                if card['statement']:
+                    print(plain_text(card['statement']))
+                elif card['statement_error']:
+                    print(f"(Statement unavailable: {card['statement_error']})")
+                print(f"https://leetcode.com/problems/{card['title_slug']}/")
+
+                input("\nPress Enter to show the top solution...")
+                solution = card['solution']
+                if solution:
+                    print(f"\n--- {solution['summary']} by {solution['author_name']} ---")
+                    if solution['explanation'] is not None:
+                        # Parsed by the parse stage; the code prints as is
+                        print(plain_text(solution['explanation']))
+                        print(f"\n{solution['code']}")
+                    else:
+                        print(plain_text(solution['content']))
+                else:
+                    print("No stored solution for this question")
+
+                answer = ''
+                while answer not in ('e', 'm', 'h', 's', 'q'):
+                    answer = input("\nHow did it go? [e]asy, [m]edium, [h]ard, [s]kip, [q]uit: ").strip().lower()[:1]
+                if answer == 'q':
+                    break
+                if answer == 's':
+                    continue
+                attempt = review.grade(card, grades[answer])
+                print(f"Next review: {attempt.next_review_at:%Y-%m-%d}")
+        except (EOFError, KeyboardInterrupt):
+            print()
+
+    print(f"\nReviewed {review.graded} of {total} due questions")
+
+def simulate_reviews(session, days, as_json=False):
+    """Project the daily review load, grading each review like past attempts were graded"""
+    from datetime import datetime, timedelta
+    from database.scheduler import load_deck, grade_distribution, simulate_load
+
+    deck = load_deck(session)
+    grades, probabilities = grade_distribution(session)
+    # Review times are stored in UTC, so days are UTC days
+    now = datetime.utcnow()
+    load = simulate_load(deck, days, grades, probabilities, start=now)
+
+    today = now.date()
+    projection = [{'date': today + timedelta(days=day), 'reviews': int(count)} for day, count in enumerate(load)]
+    if as_json:
+        print_json(projection)
+        return
+
+    print(f"\n=== Review load for the next {days} days ({len(deck)} questions) ===")
+    for day in projection:
+        print(f"{day['date']}: {day['reviews']}")
+    print(f"Total: {int(load.sum())}, peak: {int(load.max()) if days else 0}")
+
+def run_solution_stage(label, stage, session, num_proc=None):
+    """Run a solution stage such as parse_solutions and report its throughput"""
+    import time
+
+    start = time.perf_counter()
+    done = stage(session, num_proc)
+    elapsed = time.perf_counter() - start
+    print(f"{label} {done} new or changed solutions in {elapsed:.1f}s"
+          f"{f' ({done / elapsed:.0f} solutions/s)' if done else ''}")
+
+def parse_stored_solutions(session, num_proc=None):
+    """Split new or changed solutions into explanation and code for exports and reviews"""
+    from database.parsing import parse_solutions
+
+    run_solution_stage('Parsed', parse_solutions, session, num_proc)
+
+def verify_stored_solutions(session, num_proc=None):
+    """Run every new or changed solution's code in a sandbox and record how it went"""
+    from database.verification import verify_solutions, run_statuses
+
+    # Only parsed code can be run
+    parse_stored_solutions(session, num_proc)
+    run_solution_stage('Verified', verify_solutions, session, num_proc)
+    for status, count in sorted(run_statuses(session).items(), key=lambda item: -item[1]):
+        print(f"  {status}: {count}")
+
+def compact_database():
+    """Retrain the solution content dictionary, recompress every solution and shrink the file"""
+    import os
+    from database.db import engine
+    from database.compression import compact
+
+    def database_size():
+        # Under WAL, recent writes may still live in the -wal file
+        path = engine.url.database
+        return sum(os.path.getsize(file) for file in (path, f'{path}-wal') if os.path.exists(file))
+
+    before = database_size()
+    dict_id, rows = compact(engine)
+    if dict_id is None:
+        print("Not enough solutions to train a compression dictionary yet")
+    else:
+        print(f"Recompressed {rows} solutions with dictionary {dict_id}")
+    print(f"Database size: {before / 1e6:.1f} MB -> {database_size() / 1e6:.1f} MB")
+
+def record_attempt(session, question_id, difficulty):
+    """Record a graded attempt and advance the question's review schedule"""
+    from database.models import DifficultyRating
+    from database.reviews import record_review
+
+    attempt = record_review(session, question_id, DifficultyRating[difficulty])
+    session.commit()
+    print(f"Recorded {difficulty} attempt for question {question_id}")
+    print(f"Next review scheduled for: {attempt.next_review_at}")
+
+def response_cache(args):
+    """The ResponseCache selected by --http-cache and --offline, if any"""
+    if not args.http_cache:
+        return None
+    from leetcode.cache import ResponseCache
+
+    return ResponseCache(args.http_cache, offline=args.offline)
+
+def fetch(session, args):
+    """Run a crawl with the engine selected on the command line"""
+    file_compression = None if args.file_compression == 'none' else args.file_compression
+    if args.engine == 'async':
+        import asyncio
+        from leetcode.crawl import fetch_questions_async
+
+        asyncio.run(fetch_questions_async(args.count, args.storage_type, args.batch_size, args.max_in_flight,
+                                          rate_limit=args.rate_limit, incremental=args.incremental,
+                                          file_compression=file_compression, http_cache=response_cache(args)))
+    else:
+        from leetcode.crawl import fetch_questions
+
+        fetch_questions(session, args.count, args.storage_type, args.rate_limit, args.incremental, file_compression,
+                        response_cache(args), args.workers)
+    if args.storage_type == 'db':
+        parse_stored_solutions(session, args.workers)
 
-    session.close()
+def review(session, args):
+    """Start an interactive review session"""
+    from leetcode.client import LeetCodeClient
+
+    # The statement is a nice-to-have, so do not stall the session retrying it
+    review_questions(session, LeetCodeClient(max_retries=1, timeout=10, cache=response_cache(args)), args.limit)
+
+def drop_and_init():
+    from database.db import drop_and_init_db
+
+    print("Dropping and reinitializing database...")
+    drop_and_init_db()
+
+def migrate():
+    from database.db import init_db
+
+    init_db()
+
+def build_parser():
+    """Subcommand parser; each subcommand stores its handler in `run`, called as run(session, args)"""
+    parser = argparse.ArgumentParser(description='LeetCode Manager')
+    commands = parser.add_subparsers(dest='command', required=True, metavar='COMMAND')
+
+    json_output = argparse.ArgumentParser(add_help=False)
+    json_output.add_argument('--json', action='store_true', help='Print the results as JSON')
+    http_cache = argparse.ArgumentParser(add_help=False)
+    http_cache.add_argument('--http-cache', type=str, metavar='DIR',
+                            help='Cache GraphQL responses on disk in DIR and reuse them until their TTL expires')
+    http_cache.add_argument('--offline', action='store_true',
+                            help='Replay responses from --http-cache only, never contacting LeetCode')
+    question_filter = argparse.ArgumentParser(add_help=False)
+    question_filter.add_argument('--tag', action='append', dest='tags', metavar='SLUG',
+                                 help='Only questions with this topic tag, e.g. graph; repeat to allow several')
+    question_filter.add_argument('--question-difficulty', choices=['Easy', 'Medium', 'Hard'],
+                                 help='Only questions of this difficulty')
+
+    command = commands.add_parser('init-db', help='Drop and initialize the database')
+    command.set_defaults(run=lambda session, args: drop_and_init())
+    command = commands.add_parser('migrate', help='Apply pending schema migrations to the database')
+    command.set_defaults(run=lambda session, args: migrate())
+    command = commands.add_parser('check-plans',
+                                  help='Verify that hot queries use their indexes (exits non-zero on regressions)')
+    command.set_defaults(run=lambda session, args: check_plans())
+    command = commands.add_parser('compact',
+                                  help='Retrain the solution compression dictionary, recompress solutions and vacuum')
+    command.set_defaults(run=lambda session, args: compact_database())
+
+    command = commands.add_parser('fetch', parents=[http_cache], help='Fetch questions and their Python solutions')
+    command.add_argument('count', type=int, nargs='?', metavar='N',
+                         help='Number of catalog questions to fetch (default: the whole catalog)')
+    command.add_argument('--storage-type', choices=['db', 'file'], default='db', help='Storage type (db or file)')
+    command.add_argument('--file-compression', choices=['none', 'gzip', 'zstd'], default='none',
+                         help='Compression for the JSONL files written by --storage-type file')
+    command.add_argument('--batch-size', type=int, default=1, help='Questions per commit with the async engine')
+    command.add_argument('--workers', type=int, help='Worker processes for the sync engine (default: one per CPU)')
+    command.add_argument('--engine', choices=['sync', 'async'], default='sync',
+                         help='Fetch engine: sync (worker processes) or async (single process, concurrent requests)')
+    command.add_argument('--max-in-flight', type=int, default=ASYNC_MAX_IN_FLIGHT,
+                         help='Maximum concurrent requests for the async engine')
+    command.add_argument('--incremental', action='store_true',
+                         help='Revisit fetched questions and only download solutions whose updatedAt changed')
+    command.add_argument('--rate-limit', type=float, default=FETCH_RATE_LIMIT, metavar='RPS',
+                         help='Requests per second across all fetch workers (0 disables)')
+    command.set_defaults(run=fetch)
+
+    command = commands.add_parser('load-json', help='Load JSONL/JSON files from a directory into the database')
+    command.add_argument('directory', metavar='DIR')
+    command.set_defaults(run=lambda session, args: load_json_to_db(session, args.directory))
+
+    command = commands.add_parser('parse', help='Split new or changed solutions into explanation text and Python code')
+    command.add_argument('--workers', type=int, help='Worker processes (default: one per CPU)')
+    command.set_defaults(run=lambda session, args: parse_stored_solutions(session, args.workers))
+
+    command = commands.add_parser('verify', help='Run the code of new or changed solutions in resource-limited sandboxes')
+    command.add_argument('--workers', type=int, help='Worker processes (default: one per CPU)')
+    command.set_defaults(run=lambda session, args: verify_stored_solutions(session, args.workers))
+
+    command = commands.add_parser('export', parents=[question_filter], help='Export questions joined with solutions as sharded Parquet files')
+    command.add_argument('directory', metavar='DIR')
+    command.add_argument('--shard-rows', type=int, default=EXPORT_SHARD_ROWS, help='Maximum rows per exported shard')
+    command.add_argument('--compression', choices=['zstd', 'snappy', 'gzip', 'none'], default=EXPORT_COMPRESSION,
+                         help='Parquet compression codec')
+    command.set_defaults(run=lambda session, args: export_dataset(session, args.directory, args.shard_rows,
+                                                                  args.compression, args.tags,
+                                                                  args.question_difficulty))
+
+    command = commands.add_parser('stats', parents=[json_output], help='Show statistics')
+    command.set_defaults(run=lambda session, args: show_statistics(session, args.json))
+    command = commands.add_parser('solutions', parents=[json_output], help='Show number of solutions per question')
+    command.set_defaults(run=lambda session, args: show_question_solutions(session, args.json))
+
+    command = commands.add_parser('search', parents=[json_output],
+                                  help='Full-text search over solution summaries and content')
+    command.add_argument('text', metavar='TEXT')
+    command.add_argument('--question-difficulty', choices=['Easy', 'Medium', 'Hard'],
+                         help='Only return questions of this difficulty')
+    command.add_argument('--limit', type=int, default=20, help='Maximum number of results')
+    command.set_defaults(run=lambda session, args: search(session, args.text, args.question_difficulty, args.limit,
+                                                          args.json))
+
+    command = commands.add_parser('record-attempt', help='Record an attempt for a question')
+    command.add_argument('question_id', type=int, metavar='QUESTION_ID')
+    command.add_argument('--difficulty', choices=['EASY', 'MEDIUM', 'HARD'], required=True,
+                         help='Difficulty rating for the attempt')
+    command.set_defaults(run=lambda session, args: record_attempt(session, args.question_id, args.difficulty))
+
+    command = commands.add_parser('import-reviews',
+                                  help='Schedule graded reviews (question_id,difficulty,reviewed_at) in one batch')
+    command.add_argument('csv_path', metavar='CSV')
+    command.set_defaults(run=lambda session, args: import_reviews(session, args.csv_path))
+
+    command = commands.add_parser('simulate', parents=[json_output], help='Project the number of reviews due per day')
+    command.add_argument('days', type=int, metavar='DAYS')
+    command.set_defaults(run=lambda session, args: simulate_reviews(session, args.days, args.json))
+
+    command = commands.add_parser('review-due', parents=[json_output, question_filter],
+                                  help='Show questions due for review')
+    command.add_argument('--limit', type=int, default=20, help='Maximum number of questions')
+    command.set_defaults(run=lambda session, args: show_due_reviews(session, args.limit, args.json, args.tags,
+                                                                    args.question_difficulty))
+
+    command = commands.add_parser('review', parents=[http_cache], help='Start a review session over the due questions')
+    command.add_argument('--limit', type=int, default=20, help='Maximum number of cards')
+    command.set_defaults(run=review)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, 'offline', False) and not args.http_cache:
+        parser.error('--offline requires --http-cache')
+
+    from database.db import SessionLocal
+
+    session = SessionLocal()
+    try:
+        # Handlers report failure by returning False
+        if args.run(session, args) is False:
+            sys.exit(1)
+    finally:
+        session.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
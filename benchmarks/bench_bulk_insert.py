@@ -0,0 +1,79 @@
+"""Rows/sec of per-row ORM inserts versus bulk_store_questions
+
+    python -m benchmarks.bench_bulk_insert --questions 5000 --solutions 15
+"""
+import argparse
+import os
+import tempfile
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database.models import Base, Question, Solution
+from database.bulk import bulk_store_questions
+
+
+def synthetic_records(num_questions, solutions_per_question):
+    for q in range(num_questions):
+        yield {
+            'question': {
+                'title': f'Question {q}',
+                'title_slug': f'question-{q}',
+                'difficulty': ['Easy', 'Medium', 'Hard'][q % 3],
+                'frontend_id': str(q + 1),
+                'ac_rate': '50.0'
+            },
+            'solutions': [{
+                'topic_id': str(q * 1000 + s),
+                'summary': f'Summary {q}-{s}',
+                'content': f'Solution {q}-{s}\\n```python\\nclass Solution:\\n    pass\\n```' * 20,
+                'author_name': f'user{s}',
+                'created_at': '2024-01-01T00:00:00+00:00',
+                'updated_at': '2024-01-02T00:00:00+00:00'
+            } for s in range(solutions_per_question)]
+        }
+
+
+def store_row_by_row(session, records):
+    """The original ingestion path: add + flush per question"""
+    for record in records:
+        question = Question(**record['question'])
+        session.add(question)
+        session.flush()
+        for sol in record['solutions']:
+            session.add(Solution(question_id=question.id, **sol))
+
+
+def run(name, store, num_questions, solutions_per_question):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+
+        start = time.perf_counter()
+        store(session, synthetic_records(num_questions, solutions_per_question))
+        session.commit()
+        elapsed = time.perf_counter() - start
+
+        session.close()
+        engine.dispose()
+
+    rows = num_questions * (1 + solutions_per_question)
+    print(f"{name:>10}: {elapsed:7.2f}s  {rows / elapsed:10.0f} rows/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk ingestion benchmark')
+    parser.add_argument('--questions', type=int, default=5000)
+    parser.add_argument('--solutions', type=int, default=15)
+    parser.add_argument('--chunk-size', type=int, default=500)
+    args = parser.parse_args()
+
+    before = run('row-by-row', store_row_by_row, args.questions, args.solutions)
+    after = run('bulk', lambda session, records: bulk_store_questions(session, records, args.chunk_size),
+                args.questions, args.solutions)
+    print(f"Speedup: {before / after:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
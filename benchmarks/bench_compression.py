@@ -0,0 +1,114 @@
+"""Database size and scan speed with plain versus compressed solution content
+
+    python -m benchmarks.bench_compression --solutions 20000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import zstandard
+from config import CONTENT_DICT_SIZE, CONTENT_DICT_SAMPLES, CONTENT_COMPRESSION_LEVEL
+
+SECTIONS = [
+    '# Intuition\\n{intuition}',
+    '# Approach\\n{approach}',
+    '# Complexity\\n- Time complexity: $$O({time})$$\\n- Space complexity: $$O({space})$$',
+    '# Code\\n```python\\nclass Solution:\\n    def {name}(self, {arg}: List[int]) -> int:\\n{body}\\n```',
+]
+IDEAS = [
+    'We keep a hash map from value to index while scanning the array once.',
+    'Two pointers start at both ends and move toward each other.',
+    'Sort the input first, then a greedy pass picks the best candidate.',
+    'A monotonic stack keeps the indices whose next greater element is unknown.',
+    'Binary search on the answer, checking feasibility in linear time.',
+    'Dynamic programming where dp[i] is the best result for the prefix ending at i.',
+    'Breadth-first search from every source at once, level by level.',
+    'A sliding window grows on the right and shrinks on the left while invalid.',
+]
+STATEMENTS = [
+    'left, right = 0, len({arg}) - 1',
+    'seen = {{}}',
+    'dp = [0] * (len({arg}) + 1)',
+    'for i, x in enumerate({arg}):',
+    '    if x in seen:',
+    '        return seen[x]',
+    'while left < right:',
+    '    mid = (left + right) // 2',
+    'stack = []',
+    'ans = max(ans, dp[i])',
+    'heapq.heappush(heap, (cost, node))',
+    'return ans',
+]
+
+
+def synthetic_content(rng):
+    """A LeetCode-style markdown write-up: repetitive structure, varying details"""
+    arg = rng.choice(['nums', 'arr', 'height', 'prices', 'grid', 'words'])
+    body = '\\n'.join('        ' + rng.choice(STATEMENTS).format(arg=arg) for _ in range(rng.randint(6, 30)))
+    return '\\n\\n'.join(section.format(
+        intuition=' '.join(rng.sample(IDEAS, 2)),
+        approach=' '.join(rng.sample(IDEAS, 3)) + f' We stop after {rng.randint(1, 10 ** 5)} steps.',
+        time=rng.choice(['n', 'n log n', 'n^2', 'n \\cdot m']),
+        space=rng.choice(['1', 'n', 'n + m']),
+        name=rng.choice(['twoSum', 'maxArea', 'maxProfit', 'numIslands', 'lengthOfLIS']),
+        arg=arg,
+        body=body,
+    ) for section in SECTIONS)
+
+
+def build(path, contents, encode):
+    connection = sqlite3.connect(path)
+    connection.execute('CREATE TABLE solutions (id INTEGER PRIMARY KEY, question_id INTEGER, content BLOB)')
+    connection.executemany(
+        'INSERT INTO solutions (question_id, content) VALUES (?, ?)',
+        ((i % 3000, encode(content)) for i, content in enumerate(contents))
+    )
+    connection.commit()
+    connection.execute('VACUUM')
+    connection.close()
+    return os.path.getsize(path)
+
+
+def scan(path):
+    """Time a COUNT/GROUP BY over solutions, the shape of the statistics queries"""
+    connection = sqlite3.connect(path)
+    start = time.perf_counter()
+    connection.execute('SELECT question_id, COUNT(*) FROM solutions GROUP BY question_id').fetchall()
+    elapsed = time.perf_counter() - start
+    connection.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Solution content compression benchmark')
+    parser.add_argument('--solutions', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    contents = [synthetic_content(rng) for _ in range(args.solutions)]
+
+    samples = [content.encode('utf-8') for content in rng.sample(contents, min(CONTENT_DICT_SAMPLES, len(contents)))]
+    dictionary = zstandard.train_dictionary(CONTENT_DICT_SIZE, samples, level=CONTENT_COMPRESSION_LEVEL)
+    untrained = zstandard.ZstdCompressor(level=CONTENT_COMPRESSION_LEVEL)
+    trained = zstandard.ZstdCompressor(level=CONTENT_COMPRESSION_LEVEL, dict_data=dictionary)
+    variants = [
+        ('plain', lambda content: content),
+        ('zstd', lambda content: untrained.compress(content.encode('utf-8'))),
+        ('zstd+dict', lambda content: trained.compress(content.encode('utf-8'))),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = None
+        for name, encode in variants:
+            path = os.path.join(tmp, f'{name}.db')
+            size = build(path, contents, encode)
+            baseline = baseline or size
+            print(f"{name:>10}: {size / 1e6:8.1f} MB  {baseline / size:5.1f}x smaller  "
+                  f"scan {scan(path) * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
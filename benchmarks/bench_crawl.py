@@ -0,0 +1,99 @@
+"""End-to-end crawl benchmark against the stand-in GraphQL server
+
+Runs fetch_questions for every combination of storage type and worker
+count, each in a fresh process with its own database, and reports
+questions/s, requests/s, server-side p50/p99 latency and peak RSS.
+
+    python -m benchmarks.bench_crawl --questions 200 --latency 0.05 --workers 1,4
+    python -m benchmarks.bench_crawl --fixtures fixtures.json.gz --throttle-rate 0.02 --error-rate 0.01
+"""
+import argparse
+import contextlib
+import itertools
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from benchmarks.fake_server import FakeLeetCodeServer, load_fixtures
+
+
+def run_crawl(results, url, num_questions, storage_type, workers, rate_limit):
+    """Crawl into a scratch directory; runs in its own process so peak RSS is per run"""
+    # A spawned process defaults its own children to spawn too; crawl workers
+    # should start the way they do from the command line
+    multiprocessing.set_start_method(multiprocessing.get_all_start_methods()[0], force=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        # The database and batch_data/ paths are relative to the working directory
+        os.chdir(tmp)
+        from leetcode.crawl import fetch_questions
+        from database.db import drop_and_init_db, SessionLocal
+
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+            drop_and_init_db()
+            session = SessionLocal()
+            start = time.perf_counter()
+            fetched = fetch_questions(session, num_questions, storage_type, rate_limit,
+                                      num_proc=workers, base_url=url)
+            elapsed = time.perf_counter() - start
+            session.close()
+
+    # ru_maxrss is in kilobytes on Linux; children covers the workers and managers
+    results.put({
+        'fetched': fetched,
+        'elapsed': elapsed,
+        'rss_main': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'rss_worker': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    })
+
+
+def parse_list(value):
+    return [int(item) for item in value.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end crawl throughput, latency and memory')
+    parser.add_argument('--questions', type=int, default=100, help='Questions to crawl per run')
+    parser.add_argument('--solutions', type=int, default=15, help='Solutions per question in the synthetic catalog')
+    parser.add_argument('--fixtures', type=str, help='Serve recorded fixtures instead of the synthetic catalog')
+    parser.add_argument('--latency', type=float, default=0.02, help='Simulated server latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with a 503')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Share of requests answered with a 429')
+    parser.add_argument('--storage-types', type=str, default='db,file', help='Comma separated storage types')
+    parser.add_argument('--workers', type=parse_list, default=[1, 4], help='Comma separated worker counts')
+    parser.add_argument('--rate-limit', type=float, default=0, help='Global requests per second (0 disables)')
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures) if args.fixtures else None
+    num_questions = min(args.questions, len(fixtures['questions'])) if fixtures else args.questions
+    # Runs must not inherit this process's memory, or the server's
+    context = multiprocessing.get_context('spawn')
+
+    print(f"{'storage':>7} {'workers':>7} {'time s':>7} {'q/s':>7} {'req/s':>7} "
+          f"{'p50 ms':>7} {'p99 ms':>7} {'429':>5} {'5xx':>5} {'main MB':>8} {'worker MB':>9}")
+    with FakeLeetCodeServer(num_questions, args.solutions, args.latency, fixtures=fixtures,
+                            error_rate=args.error_rate, throttle_rate=args.throttle_rate) as server:
+        configs = itertools.product(args.storage_types.split(','), args.workers)
+        for storage_type, workers in configs:
+            server.reset_stats()
+            # Not a Pool: its daemonic processes cannot start crawl workers
+            results = context.Queue()
+            process = context.Process(target=run_crawl, args=(results, server.url, num_questions, storage_type,
+                                                              workers, args.rate_limit))
+            process.start()
+            # The result is a few numbers, so it fits in the pipe until read
+            process.join()
+            if process.exitcode:
+                raise RuntimeError(f"Crawl with storage {storage_type} and "
+                                   f"{workers} workers exited with code {process.exitcode}")
+            result = results.get()
+            p50, p99 = server.latency_percentiles()
+            errors = sum(count for status, count in server.statuses.items() if status >= 500)
+            print(f"{storage_type:>7} {workers:>7} {result['elapsed']:7.2f} "
+                  f"{result['fetched'] / result['elapsed']:7.1f} {server.requests_served / result['elapsed']:7.1f} "
+                  f"{p50 * 1000:7.1f} {p99 * 1000:7.1f} {server.statuses.get(429, 0):>5} {errors:>5} "
+                  f"{result['rss_main']:8.0f} {result['rss_worker']:9.0f}")
+
+
+if __name__ == '__main__':
+    main()
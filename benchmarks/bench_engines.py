@@ -0,0 +1,54 @@
+"""Compare the sync and async fetch engines against the fake GraphQL server
+
+    python -m benchmarks.bench_engines --questions 20 --latency 0.05 --max-in-flight 32
+"""
+import argparse
+import asyncio
+import time
+from leetcode.client import LeetCodeClient
+from leetcode.async_client import AsyncLeetCodeClient
+from benchmarks.fake_server import FakeLeetCodeServer
+
+
+def run_sync(url, slugs):
+    client = LeetCodeClient(base_url=url)
+    for slug in slugs:
+        client.get_python_solutions(slug)
+
+
+async def run_async(url, slugs, max_in_flight):
+    async with AsyncLeetCodeClient(base_url=url, max_in_flight=max_in_flight) as client:
+        await asyncio.gather(*(client.get_python_solutions(slug) for slug in slugs))
+
+
+def report(name, elapsed, num_questions, num_requests):
+    print(f"{name:>6}: {elapsed:7.2f}s  {num_questions / elapsed:8.1f} questions/s  {num_requests / elapsed:8.1f} requests/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sync vs async fetch throughput')
+    parser.add_argument('--questions', type=int, default=20, help='Number of questions to fetch')
+    parser.add_argument('--solutions', type=int, default=15, help='Solutions per question')
+    parser.add_argument('--latency', type=float, default=0.05, help='Simulated server latency in seconds')
+    parser.add_argument('--max-in-flight', type=int, default=32, help='Async engine concurrency')
+    args = parser.parse_args()
+
+    slugs = [f'question-{i + 1}' for i in range(args.questions)]
+
+    with FakeLeetCodeServer(args.questions, args.solutions, args.latency) as server:
+        start = time.perf_counter()
+        run_sync(server.url, slugs)
+        sync_elapsed = time.perf_counter() - start
+        sync_requests = server.requests_served
+        report('sync', sync_elapsed, args.questions, sync_requests)
+
+        start = time.perf_counter()
+        asyncio.run(run_async(server.url, slugs, args.max_in_flight))
+        async_elapsed = time.perf_counter() - start
+        report('async', async_elapsed, args.questions, server.requests_served - sync_requests)
+
+    print(f"Speedup: {sync_elapsed / async_elapsed:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
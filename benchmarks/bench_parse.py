@@ -0,0 +1,74 @@
+"""Solutions/s of the markdown parse stage
+
+Parses synthetic solutions with a single-process loop over every stored
+body, then with the parse stage at each worker count, and finally times an
+incremental rerun that finds nothing to parse.
+
+    python -m benchmarks.bench_parse --solutions 20000 --workers 1,4,8
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from benchmarks.bench_compression import synthetic_content
+
+
+def parse_list(value):
+    return [int(item) for item in value.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Markdown parse stage throughput')
+    parser.add_argument('--solutions', type=int, default=20000)
+    parser.add_argument('--workers', type=parse_list, default=[1, 4], help='Comma separated worker counts')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    per_question = 10
+    records = [{
+        'question': {'title': f'Question {q}', 'title_slug': f'question-{q}', 'difficulty': 'Easy',
+                     'frontend_id': str(q + 1), 'ac_rate': '50.0'},
+        'solutions': [{'topic_id': str(q * per_question + s), 'summary': f'Summary {q}-{s}',
+                       'content': synthetic_content(rng), 'author_name': f'user{s}',
+                       'created_at': None, 'updated_at': None} for s in range(per_question)]
+    } for q in range(-(-args.solutions // per_question))]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The database path is relative to the working directory
+        os.chdir(tmp)
+        from database.db import init_db, SessionLocal
+        from database.bulk import bulk_store_questions
+        from database.models import Solution, ParsedSolution
+        from database.parsing import parse_solutions
+        from leetcode.markdown import parse_solution
+
+        init_db()
+        session = SessionLocal()
+        bulk_store_questions(session, records)
+        session.commit()
+        total = session.query(Solution).count()
+
+        start = time.perf_counter()
+        for content, in session.query(Solution.content):
+            parse_solution(content)
+        elapsed = time.perf_counter() - start
+        print(f"{'single process, not stored':>28}: {elapsed:6.2f}s  {total / elapsed:8.0f} solutions/s")
+
+        for workers in args.workers:
+            session.query(ParsedSolution).delete()
+            session.commit()
+            start = time.perf_counter()
+            parsed = parse_solutions(session, workers)
+            elapsed = time.perf_counter() - start
+            print(f"{f'{workers} workers':>28}: {elapsed:6.2f}s  {parsed / elapsed:8.0f} solutions/s")
+
+        start = time.perf_counter()
+        parsed = parse_solutions(session)
+        print(f"{'incremental, nothing new':>28}: {time.perf_counter() - start:6.2f}s  ({parsed} parsed)")
+        session.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Vectorized SM-2 scheduling versus Attempt.calculate_next_review
+
+Checks that both produce identical state for every review, exiting with
+status 1 when they do not, then times them.
+
+    python -m benchmarks.bench_scheduler --reviews 300000 --questions 3000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database.models import Base
+from database.scheduler import (
+    DeckState, apply_reviews, load_deck, review_states, schedule_scalar, simulate_load, store_reviews, synthetic_reviews
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch SM-2 scheduler benchmark')
+    parser.add_argument('--reviews', type=int, default=300000)
+    parser.add_argument('--questions', type=int, default=3000)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    question_ids, qualities, reviewed_at = synthetic_reviews(args.reviews, args.questions, args.seed)
+
+    start = time.perf_counter()
+    expected = schedule_scalar(question_ids, qualities, reviewed_at)
+    scalar = time.perf_counter() - start
+
+    deck = DeckState.empty()
+    start = time.perf_counter()
+    reviews = apply_reviews(deck, question_ids, qualities, reviewed_at)
+    vectorized = time.perf_counter() - start
+
+    mismatches = sum(1 for left, right in zip(expected, review_states(reviews)) if left != right)
+    print(f"Identical results: {mismatches == 0} ({mismatches} of {len(expected)} reviews differ)")
+    print(f"    scalar: {scalar:7.3f}s  {args.reviews / scalar:12.0f} reviews/s")
+    print(f"vectorized: {vectorized:7.3f}s  {args.reviews / vectorized:12.0f} reviews/s  "
+          f"({scalar / vectorized:.0f}x)")
+    if mismatches:
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+
+        start = time.perf_counter()
+        store_reviews(session, reviews, deck)
+        session.commit()
+        print(f"     store: {time.perf_counter() - start:7.3f}s  {args.reviews} attempts, {len(deck)} review states")
+
+        start = time.perf_counter()
+        deck = load_deck(session)
+        print(f"      load: {time.perf_counter() - start:7.3f}s  state of {len(deck)} questions")
+
+        start = time.perf_counter()
+        load = simulate_load(deck, args.days, [1, 2, 3], [0.2, 0.5, 0.3], start=datetime(2024, 1, 8))
+        print(f"  simulate: {time.perf_counter() - start:7.3f}s  {args.days} days, peak {load.max()} reviews/day")
+
+        session.close()
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
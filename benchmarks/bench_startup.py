@@ -0,0 +1,145 @@
+"""Startup time of the read-only CLI commands
+
+Runs each command against a scratch database and reports its wall time next
+to that of a bare interpreter and of a script that only uses SQLAlchemy: a
+one-table ORM round trip on an in-memory SQLite database. Every command pays
+for that much, so the budget applies on top of the SQLAlchemy floor and
+covers the models, the command's own imports and its queries.
+`-X importtime` names the slowest imports and catches modules a read-only
+command should never load. Exits non-zero when a command goes over budget
+or loads one of them.
+
+    python -m benchmarks.bench_startup --runs 10 --budget-ms 150
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+READ_ONLY_COMMANDS = [
+    ['stats'],
+    ['solutions'],
+    ['search', 'two sum'],
+    ['review-due'],
+    ['record-attempt', '1', '--difficulty', 'EASY'],
+]
+
+# What SQLAlchemy alone costs a database command: its imports, plus the
+# modules it only loads on the first ORM flush, get and query
+SQLALCHEMY_FLOOR = '''
+from sqlalchemy import Column, Integer, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+Base = declarative_base()
+
+class Row(Base):
+    __tablename__ = 'rows'
+    id = Column(Integer, primary_key=True)
+
+engine = create_engine('sqlite://')
+Base.metadata.create_all(engine)
+with Session(engine) as session:
+    session.add(Row())
+    session.commit()
+    session.get(Row, 1)
+    session.query(Row).filter(Row.id > 0).all()
+'''
+
+# Only crawls, review sessions and batch scheduling need these
+HEAVY_MODULES = {
+    'requests', 'aiohttp', 'numpy', 'datasets', 'pyarrow', 'tqdm', 'multiprocessing',
+    'leetcode.client', 'leetcode.crawl', 'leetcode.workpool',
+}
+
+
+def run_time(command, cwd):
+    start = time.perf_counter()
+    subprocess.run(command, cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def wall_time(command, cwd, runs):
+    """Median wall time of `command` in seconds"""
+    return statistics.median(run_time(command, cwd) for _ in range(runs))
+
+
+def overhead_time(command, floor, cwd, runs):
+    """Median wall time of `command` and its median overhead over `floor`, in seconds
+
+    The two alternate, so load on the machine weighs on both alike.
+    """
+    times = []
+    overheads = []
+    for _ in range(runs):
+        floor_time = run_time(floor, cwd)
+        times.append(run_time(command, cwd))
+        overheads.append(times[-1] - floor_time)
+    return statistics.median(times), statistics.median(overheads)
+
+
+def import_times(command, cwd):
+    """Cumulative import time in seconds of every module `command` loads, from -X importtime
+
+    Returns:
+        dict: module name -> (seconds, whether it was imported at top level)
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', *command], cwd=cwd, check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # Nested imports are indented below the module that triggered them
+        modules[name.strip()] = (int(cumulative) / 1e6, not name[1:].startswith(' '))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Startup time of the read-only CLI commands')
+    parser.add_argument('--runs', type=int, default=10, help='Runs per command; the median is reported')
+    parser.add_argument('--budget-ms', type=float, default=150,
+                        help='Allowed time on top of an interpreter that imports SQLAlchemy')
+    parser.add_argument('--top', type=int, default=3, help='Slowest imports listed per command')
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        # The database path is relative to the working directory
+        subprocess.run([sys.executable, APP, 'migrate'], cwd=tmp, check=True, stdout=subprocess.DEVNULL)
+        # Record an attempt up front so record-attempt finds its question's state either way
+        subprocess.run([sys.executable, APP, 'record-attempt', '1', '--difficulty', 'EASY'], cwd=tmp, check=True,
+                       stdout=subprocess.DEVNULL)
+
+        bare = wall_time([sys.executable, '-c', 'pass'], tmp, args.runs)
+        print(f"{'bare interpreter':>32}: {bare * 1000:7.1f} ms")
+        floor = [sys.executable, '-c', SQLALCHEMY_FLOOR]
+        floor_time = wall_time(floor, tmp, args.runs)
+        print(f"{'SQLAlchemy floor':>32}: {floor_time * 1000:7.1f} ms  (+{(floor_time - bare) * 1000:.1f} ms)")
+        for command in READ_ONLY_COMMANDS:
+            elapsed, overhead = overhead_time([sys.executable, APP, *command], floor, tmp, args.runs)
+            modules = import_times([APP, *command], tmp)
+            overhead *= 1000
+            heavy = sorted(HEAVY_MODULES & modules.keys())
+            over_budget = overhead > args.budget_ms
+            failed = failed or over_budget or bool(heavy)
+
+            print(f"{' '.join(command):>32}: {elapsed * 1000:7.1f} ms  (+{overhead:.1f} ms"
+                  f"{', over budget' if over_budget else ''})")
+            # Nested imports are already part of the cumulative time of their parent
+            top = sorted(((seconds, name) for name, (seconds, top_level) in modules.items() if top_level), reverse=True)
+            for seconds, name in top[:args.top]:
+                print(f"{'':>34}{name} {seconds * 1000:.1f} ms")
+            if heavy:
+                print(f"{'':>34}loads {', '.join(heavy)}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+"""Local stand-in for the LeetCode GraphQL endpoint
+
+Serves question lists, solution lists and solution details so the fetch
+engines can be exercised without touching leetcode.com. Responses come from
+a fixture catalog, either synthetic or recorded from the real site with
+
+    python -m benchmarks.fake_server --record 200 --output fixtures.json.gz
+
+and the server can inject latency, 5xx errors and 429 throttling.
+"""
+import argparse
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import numpy as np
+
+
+def make_question(index):
+    return {
+        'acRate': 50.0 + index % 40,
+        'difficulty': ['Easy', 'Medium', 'Hard'][index % 3],
+        'freqBar': None,
+        'frontendQuestionId': str(index + 1),
+        'isFavor': False,
+        'paidOnly': False,
+        'status': None,
+        'title': f'Question {index + 1}',
+        'titleSlug': f'question-{index + 1}',
+        'topicTags': [{'name': 'Array', 'id': '1', 'slug': 'array'}],
+        'hasSolution': True,
+        'hasVideoSolution': False
+    }
+
+
+def make_solution(topic_id):
+    return {
+        'topicId': topic_id,
+        'title': f'Solution {topic_id}',
+        'summary': f'Summary for solution {topic_id}',
+        'content': f'Approach for {topic_id}\\n```python\\nclass Solution:\\n    def solve(self):\\n        return {topic_id}\\n```',
+        'author': {'userName': f'user{topic_id % 97}'},
+        'createdAt': '2024-01-01T00:00:00+00:00',
+        'updatedAt': '2024-01-02T00:00:00+00:00'
+    }
+
+
+def synthetic_fixtures(num_questions, solutions_per_question):
+    """Catalog of generated questions, each with `solutions_per_question` solutions"""
+    questions = [make_question(i) for i in range(num_questions)]
+    solutions = {}
+    articles = {}
+    for i, question in enumerate(questions):
+        topic_ids = [(i + 1) * 1000 + j for j in range(solutions_per_question)]
+        solutions[question['titleSlug']] = [
+            {'topicId': topic_id, 'updatedAt': '2024-01-02T00:00:00+00:00'} for topic_id in topic_ids
+        ]
+        articles.update((str(topic_id), make_solution(topic_id)) for topic_id in topic_ids)
+    return {'questions': questions, 'solutions': solutions, 'articles': articles}
+
+
+def record_fixtures(client, num_questions, first=15):
+    """Record a catalog from a live endpoint through `client`, a LeetCodeClient
+
+    Keeps the raw GraphQL payloads, so the stand-in answers exactly what the
+    real site answered.
+    """
+    from leetcode.client import solution_details_request, SOLUTION_DETAIL_BATCH_SIZE
+
+    questions = []
+    for skip in range(0, num_questions, 100):
+        questions.extend(client.get_questions(limit=min(100, num_questions - skip), skip=skip))
+    solutions = {}
+    articles = {}
+    for question in questions:
+        nodes = client.list_python_solutions(question['titleSlug'], first=first)
+        solutions[question['titleSlug']] = nodes
+        topic_ids = [node['topicId'] for node in nodes]
+        for start in range(0, len(topic_ids), SOLUTION_DETAIL_BATCH_SIZE):
+            chunk = topic_ids[start:start + SOLUTION_DETAIL_BATCH_SIZE]
+            data = client.execute_query(*solution_details_request(chunk)).get('data') or {}
+            articles.update((str(topic_id), data[f'detail{i}']) for i, topic_id in enumerate(chunk) if data.get(f'detail{i}'))
+    return {'questions': questions, 'solutions': solutions, 'articles': articles}
+
+
+def _open_fixture(path, mode):
+    return gzip.open(path, mode) if path.endswith('.gz') else open(path, mode)
+
+
+def save_fixtures(fixtures, path):
+    with _open_fixture(path, 'wt') as f:
+        json.dump(fixtures, f)
+
+
+def load_fixtures(path):
+    with _open_fixture(path, 'rt') as f:
+        return json.load(f)
+
+
+# Matches the aliased detail fields built by build_solution_details_query
+DETAIL_ALIAS = re.compile(r'(\w+):\s*ugcArticleSolutionArticle\(topicId:\s*\$(\w+)\)')
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class FakeLeetCodeServer:
+    """Threaded HTTP server answering the GraphQL queries used by the clients
+
+    Args:
+        num_questions: Size of the synthetic catalog
+        solutions_per_question: Solutions per question in the synthetic catalog
+        latency: Seconds to sleep before answering each request
+        fixtures: Catalog to serve instead of the synthetic one, as returned
+            by load_fixtures or record_fixtures
+        error_rate: Share of requests answered with a 503
+        throttle_rate: Share of requests answered with a 429
+        retry_after: Retry-After seconds sent with every 429
+        seed: Seed of the fault injection
+    """
+
+    def __init__(self, num_questions=100, solutions_per_question=15, latency=0.0, host='127.0.0.1', port=0,
+                 fixtures=None, error_rate=0.0, throttle_rate=0.0, retry_after=0.1, seed=0):
+        self.fixtures = fixtures or synthetic_fixtures(num_questions, solutions_per_question)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.requests_served = 0
+        self.statuses = {}
+        self.latencies = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/graphql'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests_served = 0
+            self.statuses = {}
+            self.latencies = []
+
+    def latency_percentiles(self, percentiles=(50, 99)):
+        """Seconds from reading a request to sending its response"""
+        with self._lock:
+            latencies = np.array(self.latencies)
+        if not len(latencies):
+            return [0.0] * len(percentiles)
+        return np.percentile(latencies, percentiles).tolist()
+
+    def fault(self):
+        """Status code to inject for the next request, None to answer it"""
+        with self._lock:
+            draw = self._random.random()
+        if draw < self.throttle_rate:
+            return 429
+        if draw < self.throttle_rate + self.error_rate:
+            return 503
+        return None
+
+    def answer(self, query, variables):
+        """Build the GraphQL response body for a query"""
+        variables = variables or {}
+        if 'problemsetQuestionList' in query:
+            skip = variables.get('skip', 0)
+            limit = variables.get('limit', 50)
+            questions = self.fixtures['questions']
+            return {'data': {'problemsetQuestionList': {
+                'total': len(questions),
+                'questions': questions[skip:skip + limit]
+            }}}
+        if 'ugcArticleSolutionArticles' in query:
+            nodes = self.fixtures['solutions'].get(variables['questionSlug'], [])
+            skip = variables.get('skip', 0)
+            first = variables.get('first', 15)
+            return {'data': {'ugcArticleSolutionArticles': {
+                'totalNum': len(nodes),
+                'pageInfo': {'hasNextPage': skip + first < len(nodes)},
+                'edges': [{'node': node} for node in nodes[skip:skip + first]]
+            }}}
+        articles = self.fixtures['articles']
+        aliases = DETAIL_ALIAS.findall(query)
+        if aliases:
+            return {'data': {
+                alias: articles.get(str(variables[variable])) for alias, variable in aliases
+            }}
+        if 'ugcArticleSolutionArticle' in query:
+            return {'data': {'ugcArticleSolutionArticle': articles.get(str(variables['topicId']))}}
+        return {'errors': [{'message': 'Unknown query'}]}
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; without this,
+            # keep-alive clients stall on delayed ACKs
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                started = time.perf_counter()
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                if server.latency:
+                    time.sleep(server.latency)
+
+                status = server.fault() or 200
+                if status == 200:
+                    body = json.dumps(server.answer(payload.get('query', ''), payload.get('variables'))).encode()
+                else:
+                    body = json.dumps({'errors': [{'message': 'Injected fault'}]}).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                if status == 429:
+                    self.send_header('Retry-After', str(server.retry_after))
+                self.end_headers()
+                self.wfile.write(body)
+
+                with server._lock:
+                    server.requests_served += 1
+                    server.statuses[status] = server.statuses.get(status, 0) + 1
+                    server.latencies.append(time.perf_counter() - started)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record fixtures for the stand-in server from leetcode.com')
+    parser.add_argument('--record', type=int, required=True, metavar='N', help='Number of questions to record')
+    parser.add_argument('--solutions', type=int, default=15, help='Solutions recorded per question')
+    parser.add_argument('--output', type=str, default='fixtures.json.gz', help='Fixture file, gzipped if it ends in .gz')
+    args = parser.parse_args()
+
+    from leetcode.client import LeetCodeClient
+
+    fixtures = record_fixtures(LeetCodeClient(), args.record, args.solutions)
+    save_fixtures(fixtures, args.output)
+    print(f"Recorded {len(fixtures['questions'])} questions and {len(fixtures['articles'])} solutions to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
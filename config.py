@@ -18,4 +18,87 @@ DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
     "Cookie": f"LEETCODE_SESSION={LEETCODE_SESSION_TOKEN}; csrftoken={CSRF_TOKEN}",
     "x-csrftoken": CSRF_TOKEN
-}
\ No newline at end of file
+}
+
+# Async fetch engine
+ASYNC_MAX_IN_FLIGHT = 16
+
+# HTTP connection pooling and retries
+HTTP_POOL_SIZE = 16
+HTTP_TIMEOUT = 30
+HTTP_MAX_RETRIES = 5
+HTTP_BACKOFF_BASE = 0.5  # Seconds, doubled on every retry
+HTTP_BACKOFF_MAX = 30.0
+HTTP_RETRY_AFTER_MAX = 120.0  # Longest Retry-After honored, in seconds
+
+# Global request budget shared by all fetch workers (requests/second, 0 disables)
+FETCH_RATE_LIMIT = 20
+
+# Solution details fetched per aliased GraphQL request
+SOLUTION_DETAIL_BATCH_SIZE = 15
+
+# Rows per executemany batch for bulk ingestion
+BULK_CHUNK_SIZE = 500
+
+# SQLite tuning applied to every connection by database/db.py
+SQLITE_BUSY_TIMEOUT_MS = 30000
+
+# Single writer used by parallel crawls: records per transaction, seconds
+# before a partial transaction is flushed, and queue capacity (backpressure)
+WRITER_COMMIT_EVERY = 200
+WRITER_FLUSH_INTERVAL = 2.0
+WRITER_QUEUE_SIZE = 1000
+
+# Markdown parse stage: solutions per task handed to a parse worker
+PARSE_CHUNK_SIZE = 500
+
+# Solution verifier: limits of every sandboxed run (CPU seconds, address
+# space bytes, wall-clock seconds) and solutions per worker task
+VERIFY_CPU_SECONDS = 2
+VERIFY_MEMORY_BYTES = 256 * 1024 * 1024
+VERIFY_WALL_SECONDS = 5
+VERIFY_CHUNK_SIZE = 100
+
+# Parquet export of the training dataset
+EXPORT_SHARD_ROWS = 100000
+EXPORT_BATCH_ROWS = 5000
+EXPORT_COMPRESSION = 'zstd'
+
+# Solution deduplication: MinHash similarity at or above the threshold marks
+# a near-duplicate, over shingles of this many words
+NEAR_DUPLICATE_THRESHOLD = 0.85
+MINHASH_PERMUTATIONS = 64
+SHINGLE_SIZE = 5
+
+# Solution content is stored zstd-compressed; a dictionary of CONTENT_DICT_SIZE
+# bytes is trained from up to CONTENT_DICT_SAMPLES solutions once at least
+# CONTENT_DICT_MIN_SAMPLES exist
+CONTENT_COMPRESSION_LEVEL = 9
+CONTENT_DICT_SIZE = 112640
+CONTENT_DICT_SAMPLES = 5000
+CONTENT_DICT_MIN_SAMPLES = 200
+
+# Review sessions: cards loaded ahead in the background, and graded cards
+# per commit
+REVIEW_PREFETCH = 3
+REVIEW_COMMIT_EVERY = 10
+
+# On-disk GraphQL response cache (--http-cache): size bound, and seconds each
+# operation's responses stay fresh
+HTTP_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+HTTP_CACHE_DEFAULT_TTL = 3600
+HTTP_CACHE_TTLS = {
+    'problemsetQuestionList': 24 * 3600,
+    'ugcArticleSolutionArticles': 6 * 3600,
+    'ugcArticleSolutionArticle': 7 * 24 * 3600,
+    'ugcArticleSolutionArticleBatch': 7 * 24 * 3600,
+    'questionContent': 30 * 24 * 3600,
+}
+
+# Crawl scheduling: questions listed per catalog page, retries of a failed
+# task before it is given up, seconds before a running task gets a backup
+# copy, and tasks queued per worker
+CATALOG_PAGE_SIZE = 1000
+CRAWL_TASK_RETRIES = 3
+CRAWL_STRAGGLER_TIMEOUT = 120
+CRAWL_TASKS_PER_WORKER = 2
@@ -0,0 +1,99 @@
+from itertools import islice
+from sqlalchemy import insert, select
+from database.compression import content_codec
+from database.models import Question, Solution
+from database.tags import store_question_tags
+from leetcode.dedup import content_hash
+from config import BULK_CHUNK_SIZE
+
+SOLUTION_FIELDS = ('summary', 'content', 'author_name', 'created_at', 'updated_at')
+
+def chunked(iterable, size):
+    """Yield lists of up to `size` items from any iterable"""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+def _question_ids(session, slugs):
+    rows = session.execute(select(Question.title_slug, Question.id).where(Question.title_slug.in_(slugs)))
+    return dict(rows.all())
+
+def _solution_ids(session, topic_ids):
+    if not topic_ids:
+        return {}
+    rows = session.execute(select(Solution.topic_id, Solution.id).where(Solution.topic_id.in_(topic_ids)))
+    return dict(rows.all())
+
+def bulk_store_questions(session, records, chunk_size=BULK_CHUNK_SIZE):
+    """Insert or update questions and their solutions with executemany batches
+
+    Args:
+        session: SQLAlchemy session; the caller commits
+        records: Iterable of {'question': {...}, 'solutions': [...]} dicts, the
+            same shape written to batch_data/ in file storage mode
+        chunk_size: Questions handled per round trip
+
+    Questions are matched on title_slug and solutions on topic_id, like the
+    per-row upsert this replaces. Ids of new questions are resolved with one
+    SELECT by slug per chunk instead of a flush per question. Questions that
+    carry topic_tags get their tags replaced; records from batch files that
+    predate tags leave them alone.
+
+    Returns:
+        tuple: (questions stored, solutions stored)
+    """
+    total_questions = 0
+    total_solutions = 0
+
+    for chunk in chunked(records, chunk_size):
+        # Later records for the same slug win, as they would row by row
+        by_slug = {record['question']['title_slug']: record for record in chunk}
+
+        question_ids = _question_ids(session, list(by_slug))
+        new_questions = [record['question'] for slug, record in by_slug.items() if slug not in question_ids]
+        changed_questions = [
+            {'id': question_ids[slug], **record['question']}
+            for slug, record in by_slug.items() if slug in question_ids
+        ]
+        if new_questions:
+            session.execute(insert(Question.__table__), new_questions)
+            question_ids.update(_question_ids(session, [question['title_slug'] for question in new_questions]))
+        if changed_questions:
+            session.bulk_update_mappings(Question, changed_questions)
+        topic_tags = {
+            question_ids[slug]: record['question']['topic_tags']
+            for slug, record in by_slug.items() if record['question'].get('topic_tags') is not None
+        }
+        if topic_tags:
+            store_question_tags(session, topic_tags)
+
+        solution_rows = {}
+        untracked_rows = []
+        for slug, record in by_slug.items():
+            for sol in record['solutions']:
+                row = {field: sol[field] for field in SOLUTION_FIELDS}
+                row['question_id'] = question_ids[slug]
+                row['topic_id'] = sol.get('topic_id')
+                # Records loaded from older batch files predate the hash
+                row['content_hash'] = sol.get('content_hash') or content_hash(sol['content'])
+                row['source_hash'] = content_codec.text_hash(sol['content'])
+                if row['topic_id']:
+                    solution_rows[row['topic_id']] = row
+                else:
+                    untracked_rows.append(row)
+
+        solution_ids = _solution_ids(session, list(solution_rows))
+        new_solutions = [row for topic_id, row in solution_rows.items() if topic_id not in solution_ids] + untracked_rows
+        changed_solutions = [
+            {'id': solution_ids[topic_id], **row}
+            for topic_id, row in solution_rows.items() if topic_id in solution_ids
+        ]
+        if new_solutions:
+            session.execute(insert(Solution.__table__), new_solutions)
+        if changed_solutions:
+            session.bulk_update_mappings(Solution, changed_solutions)
+
+        total_questions += len(by_slug)
+        total_solutions += len(new_solutions) + len(changed_solutions)
+
+    return total_questions, total_solutions
@@ -0,0 +1,72 @@
+from datetime import datetime
+from database.models import CrawlCheckpoint, SolutionCheckpoint
+
+def completed_slugs(session, slugs=None):
+    """Return the set of question slugs already fetched, optionally limited to `slugs`"""
+    query = session.query(CrawlCheckpoint.title_slug)
+    if slugs is not None:
+        query = query.filter(CrawlCheckpoint.title_slug.in_(slugs))
+    return {slug for slug, in query}
+
+def known_solution_versions(session, slugs=None):
+    """Map question slug -> {topic_id: updated_at} for solutions already fetched"""
+    query = session.query(SolutionCheckpoint.title_slug, SolutionCheckpoint.topic_id, SolutionCheckpoint.updated_at)
+    if slugs is not None:
+        query = query.filter(SolutionCheckpoint.title_slug.in_(slugs))
+
+    versions = {}
+    for slug, topic_id, updated_at in query:
+        versions.setdefault(slug, {})[topic_id] = updated_at
+    return versions
+
+def known_content_hashes(session, slugs=None):
+    """Map question slug -> {content_hash: topic_id} for solutions kept by earlier crawls"""
+    query = session.query(SolutionCheckpoint.title_slug, SolutionCheckpoint.content_hash, SolutionCheckpoint.topic_id).filter(
+        SolutionCheckpoint.content_hash.isnot(None), SolutionCheckpoint.duplicate_of.is_(None)
+    )
+    if slugs is not None:
+        query = query.filter(SolutionCheckpoint.title_slug.in_(slugs))
+
+    hashes = {}
+    for slug, content_hash, topic_id in query:
+        hashes.setdefault(slug, {})[content_hash] = topic_id
+    return hashes
+
+def select_changed(nodes, versions):
+    """Keep the listed solution nodes that are new or whose updatedAt changed
+
+    Args:
+        nodes: {topicId, updatedAt} dicts from list_python_solutions
+        versions: {topic_id: updated_at} for the question, from known_solution_versions
+    """
+    return [node for node in nodes if versions.get(str(node['topicId'])) != node['updatedAt']]
+
+def mark_question_done(session, title_slug, solutions, duplicates=()):
+    """Record a fetched question and the versions of its fetched solutions
+
+    Duplicates dropped by leetcode.dedup are recorded too, with the topic_id
+    they duplicate, so incremental crawls do not fetch their details again.
+    The caller commits, so in database storage mode the checkpoint lands in the
+    same transaction as the data it describes.
+    """
+    checkpoint = session.query(CrawlCheckpoint).filter_by(title_slug=title_slug).first()
+    if checkpoint is None:
+        session.add(CrawlCheckpoint(title_slug=title_slug))
+    else:
+        checkpoint.completed_at = datetime.utcnow()
+
+    solutions = list(solutions) + list(duplicates)
+    topic_ids = [sol['topic_id'] for sol in solutions]
+    existing = {
+        checkpoint.topic_id: checkpoint
+        for checkpoint in session.query(SolutionCheckpoint).filter(SolutionCheckpoint.topic_id.in_(topic_ids))
+    } if topic_ids else {}
+
+    for sol in solutions:
+        checkpoint = existing.get(sol['topic_id'])
+        if checkpoint is None:
+            checkpoint = SolutionCheckpoint(topic_id=sol['topic_id'], title_slug=title_slug)
+            session.add(checkpoint)
+        checkpoint.updated_at = sol['updated_at']
+        checkpoint.content_hash = sol.get('content_hash')
+        checkpoint.duplicate_of = sol.get('duplicate_of')
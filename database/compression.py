@@ -0,0 +1,165 @@
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+import zstandard
+from sqlalchemy import LargeBinary, text
+from sqlalchemy.types import TypeDecorator
+from config import (
+    CONTENT_COMPRESSION_LEVEL, CONTENT_DICT_SIZE, CONTENT_DICT_SAMPLES, CONTENT_DICT_MIN_SAMPLES, BULK_CHUNK_SIZE
+)
+
+class ContentCodec:
+    """zstd compression of solution content with trained dictionaries
+
+    Every frame records the id of the dictionary it was compressed with (0
+    for none), so rows written before a dictionary was retrained stay
+    readable. Dictionaries live in the content_dictionaries table and are
+    loaded on every new database connection; the most recent one is used
+    for new rows.
+    """
+
+    def __init__(self, level=CONTENT_COMPRESSION_LEVEL):
+        self.level = level
+        self._dictionaries = {}
+        self._current = None
+        # zstd contexts are not thread-safe, so each thread keeps its own
+        self._local = threading.local()
+
+    def add_dictionary(self, data, current=True):
+        dictionary = zstandard.ZstdCompressionDict(data)
+        self._dictionaries[dictionary.dict_id()] = dictionary
+        if current:
+            self._current = dictionary
+
+    def load(self, dbapi_connection):
+        """Register the dictionaries stored in the database"""
+        cursor = dbapi_connection.cursor()
+        try:
+            rows = cursor.execute('SELECT data FROM content_dictionaries ORDER BY id').fetchall()
+        except sqlite3.OperationalError:
+            # Databases that predate compression have no dictionaries yet
+            rows = []
+        finally:
+            cursor.close()
+        for data, in rows:
+            self.add_dictionary(data)
+
+    def _contexts(self):
+        if not hasattr(self._local, 'compressors'):
+            self._local.compressors = {}
+            self._local.decompressors = {}
+        return self._local.compressors, self._local.decompressors
+
+    def compress(self, content):
+        # Bytes were compressed already, as by parse workers
+        if content is None or isinstance(content, bytes):
+            return content
+        compressors, _ = self._contexts()
+        dict_id = self._current.dict_id() if self._current is not None else 0
+        compressor = compressors.get(dict_id)
+        if compressor is None:
+            compressor = compressors[dict_id] = zstandard.ZstdCompressor(level=self.level, dict_data=self._current)
+        return compressor.compress(content.encode('utf-8'))
+
+    def decompress(self, data):
+        """Return the text of a stored value; plain text from older rows passes through"""
+        if data is None or isinstance(data, str):
+            return data
+        _, decompressors = self._contexts()
+        dict_id = zstandard.get_frame_parameters(data).dict_id
+        decompressor = decompressors.get(dict_id)
+        if decompressor is None:
+            if dict_id and dict_id not in self._dictionaries:
+                raise ValueError(f"Solution content uses unknown compression dictionary {dict_id}")
+            decompressor = decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=self._dictionaries.get(dict_id))
+        return decompressor.decompress(data).decode('utf-8')
+
+    def text_hash(self, data):
+        """sha1 of the text of a stored value or plain text, the same however it is compressed"""
+        content = self.decompress(data)
+        return None if content is None else hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+content_codec = ContentCodec()
+
+class CompressedText(TypeDecorator):
+    """Text column stored as a zstd frame, see ContentCodec
+
+    SQL that needs the text reads it through the lc_decompress() function
+    registered on every connection by database/db.py.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return content_codec.compress(value)
+
+    def process_result_value(self, value, dialect):
+        return content_codec.decompress(value)
+
+def train_dictionary(connection):
+    """Train a dictionary from a sample of stored solutions and make it current
+
+    Returns:
+        int: Id of the new dictionary, or None with too few solutions to train on
+    """
+    rows = connection.execute(
+        text('SELECT content FROM solutions ORDER BY random() LIMIT :limit'), {'limit': CONTENT_DICT_SAMPLES}
+    ).all()
+    if len(rows) < CONTENT_DICT_MIN_SAMPLES:
+        return None
+
+    samples = [content_codec.decompress(content).encode('utf-8') for content, in rows]
+    try:
+        dictionary = zstandard.train_dictionary(CONTENT_DICT_SIZE, samples, level=content_codec.level)
+    except zstandard.ZstdError as e:
+        # Raised when the samples are too small in total for a dictionary
+        print(f"Skipping compression dictionary: {str(e)}")
+        return None
+    connection.execute(
+        text('INSERT INTO content_dictionaries (dict_id, data, samples, created_at) '
+             'VALUES (:dict_id, :data, :samples, :created_at)'),
+        {'dict_id': dictionary.dict_id(), 'data': dictionary.as_bytes(), 'samples': len(samples),
+         'created_at': datetime.utcnow()}
+    )
+    content_codec.add_dictionary(dictionary.as_bytes())
+    return dictionary.dict_id()
+
+def recompress(connection, plain_only=False, chunk_size=BULK_CHUNK_SIZE):
+    """Rewrite stored content with the current dictionary
+
+    Args:
+        plain_only: Only compress rows still holding uncompressed text
+
+    Returns:
+        int: Rows rewritten
+    """
+    plain = "AND typeof(content) = 'text'" if plain_only else ''
+    query = text(f'SELECT id, content FROM solutions WHERE id > :last {plain} ORDER BY id LIMIT :limit')
+
+    rewritten = 0
+    last = 0
+    while rows := connection.execute(query, {'last': last, 'limit': chunk_size}).all():
+        connection.execute(
+            text('UPDATE solutions SET content = :content WHERE id = :id'),
+            [{'id': id, 'content': content_codec.compress(content_codec.decompress(content))} for id, content in rows]
+        )
+        rewritten += len(rows)
+        last = rows[-1][0]
+    return rewritten
+
+def compact(engine):
+    """Retrain the dictionary on current solutions, recompress them all and reclaim the freed pages
+
+    Returns:
+        tuple: (new dictionary id or None, rows recompressed)
+    """
+    with engine.begin() as connection:
+        dict_id = train_dictionary(connection)
+        rows = recompress(connection) if dict_id is not None else 0
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        connection.execute(text('VACUUM'))
+        if connection.dialect.name == 'sqlite':
+            # Under WAL the vacuumed pages only reach the main file at a checkpoint
+            connection.execute(text('PRAGMA wal_checkpoint(TRUNCATE)'))
+    return dict_id, rows
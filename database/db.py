@@ -1,24 +1,60 @@
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
-from database.models import Base, Question, Solution, Attempt, UserContestRanking
-from config import DATABASE_URL
+from database.compression import content_codec
+from leetcode.markdown import unescape
+from config import DATABASE_URL, SQLITE_BUSY_TIMEOUT_MS
+
+def _search_text(data):
+    """Stored content as the full-text index sees it: decompressed, escapes undone"""
+    content = content_codec.decompress(data)
+    return None if content is None else unescape(content)
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    """WAL lets readers run alongside the writer; NORMAL sync is safe under WAL
+
+    Also loads the solution content dictionaries and exposes decompression
+    to SQL, with lc_search_text() giving the full-text index crawled
+    markdown with its literal \\n escapes undone.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+    dbapi_connection.create_function('lc_decompress', 1, content_codec.decompress, deterministic=True)
+    dbapi_connection.create_function('lc_search_text', 1, _search_text, deterministic=True)
+    content_codec.load(dbapi_connection)
+
+def make_engine(url):
+    """Create an engine, configuring every new SQLite connection"""
+    engine = create_engine(url)
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', _configure_sqlite)
+    return engine
 
 # Create SQLAlchemy engine using config
-engine = create_engine(DATABASE_URL)
+engine = make_engine(DATABASE_URL)
+
+# Forked workers must not reuse connections opened by the parent
+os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def init_db():
-    """Initialize the database by creating all tables"""
-    Base.metadata.create_all(bind=engine)
+    """Initialize the database: create missing tables and apply migrations"""
+    from database.migrations import migrate
+
+    for version, description in migrate(engine):
+        print(f"Applied migration {version}: {description}")
     print("Database tables created successfully!")
 
 def drop_and_init_db():
     """Drop all tables and recreate them"""
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
+    from database.migrations import reset
+
+    reset(engine)
     print("Database reset completed!")
 
 def get_db():
@@ -0,0 +1,241 @@
+from datetime import datetime
+from sqlalchemy import inspect, text
+from database.models import (
+    Base, CrawlCheckpoint, SolutionCheckpoint, ContentDictionary, ReviewState, Tag, question_tags,
+    ParsedSolution, SolutionRun
+)
+
+# Every migration must be safe to run against a database that already has
+# its changes: fresh databases are built with create_all and then run the
+# whole list to record their version.
+
+def _add_column(connection, table, column, ddl_type):
+    """Add a column unless it exists; returns True when it was added"""
+    columns = {c['name'] for c in inspect(connection).get_columns(table)}
+    if column in columns:
+        return False
+    connection.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl_type}'))
+    return True
+
+def _create_indexes(connection, *names):
+    """Create model indexes by name, skipping those that already exist"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in names:
+                index.create(connection, checkfirst=True)
+
+def _crawl_ledger(connection):
+    """solutions.topic_id and the checkpoint ledger tables"""
+    if _add_column(connection, 'solutions', 'topic_id', 'VARCHAR'):
+        # SQLite cannot add a UNIQUE column, a unique index gives the same guarantee
+        connection.execute(text('CREATE UNIQUE INDEX IF NOT EXISTS uq_solutions_topic_id ON solutions (topic_id)'))
+    CrawlCheckpoint.__table__.create(connection, checkfirst=True)
+    SolutionCheckpoint.__table__.create(connection, checkfirst=True)
+
+def _hot_path_indexes(connection):
+    """Indexes for due reviews, difficulty counts and solution joins"""
+    _create_indexes(
+        connection,
+        'ix_questions_difficulty',
+        'ix_solutions_question_id',
+        'ix_attempts_attempted_at',
+        'ix_attempts_next_review_at',
+        'ix_attempts_question_id_next_review_at',
+    )
+
+def _solution_search_index(connection):
+    """FTS5 index over solution summaries and content, kept in sync by triggers
+
+    The index reads content through the solutions_text view, decompressed
+    and with its escapes undone, so `\\nclass` is found as `class`.
+    """
+    if connection.dialect.name != 'sqlite':
+        return
+    connection.execute(text(
+        'CREATE VIEW IF NOT EXISTS solutions_text AS '
+        'SELECT id, summary, lc_search_text(content) AS content FROM solutions'
+    ))
+    connection.execute(text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS solutions_fts USING fts5("
+        "summary, content, content='solutions_text', content_rowid='id', tokenize='porter unicode61')"
+    ))
+    connection.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS solutions_fts_insert AFTER INSERT ON solutions BEGIN "
+        "INSERT INTO solutions_fts(rowid, summary, content) VALUES (new.id, new.summary, lc_search_text(new.content)); "
+        "END"
+    ))
+    connection.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS solutions_fts_delete AFTER DELETE ON solutions BEGIN "
+        "INSERT INTO solutions_fts(solutions_fts, rowid, summary, content) "
+        "VALUES ('delete', old.id, old.summary, lc_search_text(old.content)); "
+        "END"
+    ))
+    # Recompressing under a new dictionary changes the bytes but not the text
+    connection.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS solutions_fts_update AFTER UPDATE OF summary, content ON solutions "
+        "WHEN old.summary IS NOT new.summary OR lc_decompress(old.content) IS NOT lc_decompress(new.content) BEGIN "
+        "INSERT INTO solutions_fts(solutions_fts, rowid, summary, content) "
+        "VALUES ('delete', old.id, old.summary, lc_search_text(old.content)); "
+        "INSERT INTO solutions_fts(rowid, summary, content) VALUES (new.id, new.summary, lc_search_text(new.content)); "
+        "END"
+    ))
+    # Index the solutions that existed before the triggers
+    connection.execute(text("INSERT INTO solutions_fts(solutions_fts) VALUES ('rebuild')"))
+
+def _content_hashes(connection):
+    """Content hashes on solutions and the ledger, backfilled for stored solutions"""
+    from leetcode.dedup import content_hash
+
+    _add_column(connection, 'solutions', 'content_hash', 'VARCHAR')
+    _add_column(connection, 'solution_checkpoints', 'content_hash', 'VARCHAR')
+    _add_column(connection, 'solution_checkpoints', 'duplicate_of', 'VARCHAR')
+    _create_indexes(connection, 'ix_solutions_content_hash')
+
+    rows = connection.execute(text('SELECT id, content FROM solutions WHERE content_hash IS NULL')).all()
+    if rows:
+        connection.execute(
+            text('UPDATE solutions SET content_hash = :content_hash WHERE id = :id'),
+            [{'id': id, 'content_hash': content_hash(content)} for id, content in rows]
+        )
+    connection.execute(text(
+        'UPDATE solution_checkpoints SET content_hash = '
+        '(SELECT content_hash FROM solutions WHERE solutions.topic_id = solution_checkpoints.topic_id) '
+        'WHERE content_hash IS NULL'
+    ))
+
+def _compressed_content(connection):
+    """Compress solution content, then rebuild the full-text index over it"""
+    from database.compression import train_dictionary, recompress
+
+    ContentDictionary.__table__.create(connection, checkfirst=True)
+    if connection.dialect.name != 'sqlite':
+        return
+
+    # Drop the index first so compressing existing rows does not reindex them
+    for trigger in ('solutions_fts_insert', 'solutions_fts_delete', 'solutions_fts_update'):
+        connection.execute(text(f'DROP TRIGGER IF EXISTS {trigger}'))
+    connection.execute(text('DROP TABLE IF EXISTS solutions_fts'))
+
+    train_dictionary(connection)
+    recompress(connection, plain_only=True)
+    _solution_search_index(connection)
+
+def _review_states(connection):
+    """Per-question review state, seeded from each question's latest attempt"""
+    ReviewState.__table__.create(connection, checkfirst=True)
+    connection.execute(text(
+        'INSERT OR IGNORE INTO review_states (question_id, easiness_factor, interval, repetition_number, '
+        'attempt_count, last_rating, last_reviewed_at, next_review_at) '
+        'SELECT question_id, easiness_factor, interval, repetition_number, '
+        'attempt_count, difficulty_rating, attempted_at, next_review_at FROM ('
+        '  SELECT *, row_number() OVER ('
+        '    PARTITION BY question_id ORDER BY attempted_at DESC, id DESC) AS recency, '
+        '  count(*) OVER (PARTITION BY question_id) AS attempt_count '
+        '  FROM attempts'
+        ') WHERE recency = 1'
+    ))
+
+def _catalog_fields(connection):
+    """Paid-only, has-solution and topic tag fields of the question catalog"""
+    _add_column(connection, 'questions', 'paid_only', 'BOOLEAN')
+    _add_column(connection, 'questions', 'has_solution', 'BOOLEAN')
+    _add_column(connection, 'questions', 'topic_tags', 'JSON')
+
+def _question_tags(connection):
+    """Tag tables, backfilled from the topic tags stored with each question"""
+    Tag.__table__.create(connection, checkfirst=True)
+    question_tags.create(connection, checkfirst=True)
+    _create_indexes(connection, 'ix_question_tags_tag_id_question_id')
+    if connection.dialect.name != 'sqlite':
+        return
+    connection.execute(text(
+        "INSERT OR IGNORE INTO tags (name, slug) "
+        "SELECT json_extract(tag.value, '$.name'), json_extract(tag.value, '$.slug') "
+        "FROM questions, json_each(questions.topic_tags) AS tag"
+    ))
+    connection.execute(text(
+        "INSERT OR IGNORE INTO question_tags (question_id, tag_id) "
+        "SELECT questions.id, tags.id FROM questions, json_each(questions.topic_tags) AS tag "
+        "JOIN tags ON tags.slug = json_extract(tag.value, '$.slug')"
+    ))
+
+def _parsed_solutions(connection):
+    """Parsed solutions table, and the exact content hashes it is kept up to date by"""
+    from database.compression import content_codec
+
+    ParsedSolution.__table__.create(connection, checkfirst=True)
+    _add_column(connection, 'solutions', 'source_hash', 'VARCHAR')
+    rows = connection.execute(text('SELECT id, content FROM solutions WHERE source_hash IS NULL')).all()
+    if rows:
+        connection.execute(
+            text('UPDATE solutions SET source_hash = :source_hash WHERE id = :id'),
+            [{'id': id, 'source_hash': content_codec.text_hash(content)} for id, content in rows]
+        )
+
+def _solution_runs(connection):
+    """Sandboxed run results of solutions, filled in by the verifier"""
+    SolutionRun.__table__.create(connection, checkfirst=True)
+
+# (version, description, upgrade function), applied in order
+MIGRATIONS = [
+    (1, 'Crawl checkpoint ledger', _crawl_ledger),
+    (2, 'Hot path indexes', _hot_path_indexes),
+    (3, 'Full-text search over solutions', _solution_search_index),
+    (4, 'Solution content hashes', _content_hashes),
+    (5, 'Compressed solution content', _compressed_content),
+    (6, 'Review state per question', _review_states),
+    (7, 'Question catalog fields', _catalog_fields),
+    (8, 'Question tags', _question_tags),
+    (9, 'Parsed solutions', _parsed_solutions),
+    (10, 'Solution runs', _solution_runs),
+]
+
+# Tables and views owned by migrations rather than models, dropped by reset
+MIGRATION_TABLES = ['solutions_fts', 'schema_version']
+MIGRATION_VIEWS = ['solutions_text']
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def _ensure_version_table(connection):
+    connection.execute(text(
+        'CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL, applied_at DATETIME NOT NULL)'
+    ))
+
+def current_version(connection):
+    """Highest applied migration, 0 for databases that predate migrations"""
+    _ensure_version_table(connection)
+    return connection.execute(text('SELECT COALESCE(MAX(version), 0) FROM schema_version')).scalar()
+
+def migrate(engine):
+    """Create missing tables and apply pending migrations, one transaction each
+
+    Returns:
+        list: (version, description) of the migrations applied
+    """
+    Base.metadata.create_all(bind=engine)
+
+    applied = []
+    with engine.begin() as connection:
+        version = current_version(connection)
+
+    for number, description, upgrade in MIGRATIONS:
+        if number <= version:
+            continue
+        with engine.begin() as connection:
+            upgrade(connection)
+            connection.execute(
+                text('INSERT INTO schema_version (version, applied_at) VALUES (:version, :applied_at)'),
+                {'version': number, 'applied_at': datetime.utcnow()}
+            )
+        applied.append((number, description))
+    return applied
+
+def reset(engine):
+    """Drop every table, model-defined or migration-owned, and rebuild the schema"""
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        for table in MIGRATION_TABLES:
+            connection.execute(text(f'DROP TABLE IF EXISTS {table}'))
+        for view in MIGRATION_VIEWS:
+            connection.execute(text(f'DROP VIEW IF EXISTS {view}'))
+    return migrate(engine)
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum, Float
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum, Float, Index, LargeBinary, Boolean, JSON, Table
+from sqlalchemy import event
+from sqlalchemy.orm import declarative_base, relationship, deferred
+from database.compression import CompressedText, content_codec
 from datetime import datetime, timedelta
 import enum
 
@@ -19,30 +20,162 @@ class DifficultyRating(enum.Enum):
     MEDIUM = 2
     EASY = 3
 
+# Which questions carry which topic tags. The primary key serves lookups by
+# question; the (tag_id, question_id) index serves lookups by tag.
+question_tags = Table(
+    'question_tags', Base.metadata,
+    Column('question_id', Integer, ForeignKey('questions.id'), primary_key=True),
+    Column('tag_id', Integer, ForeignKey('tags.id'), primary_key=True),
+    Index('ix_question_tags_tag_id_question_id', 'tag_id', 'question_id'),
+)
+
+class Tag(Base):
+    """Topic tag of the question catalog, such as Array or Graph"""
+    __tablename__ = 'tags'
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    slug = Column(String, unique=True, nullable=False)
+    questions = relationship("Question", secondary=question_tags, back_populates="tags")
+
 class Question(Base):
     __tablename__ = 'questions'
     id = Column(Integer, primary_key=True)
     title = Column(String, unique=True, nullable=False)
     title_slug = Column(String, unique=True, nullable=False)
-    difficulty = Column(String, nullable=False)
+    difficulty = Column(String, nullable=False, index=True)
     frontend_id = Column(String)
     ac_rate = Column(String)
+    # Catalog fields from the question list; only questions with solutions
+    # that are not paid-only are crawled
+    paid_only = Column(Boolean)
+    has_solution = Column(Boolean)
+    topic_tags = Column(JSON)  # [{'name': ..., 'slug': ...}], normalized into tags and question_tags
+    tags = relationship("Tag", secondary=question_tags, back_populates="questions")
     solutions = relationship("Solution", back_populates="question", cascade="all, delete-orphan")
     attempts = relationship("Attempt", back_populates="question", cascade="all, delete-orphan")
 
 class Solution(Base):
     __tablename__ = 'solutions'
     id = Column(Integer, primary_key=True)
-    question_id = Column(Integer, ForeignKey('questions.id'), nullable=False)
+    question_id = Column(Integer, ForeignKey('questions.id'), nullable=False, index=True)
+    topic_id = Column(String, unique=True)  # LeetCode discussion topic id, used to match re-crawled solutions
     summary = Column(Text, nullable=False)
-    content = Column(Text, nullable=False)
+    # Stored compressed and only loaded when accessed; the bulk of the database
+    content = deferred(Column(CompressedText, nullable=False))
+    content_hash = Column(String, index=True)  # sha1 of the normalized content, see leetcode/dedup.py
+    source_hash = Column(String)  # sha1 of the exact content, see ContentCodec.text_hash
     author_name = Column(String)
     created_at = Column(String)
     updated_at = Column(String)
     question = relationship("Question", back_populates="solutions")
+    parsed = relationship("ParsedSolution", uselist=False, back_populates="solution", cascade="all, delete-orphan")
+    run = relationship("SolutionRun", uselist=False, back_populates="solution", cascade="all, delete-orphan")
+
+@event.listens_for(Solution.content, 'set')
+def _hash_source(solution, content, oldvalue, initiator):
+    """Keep source_hash in step with content set through the ORM; bulk writes set both themselves"""
+    solution.source_hash = content_codec.text_hash(content)
+
+class ParsedSolution(Base):
+    """Explanation and Python code split out of a solution's markdown by leetcode/markdown.py
+
+    source_hash is the hash of the solution's content as it was parsed, see
+    ContentCodec.text_hash; solutions whose stored source_hash differs, as
+    after any edit, are parsed again. code_hash is the same hash of the code.
+    """
+    __tablename__ = 'parsed_solutions'
+    solution_id = Column(Integer, ForeignKey('solutions.id'), primary_key=True)
+    source_hash = Column(String)
+    code_hash = Column(String)
+    explanation = deferred(Column(CompressedText, nullable=False))
+    code = deferred(Column(CompressedText, nullable=False))
+    code_blocks = Column(Integer, nullable=False)
+    parsed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    solution = relationship("Solution", back_populates="parsed")
+
+class SolutionRun(Base):
+    """Outcome of running a solution's parsed code in the sandbox, see leetcode/sandbox.py
+
+    code_hash is the parsed solution's code_hash when it was run; solutions
+    whose parsed code has changed since are run again.
+    """
+    __tablename__ = 'solution_runs'
+    solution_id = Column(Integer, ForeignKey('solutions.id'), primary_key=True)
+    code_hash = Column(String)
+    status = Column(String, nullable=False, index=True)  # ok, no_code, syntax_error, error, timeout, memory or crashed
+    compiled = Column(Boolean, nullable=False)
+    runtime = Column(Float)  # Wall-clock seconds
+    cpu_time = Column(Float)  # Seconds
+    peak_memory_kb = Column(Integer)  # Includes the interpreter
+    error = Column(Text)
+    verified_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    solution = relationship("Solution", back_populates="run")
+
+class ContentDictionary(Base):
+    """Trained zstd dictionaries for solution content, the latest one is used for new rows"""
+    __tablename__ = 'content_dictionaries'
+    id = Column(Integer, primary_key=True)
+    dict_id = Column(Integer, unique=True, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    samples = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class CrawlCheckpoint(Base):
+    """Questions whose solutions have been fetched and stored"""
+    __tablename__ = 'crawl_checkpoints'
+    id = Column(Integer, primary_key=True)
+    title_slug = Column(String, unique=True, nullable=False)
+    completed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class SolutionCheckpoint(Base):
+    """Last seen updatedAt and content hash of every fetched solution, for incremental crawls and deduplication"""
+    __tablename__ = 'solution_checkpoints'
+    id = Column(Integer, primary_key=True)
+    topic_id = Column(String, unique=True, nullable=False)
+    title_slug = Column(String, nullable=False, index=True)
+    updated_at = Column(String)
+    content_hash = Column(String)
+    duplicate_of = Column(String)  # topic_id of the kept copy when this solution was not stored
+
+class ReviewState(Base):
+    """Current SM-2 state of every attempted question, updated on each attempt
+
+    Attempts are the append-only history; this table answers what is due
+    without scanning it.
+    """
+    __tablename__ = 'review_states'
+    question_id = Column(Integer, ForeignKey('questions.id'), primary_key=True)
+    easiness_factor = Column(Float, nullable=False, default=2.5)
+    interval = Column(Integer, nullable=False, default=0)
+    repetition_number = Column(Integer, nullable=False, default=0)
+    attempt_count = Column(Integer, nullable=False, default=0)
+    last_rating = Column(Enum(DifficultyRating))
+    last_reviewed_at = Column(DateTime)
+    next_review_at = Column(DateTime, nullable=False, index=True)
+    question = relationship("Question")
+
+    def resume(self, attempt):
+        """Start a new attempt from this state instead of the defaults"""
+        attempt.easiness_factor = self.easiness_factor
+        attempt.interval = self.interval
+        attempt.repetition_number = self.repetition_number
+
+    def update(self, attempt):
+        """Take over the state left by a scheduled attempt"""
+        self.easiness_factor = attempt.easiness_factor
+        self.interval = attempt.interval
+        self.repetition_number = attempt.repetition_number
+        self.attempt_count = (self.attempt_count or 0) + 1
+        self.last_rating = attempt.difficulty_rating
+        self.last_reviewed_at = attempt.attempted_at
+        self.next_review_at = attempt.next_review_at
 
 class Attempt(Base):
     __tablename__ = 'attempts'
+    __table_args__ = (
+        # Also serves plain question_id lookups, so no separate index on it
+        Index('ix_attempts_question_id_next_review_at', 'question_id', 'next_review_at'),
+    )
     id = Column(Integer, primary_key=True)
     question_id = Column(Integer, ForeignKey('questions.id'), nullable=False)
     
@@ -53,8 +186,8 @@ class Attempt(Base):
     
     # Attempt specific fields
     difficulty_rating = Column(Enum(DifficultyRating), nullable=False)
-    attempted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    next_review_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    attempted_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    next_review_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     
     # Relationships
     question = relationship("Question", back_populates="attempts")
@@ -67,12 +200,13 @@ class Attempt(Base):
         self.attempted_at = datetime.utcnow()
         self.next_review_at = datetime.utcnow()
 
-    def calculate_next_review(self, difficulty: DifficultyRating):
+    def calculate_next_review(self, difficulty: DifficultyRating, now=None):
         """
         Implements SM-2 algorithm to calculate the next review date
         
         Args:
             difficulty: DifficultyRating enum (HARD=1, MEDIUM=2, EASY=3)
+            now: Time of the review, defaults to the current UTC time
         """
         quality = difficulty.value  # Convert enum to numeric value
         
@@ -93,4 +227,4 @@ class Attempt(Base):
                 self.interval = round(self.interval * self.easiness_factor)
         
         # Calculate and set next review date
-        self.next_review_at = datetime.utcnow() + timedelta(days=self.interval)
\ No newline at end of file
+        self.next_review_at = (now or datetime.utcnow()) + timedelta(days=self.interval)
\ No newline at end of file
@@ -0,0 +1,58 @@
+from sqlalchemy import bindparam, text
+from database.models import Solution, ParsedSolution
+from database.compression import content_codec
+from database.stages import run_stage
+from leetcode.markdown import parse_solution
+from config import PARSE_CHUNK_SIZE
+
+# Raw column values: workers decompress the content themselves
+CHUNK_SQL = text('SELECT id, content FROM solutions WHERE id IN :ids').bindparams(
+    bindparam('ids', expanding=True)
+)
+
+def unparsed_solution_ids(session):
+    """Ids of solutions never parsed, or whose content changed since they were
+
+    Compares the hash stored with each solution when its content was
+    written to the one recorded at parse time, so no content is read.
+    """
+    query = (
+        session.query(Solution.id)
+        .outerjoin(ParsedSolution, ParsedSolution.solution_id == Solution.id)
+        .filter(ParsedSolution.source_hash.is_distinct_from(Solution.source_hash))
+        .order_by(Solution.id)
+    )
+    return [id for id, in query]
+
+def parse_chunk(rows):
+    """Parse (id, stored content) rows in a worker process
+
+    Decompression, parsing and compression of the results all happen here,
+    leaving the scheduling process only the reads and writes.
+
+    Returns:
+        list: parsed_solutions rows, explanation and code already compressed
+    """
+    parsed = []
+    for id, content in rows:
+        content = content_codec.decompress(content)
+        fields = parse_solution(content)
+        fields['code_hash'] = content_codec.text_hash(fields['code'])
+        fields['explanation'] = content_codec.compress(fields['explanation'])
+        fields['code'] = content_codec.compress(fields['code'])
+        parsed.append({'solution_id': id, 'source_hash': content_codec.text_hash(content), **fields})
+    return parsed
+
+def parse_solutions(session, num_proc=None, chunk_size=PARSE_CHUNK_SIZE):
+    """Parse every new or changed solution into explanation and code, on a pool of worker processes
+
+    Solutions are parsed again only when the hash of their content differs
+    from the one recorded at the last parse; any edit counts, whitespace and
+    case included, while recompressing the content does not. See run_stage
+    for how the work is spread and stored.
+
+    Returns:
+        int: Solutions parsed
+    """
+    ids = unparsed_solution_ids(session)
+    return run_stage(session, 'parse', ids, CHUNK_SQL, parse_chunk, ParsedSolution, chunk_size, num_proc)
@@ -0,0 +1,50 @@
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from database.stats import totals_query, difficulty_counts_query, recent_attempts_query, solution_counts_query
+from database.reviews import due_reviews_query
+
+NOW = datetime(2000, 1, 1)
+
+# Hot queries and the index each one must use. Each entry builds the query
+# the application itself runs, from database/stats.py and database/reviews.py
+# (with the tag filters of database/tags.py), so the plans cannot drift from
+# the code.
+HOT_QUERIES = [
+    ('statistics totals', lambda session: totals_query(NOW), 'ix_review_states_next_review_at'),
+    ('due review queue', lambda session: due_reviews_query(session, NOW), 'ix_review_states_next_review_at'),
+    (
+        'due reviews with a tag',
+        lambda session: due_reviews_query(session, NOW, tags=['graph'], difficulty='Easy'),
+        'ix_question_tags_tag_id_question_id',
+    ),
+    ('recent attempts', lambda session: recent_attempts_query(session, 5), 'ix_attempts_attempted_at'),
+    ('questions by difficulty', difficulty_counts_query, 'ix_questions_difficulty'),
+    ('solutions per question', solution_counts_query, 'ix_solutions_question_id'),
+]
+
+def compile_sql(query, dialect):
+    """Render an ORM query or Core statement as SQL with its parameters inlined"""
+    statement = getattr(query, 'statement', query)
+    compiled = statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True, 'render_postcompile': True})
+    return str(compiled)
+
+def explain(connection, sql, params=None):
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement"""
+    rows = connection.execute(text(f'EXPLAIN QUERY PLAN {sql}'), params or {})
+    return [row[-1] for row in rows]
+
+def check_query_plans(engine):
+    """Check every hot query against its expected index
+
+    Returns:
+        list: (name, expected index, plan lines) for each query that does
+        not use its index; empty when all plans are as expected
+    """
+    failures = []
+    with engine.connect() as connection, Session(bind=connection) as session:
+        for name, build, index in HOT_QUERIES:
+            plan = explain(connection, compile_sql(build(session), engine.dialect))
+            if not any(index in line for line in plan):
+                failures.append((name, index, plan))
+    return failures
@@ -0,0 +1,52 @@
+from datetime import datetime
+from database.models import Question, Attempt, ReviewState
+from database.tags import filter_questions
+
+def record_review(session, question_id, difficulty, now=None):
+    """Log an attempt and advance the question's review state; the caller commits
+
+    The attempt continues SM-2 from the question's current state, so the
+    easiness factor and interval carry over between attempts.
+
+    Returns:
+        Attempt: The new attempt, added to the session
+    """
+    now = now or datetime.utcnow()
+    state = session.get(ReviewState, question_id)
+
+    attempt = Attempt(question_id=question_id, difficulty_rating=difficulty)
+    attempt.attempted_at = now
+    if state is not None:
+        state.resume(attempt)
+    attempt.calculate_next_review(difficulty, now=now)
+    session.add(attempt)
+
+    if state is None:
+        state = ReviewState(question_id=question_id)
+        session.add(state)
+    state.update(attempt)
+    return attempt
+
+def due_reviews_query(session, now=None, tags=None, difficulty=None):
+    """(Question, ReviewState) pairs due at `now`, most overdue first"""
+    query = (
+        session.query(Question, ReviewState)
+        .join(ReviewState, ReviewState.question_id == Question.id)
+        .filter(ReviewState.next_review_at <= (now or datetime.utcnow()))
+    )
+    return filter_questions(query, tags, difficulty).order_by(ReviewState.next_review_at)
+
+def due_reviews(session, now=None, limit=None, tags=None, difficulty=None):
+    """Questions whose next review is due, most overdue first
+
+    Served by the index on review_states.next_review_at, so the cost grows
+    with the number of due questions, not with the attempt history. `tags`
+    and `difficulty` narrow the deck, see filter_questions.
+
+    Returns:
+        list: (Question, ReviewState) pairs
+    """
+    query = due_reviews_query(session, now, tags, difficulty)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
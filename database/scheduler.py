@@ -0,0 +1,286 @@
+import csv
+from datetime import datetime, timezone
+import numpy as np
+from sqlalchemy import func, select
+from database.models import Attempt, DifficultyRating, ReviewState
+
+# State of a question that has never been attempted, as set by Attempt.__init__
+INITIAL_EASINESS_FACTOR = 2.5
+
+def sm2_update(easiness_factor, interval, repetition_number, quality):
+    """Vectorized Attempt.calculate_next_review over arrays of cards
+
+    Performs the same floating point operations in the same order as the
+    scalar version, so the results are identical, not just close.
+
+    Returns:
+        tuple: (easiness_factor, interval, repetition_number) arrays
+    """
+    lapse = 5 - quality
+    easiness_factor = np.maximum(1.3, easiness_factor + (0.1 - lapse * (0.08 + lapse * 0.02)))
+
+    passed = quality >= 2
+    repetition_number = np.where(passed, repetition_number + 1, 0)
+    # np.rint rounds half to even like round()
+    grown = np.rint(interval * easiness_factor).astype(np.int64)
+    interval = np.where(~passed | (repetition_number == 1), 1, np.where(repetition_number == 2, 6, grown))
+    return easiness_factor, interval, repetition_number
+
+class DeckState:
+    """SM-2 state of every attempted question as parallel arrays sorted by question_id
+
+    A question's state is the one left by its latest attempt.
+    """
+
+    def __init__(self, question_id, easiness_factor, interval, repetition_number, next_review_at):
+        self.question_id = np.asarray(question_id, dtype=np.int64)
+        self.easiness_factor = np.asarray(easiness_factor, dtype=np.float64)
+        self.interval = np.asarray(interval, dtype=np.int64)
+        self.repetition_number = np.asarray(repetition_number, dtype=np.int64)
+        self.next_review_at = np.asarray(next_review_at, dtype='datetime64[us]')
+
+    @classmethod
+    def empty(cls):
+        return cls([], [], [], [], [])
+
+    def __len__(self):
+        return len(self.question_id)
+
+    def slots(self, question_ids):
+        """Positions of `question_ids` in the arrays, adding fresh state for unseen questions"""
+        new = np.setdiff1d(question_ids, self.question_id)
+        if len(new):
+            order = np.argsort(np.concatenate([self.question_id, new]), kind='stable')
+            self.question_id = np.concatenate([self.question_id, new])[order]
+            self.easiness_factor = np.concatenate([self.easiness_factor, np.full(len(new), INITIAL_EASINESS_FACTOR)])[order]
+            self.interval = np.concatenate([self.interval, np.zeros(len(new), dtype=np.int64)])[order]
+            self.repetition_number = np.concatenate([self.repetition_number, np.zeros(len(new), dtype=np.int64)])[order]
+            self.next_review_at = np.concatenate([
+                self.next_review_at, np.full(len(new), np.datetime64('NaT'), dtype='datetime64[us]')
+            ])[order]
+        return np.searchsorted(self.question_id, question_ids)
+
+def load_deck(session):
+    """Load the review state of every attempted question in one query"""
+    rows = session.execute(
+        select(ReviewState.question_id, ReviewState.easiness_factor, ReviewState.interval,
+               ReviewState.repetition_number, ReviewState.next_review_at)
+        .order_by(ReviewState.question_id)
+    ).all()
+    return DeckState(*zip(*rows)) if rows else DeckState.empty()
+
+def apply_reviews(deck, question_ids, qualities, reviewed_at):
+    """Apply graded reviews to the deck, in time order per question
+
+    Reviews are grouped into rounds holding at most one review per
+    question, the first review of every question, then the second and so
+    on, so each round is a single vectorized SM-2 step.
+
+    Args:
+        deck: DeckState, updated in place
+        question_ids: Question id of each review
+        qualities: DifficultyRating values (HARD=1, MEDIUM=2, EASY=3)
+        reviewed_at: datetime64 time of each review
+
+    Returns:
+        dict: Column arrays of the attempts to insert, in question and time order
+    """
+    question_ids = np.asarray(question_ids, dtype=np.int64)
+    reviewed_at = np.asarray(reviewed_at, dtype='datetime64[us]')
+    order = np.lexsort((reviewed_at, question_ids))
+    question_ids = question_ids[order]
+    qualities = np.asarray(qualities, dtype=np.int64)[order]
+    reviewed_at = reviewed_at[order]
+
+    # Position of each review among the reviews of its question
+    starts = np.flatnonzero(np.r_[True, question_ids[1:] != question_ids[:-1]])
+    rounds = np.arange(len(question_ids)) - np.repeat(starts, np.diff(np.r_[starts, len(question_ids)]))
+    slots = deck.slots(question_ids)
+
+    easiness_factor = np.empty(len(question_ids))
+    interval = np.empty(len(question_ids), dtype=np.int64)
+    repetition_number = np.empty(len(question_ids), dtype=np.int64)
+    by_round = np.argsort(rounds, kind='stable')
+    bounds = np.searchsorted(rounds[by_round], np.arange(rounds.max() + 2 if len(rounds) else 1))
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        selected = by_round[begin:end]
+        card = slots[selected]
+        ef, iv, rep = sm2_update(
+            deck.easiness_factor[card], deck.interval[card], deck.repetition_number[card], qualities[selected]
+        )
+        deck.easiness_factor[card] = easiness_factor[selected] = ef
+        deck.interval[card] = interval[selected] = iv
+        deck.repetition_number[card] = repetition_number[selected] = rep
+        deck.next_review_at[card] = reviewed_at[selected] + iv.astype('timedelta64[D]')
+
+    return {
+        'question_id': question_ids,
+        'difficulty_rating': qualities,
+        'easiness_factor': easiness_factor,
+        'interval': interval,
+        'repetition_number': repetition_number,
+        'attempted_at': reviewed_at,
+        'next_review_at': reviewed_at + interval.astype('timedelta64[D]'),
+    }
+
+def schedule_scalar(question_ids, qualities, reviewed_at):
+    """Reference for apply_reviews: one Attempt.calculate_next_review per review
+
+    Each review starts from the state left by the previous attempt at its
+    question, as record_review does.
+
+    Returns:
+        list: (easiness_factor, interval, repetition_number, next_review_at)
+        per review, in question and time order
+    """
+    ratings = {rating.value: rating for rating in DifficultyRating}
+    previous = {}
+    results = []
+    for i in np.lexsort((reviewed_at, question_ids)):
+        question_id = int(question_ids[i])
+        rating = ratings[int(qualities[i])]
+        attempt = Attempt(question_id=question_id, difficulty_rating=rating)
+        if question_id in previous:
+            attempt.easiness_factor, attempt.interval, attempt.repetition_number = previous[question_id]
+        attempt.calculate_next_review(rating, now=reviewed_at[i].item())
+        previous[question_id] = (attempt.easiness_factor, attempt.interval, attempt.repetition_number)
+        results.append((attempt.easiness_factor, attempt.interval, attempt.repetition_number, attempt.next_review_at))
+    return results
+
+def review_states(reviews):
+    """apply_reviews results in the shape of schedule_scalar's"""
+    return list(zip(reviews['easiness_factor'].tolist(), reviews['interval'].tolist(),
+                    reviews['repetition_number'].tolist(), reviews['next_review_at'].tolist()))
+
+def synthetic_reviews(num_reviews, num_questions, seed):
+    """Random graded reviews over a week, for checking and timing the scheduler
+
+    Returns:
+        tuple: (question_ids, qualities, reviewed_at) arrays, as read_review_csv returns
+    """
+    rng = np.random.default_rng(seed)
+    question_ids = rng.integers(1, num_questions + 1, num_reviews)
+    qualities = rng.choice([1, 2, 3], size=num_reviews, p=[0.2, 0.5, 0.3])
+    start = np.datetime64('2024-01-01T00:00:00', 'us')
+    reviewed_at = start + rng.integers(0, 7 * 24 * 3600 * 10 ** 6, num_reviews).astype('timedelta64[us]')
+    return question_ids, qualities, reviewed_at
+
+def _sqlite_datetimes(values):
+    """Format datetime64 values the way SQLAlchemy's SQLite DateTime type stores them"""
+    return np.char.replace(np.datetime_as_string(values, unit='us'), 'T', ' ').tolist()
+
+def store_reviews(session, reviews, deck):
+    """Append the scheduled reviews to the attempt log and save the deck state of the reviewed questions
+
+    One executemany INSERT for the attempts and one upsert for review_states;
+    the caller commits. Values are converted column by column with NumPy and
+    handed straight to the driver, since per-row conversion by the column
+    types dominated the cost of large imports. The placeholders, upsert and
+    datetime format are SQLite's.
+    """
+    if not len(reviews['question_id']):
+        return 0
+    ratings = np.array([''] + [rating.name for rating in sorted(DifficultyRating, key=lambda rating: rating.value)])
+
+    attempts = {
+        'question_id': reviews['question_id'].tolist(),
+        'difficulty_rating': ratings[reviews['difficulty_rating']].tolist(),
+        'easiness_factor': reviews['easiness_factor'].tolist(),
+        'interval': reviews['interval'].tolist(),
+        'repetition_number': reviews['repetition_number'].tolist(),
+        'attempted_at': _sqlite_datetimes(reviews['attempted_at']),
+        'next_review_at': _sqlite_datetimes(reviews['next_review_at']),
+    }
+    session.connection().exec_driver_sql(
+        f"INSERT INTO attempts ({', '.join(attempts)}) VALUES ({', '.join('?' * len(attempts))})",
+        list(zip(*attempts.values()))
+    )
+
+    # Reviews are sorted by question and time, so each question's last review ends its run
+    question_ids, first, counts = np.unique(reviews['question_id'], return_index=True, return_counts=True)
+    last = first + counts - 1
+    card = deck.slots(question_ids)
+    states = {
+        'question_id': question_ids.tolist(),
+        'easiness_factor': deck.easiness_factor[card].tolist(),
+        'interval': deck.interval[card].tolist(),
+        'repetition_number': deck.repetition_number[card].tolist(),
+        'attempt_count': counts.tolist(),
+        'last_rating': ratings[reviews['difficulty_rating'][last]].tolist(),
+        'last_reviewed_at': _sqlite_datetimes(reviews['attempted_at'][last]),
+        'next_review_at': _sqlite_datetimes(deck.next_review_at[card]),
+    }
+    updates = ', '.join(
+        f'{column} = review_states.{column} + excluded.{column}' if column == 'attempt_count'
+        else f'{column} = excluded.{column}'
+        for column in states if column != 'question_id'
+    )
+    session.connection().exec_driver_sql(
+        f"INSERT INTO review_states ({', '.join(states)}) VALUES ({', '.join('?' * len(states))}) "
+        f"ON CONFLICT (question_id) DO UPDATE SET {updates}",
+        list(zip(*states.values()))
+    )
+    return len(attempts['question_id'])
+
+def read_review_csv(path):
+    """Read graded reviews from a CSV file with question_id, difficulty and reviewed_at columns
+
+    difficulty is EASY, MEDIUM or HARD and reviewed_at an ISO 8601 time.
+    Times with an offset are converted to UTC, times without one are taken
+    as UTC already.
+
+    Returns:
+        tuple: (question_ids, qualities, reviewed_at) arrays
+    """
+    question_ids = []
+    qualities = []
+    reviewed_at = []
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            question_ids.append(int(row['question_id']))
+            qualities.append(DifficultyRating[row['difficulty'].strip().upper()].value)
+            when = datetime.fromisoformat(row['reviewed_at'].strip())
+            if when.tzinfo is not None:
+                when = when.astimezone(timezone.utc).replace(tzinfo=None)
+            reviewed_at.append(when)
+    return (np.array(question_ids, dtype=np.int64), np.array(qualities, dtype=np.int64),
+            np.array(reviewed_at, dtype='datetime64[us]'))
+
+def grade_distribution(session):
+    """Share of each DifficultyRating value among all attempts, uniform when there are none"""
+    counts = dict(session.query(Attempt.difficulty_rating, func.count(Attempt.id)).group_by(Attempt.difficulty_rating))
+    values = [rating.value for rating in DifficultyRating]
+    total = sum(counts.values())
+    if not total:
+        return values, [1 / len(values)] * len(values)
+    return values, [counts.get(rating, 0) / total for rating in DifficultyRating]
+
+def simulate_load(deck, days, grades, probabilities, start=None, seed=0):
+    """Project the number of reviews due on each of the next `days` days
+
+    Days are calendar days starting with the one `start` falls on. Every due
+    card is reviewed on its day with a grade drawn from `probabilities`, and
+    rescheduled by SM-2. Overdue cards count on day 0.
+
+    Returns:
+        numpy.ndarray: Reviews due per day
+    """
+    if days < 0:
+        raise ValueError(f"Cannot simulate a negative number of days: {days}")
+    today = np.datetime64(start or datetime.utcnow(), 'D')
+    rng = np.random.default_rng(seed)
+    ef = deck.easiness_factor.copy()
+    interval = deck.interval.copy()
+    repetition_number = deck.repetition_number.copy()
+    due_day = np.maximum(0, (deck.next_review_at.astype('datetime64[D]') - today).astype(np.int64))
+
+    load = np.zeros(days, dtype=np.int64)
+    for day in range(days):
+        due = np.flatnonzero(due_day == day)
+        load[day] = len(due)
+        if not len(due):
+            continue
+        quality = rng.choice(grades, size=len(due), p=probabilities)
+        ef[due], interval[due], repetition_number[due] = sm2_update(ef[due], interval[due], repetition_number[due], quality)
+        due_day[due] = day + interval[due]
+    return load
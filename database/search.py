@@ -0,0 +1,54 @@
+import re
+from sqlalchemy import text
+
+SEARCH_SQL = """
+SELECT solutions.id, questions.title, questions.difficulty, solutions.author_name,
+       snippet(solutions_fts, -1, '[', ']', ' ... ', :snippet_tokens) AS snippet,
+       bm25(solutions_fts, 2.0, 1.0) AS rank
+FROM solutions_fts
+JOIN solutions ON solutions.id = solutions_fts.rowid
+JOIN questions ON questions.id = solutions.question_id
+WHERE solutions_fts MATCH :match
+{difficulty_filter}
+ORDER BY rank
+LIMIT :limit
+"""
+
+def to_match_query(query):
+    """Turn free text into an FTS5 query matching all of its words
+
+    Each word is quoted, so punctuation in the input cannot be parsed as FTS5
+    operators.
+    """
+    words = re.findall(r'\w+', query)
+    return ' '.join(f'"{word}"' for word in words)
+
+def search_solutions(session, query, difficulty=None, limit=20, snippet_tokens=16):
+    """Ranked full-text search over solution summaries and content
+
+    Summary matches weigh twice as much as content matches.
+
+    Returns:
+        list: dicts with solution_id, title, difficulty, author_name, snippet and rank
+    """
+    match = to_match_query(query)
+    if not match:
+        return []
+
+    sql = SEARCH_SQL.format(difficulty_filter='AND questions.difficulty = :difficulty' if difficulty else '')
+    params = {'match': match, 'limit': limit, 'snippet_tokens': snippet_tokens}
+    if difficulty:
+        params['difficulty'] = difficulty
+
+    rows = session.execute(text(sql), params)
+    return [
+        {
+            'solution_id': solution_id,
+            'title': title,
+            'difficulty': question_difficulty,
+            'author_name': author_name,
+            'snippet': snippet,
+            'rank': rank
+        }
+        for solution_id, title, question_difficulty, author_name, snippet, rank in rows
+    ]
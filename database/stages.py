@@ -0,0 +1,68 @@
+import multiprocessing
+from sqlalchemy import delete, insert, text
+from database.bulk import chunked
+from database.compression import content_codec
+from leetcode.workpool import WorkScheduler
+
+def init_stage_worker(dictionaries):
+    """Pool initializer registering the compression dictionaries, oldest first"""
+    for data in dictionaries:
+        content_codec.add_dictionary(data)
+
+def replace_rows(session, model, rows):
+    """Replace the rows of `model` for these solutions; the caller commits"""
+    session.execute(delete(model).where(model.solution_id.in_([row['solution_id'] for row in rows])))
+    session.execute(insert(model.__table__), rows)
+
+def run_stage(session, verb, ids, chunk_sql, worker, model, chunk_size, num_proc=None,
+              initializer=init_stage_worker, initargs=(), **scheduler_options):
+    """Process solutions chunk by chunk on a pool of worker processes, storing the results
+
+    A stage is its stale ids, the query reading the rows of a chunk and the
+    worker function turning them into rows of `model`. This process reads
+    each chunk of `chunk_size` ids as a worker frees up and replaces the
+    stored rows with what the workers send back, committing chunk by chunk,
+    so an interrupted run keeps its progress. Stored values are handed over
+    as they are, leaving decompression to the workers.
+
+    Args:
+        session: SQLAlchemy session
+        verb: What the stage does to a solution, for the failure report
+        ids: Solution ids to process, in order
+        chunk_sql: Statement selecting the rows of the solutions in :ids
+        worker: Function of a chunk's rows returning rows of `model`
+        model: Results table, keyed by solution_id
+        num_proc: Worker processes, one per CPU by default
+        initializer: Pool initializer, called with the compression
+            dictionaries followed by `initargs`
+        scheduler_options: Passed on to WorkScheduler
+
+    Returns:
+        int: Solutions processed
+    """
+    dictionaries = [data for data, in session.execute(text('SELECT data FROM content_dictionaries ORDER BY id'))]
+    session.commit()
+    if not ids:
+        return 0
+
+    def tasks():
+        for chunk in chunked(ids, chunk_size):
+            rows = [tuple(row) for row in session.execute(chunk_sql, {'ids': chunk})]
+            # Do not hold a read transaction while the workers run
+            session.commit()
+            yield rows
+
+    num_proc = max(1, min(num_proc or multiprocessing.cpu_count(), -(-len(ids) // chunk_size)))
+    done = 0
+    scheduler = WorkScheduler(worker, num_proc, initializer=initializer, initargs=(dictionaries, *initargs),
+                              **scheduler_options)
+    with scheduler:
+        for _, rows in scheduler.run(tasks()):
+            if not rows:
+                continue
+            replace_rows(session, model, rows)
+            session.commit()
+            done += len(rows)
+    for rows, error in scheduler.failed:
+        print(f"Could not {verb} solutions {rows[0][0]}-{rows[-1][0]}: {error}")
+    return done
@@ -0,0 +1,75 @@
+from datetime import datetime
+from sqlalchemy import func, select
+from database.models import Question, Solution, Attempt, ReviewState
+
+DIFFICULTIES = ['Easy', 'Medium', 'Hard']
+
+def totals_query(now):
+    """One SELECT of scalar subqueries counting questions, solutions, attempts and due reviews"""
+    return select(
+        select(func.count(Question.id)).scalar_subquery().label('total_questions'),
+        select(func.count(func.distinct(Solution.question_id))).scalar_subquery().label('questions_with_solutions'),
+        select(func.count(Solution.id)).scalar_subquery().label('total_solutions'),
+        select(func.count(Attempt.id)).scalar_subquery().label('total_attempts'),
+        select(func.count(ReviewState.question_id)).where(ReviewState.next_review_at <= now)
+        .scalar_subquery().label('due_reviews'),
+    )
+
+def difficulty_counts_query(session):
+    """(difficulty, question count) pairs"""
+    return session.query(Question.difficulty, func.count(Question.id)).group_by(Question.difficulty)
+
+def recent_attempts_query(session, recent):
+    """The `recent` latest attempts with their question titles"""
+    return (
+        session.query(Question.title, Attempt.difficulty_rating, Attempt.attempted_at, Attempt.next_review_at)
+        .join(Question, Attempt.question_id == Question.id)
+        .order_by(Attempt.attempted_at.desc())
+        .limit(recent)
+    )
+
+def collect_statistics(session, recent=5, now=None):
+    """Gather the --stats report with aggregate queries
+
+    Totals come from one SELECT of scalar subqueries, the difficulty
+    breakdown from one GROUP BY and recent attempts from one join, so the
+    cost does not grow with the number of solution bodies.
+
+    Returns:
+        dict: JSON-serializable statistics (datetimes excepted)
+    """
+    now = now or datetime.utcnow()
+
+    totals = session.execute(totals_query(now)).mappings().one()
+
+    by_difficulty = dict.fromkeys(DIFFICULTIES, 0)
+    by_difficulty.update(difficulty_counts_query(session).all())
+
+    recent_attempts = recent_attempts_query(session, recent).all()
+
+    return {
+        **totals,
+        'questions_by_difficulty': by_difficulty,
+        'recent_attempts': [
+            {
+                'title': title,
+                'difficulty_rating': rating.name,
+                'attempted_at': attempted_at,
+                'next_review_at': next_review_at
+            }
+            for title, rating, attempted_at, next_review_at in recent_attempts
+        ]
+    }
+
+def solution_counts_query(session):
+    """(question title, solution count) pairs in question order"""
+    return (
+        session.query(Question.title, func.count(Solution.id))
+        .outerjoin(Solution, Solution.question_id == Question.id)
+        .group_by(Question.id, Question.title)
+        .order_by(Question.id)
+    )
+
+def solution_counts(session):
+    """Yield (question title, solution count) with one GROUP BY over solutions"""
+    yield from solution_counts_query(session)
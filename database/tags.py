@@ -0,0 +1,54 @@
+from sqlalchemy import delete, insert, select
+from database.models import Question, Tag, question_tags
+
+def _tag_ids(session, slugs):
+    rows = session.execute(select(Tag.slug, Tag.id).where(Tag.slug.in_(slugs)))
+    return dict(rows.all())
+
+def store_question_tags(session, topic_tags):
+    """Replace the tags of questions with bulk inserts; the caller commits
+
+    Args:
+        session: SQLAlchemy session
+        topic_tags: dict of question id -> [{'name': ..., 'slug': ...}], as
+            listed in the question catalog
+
+    Tags are matched on slug and only inserted when new.
+    """
+    tags = {tag['slug']: tag['name'] for listed in topic_tags.values() for tag in listed}
+    tag_ids = _tag_ids(session, list(tags)) if tags else {}
+    new_tags = [{'slug': slug, 'name': name} for slug, name in tags.items() if slug not in tag_ids]
+    if new_tags:
+        session.execute(insert(Tag.__table__), new_tags)
+        tag_ids.update(_tag_ids(session, [tag['slug'] for tag in new_tags]))
+
+    session.execute(delete(question_tags).where(question_tags.c.question_id.in_(list(topic_tags))))
+    links = {
+        (question_id, tag_ids[tag['slug']])
+        for question_id, listed in topic_tags.items() for tag in listed
+    }
+    if links:
+        session.execute(insert(question_tags), [{'question_id': question_id, 'tag_id': tag_id}
+                                                for question_id, tag_id in links])
+
+def filter_questions(query, tags=None, difficulty=None):
+    """Restrict a query involving Question to some tags and a difficulty
+
+    Args:
+        query: Query selecting from or joining questions
+        tags: Tag slugs; questions carrying any of them are kept
+        difficulty: 'Easy', 'Medium' or 'Hard'
+
+    The tag filter is a semi-join through the (tag_id, question_id) index, so
+    a question carrying several of the tags still comes back once.
+    """
+    if difficulty:
+        query = query.filter(Question.difficulty == difficulty)
+    if tags:
+        tagged = (
+            select(question_tags.c.question_id)
+            .join(Tag, Tag.id == question_tags.c.tag_id)
+            .where(Tag.slug.in_(tags))
+        )
+        query = query.filter(Question.id.in_(tagged))
+    return query
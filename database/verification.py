@@ -0,0 +1,69 @@
+from sqlalchemy import bindparam, func, text
+from database.models import ParsedSolution, SolutionRun
+from database.compression import content_codec
+from database.stages import init_stage_worker, run_stage
+from leetcode.sandbox import Sandbox
+from config import VERIFY_CPU_SECONDS, VERIFY_MEMORY_BYTES, VERIFY_WALL_SECONDS, VERIFY_CHUNK_SIZE
+
+# Raw column values: workers decompress the code themselves
+CHUNK_SQL = text(
+    'SELECT solution_id, code, code_blocks, code_hash FROM parsed_solutions WHERE solution_id IN :ids'
+).bindparams(bindparam('ids', expanding=True))
+
+def unverified_solution_ids(session):
+    """Ids of parsed solutions never run, or whose parsed code changed since they were"""
+    query = (
+        session.query(ParsedSolution.solution_id)
+        .outerjoin(SolutionRun, SolutionRun.solution_id == ParsedSolution.solution_id)
+        .filter(SolutionRun.code_hash.is_distinct_from(ParsedSolution.code_hash))
+        .order_by(ParsedSolution.solution_id)
+    )
+    return [id for id, in query]
+
+# One fork server per worker process, reused by every task it handles
+_sandbox = None
+
+def init_verify_worker(dictionaries, cpu_seconds, memory_bytes, wall_seconds):
+    """Pool initializer registering the compression dictionaries and starting the worker's sandbox"""
+    global _sandbox
+    init_stage_worker(dictionaries)
+    _sandbox = Sandbox(cpu_seconds, memory_bytes, wall_seconds)
+
+def verify_chunk(rows):
+    """Run (solution id, stored code, code blocks, code_hash) rows in this worker's sandbox
+
+    Returns:
+        list: solution_runs rows
+    """
+    results = []
+    for id, code, code_blocks, hash_ in rows:
+        if code_blocks:
+            result = _sandbox.run(content_codec.decompress(code))
+        else:
+            result = {'status': 'no_code', 'compiled': False, 'runtime': None, 'cpu_time': None,
+                      'peak_memory_kb': None, 'error': None}
+        results.append({'solution_id': id, 'code_hash': hash_, **result})
+    return results
+
+def verify_solutions(session, num_proc=None, chunk_size=VERIFY_CHUNK_SIZE, cpu_seconds=VERIFY_CPU_SECONDS,
+                     memory_bytes=VERIFY_MEMORY_BYTES, wall_seconds=VERIFY_WALL_SECONDS):
+    """Run the parsed code of every new or changed solution in sandboxes, on a pool of worker processes
+
+    Each worker keeps one leetcode/sandbox.py fork server and runs its
+    solutions one at a time under the given limits. Solutions are run again
+    only when their parsed code changes, see run_stage for how the work is
+    spread and stored. Solutions must have been parsed first, see
+    database/parsing.py.
+
+    Returns:
+        int: Solutions run
+    """
+    ids = unverified_solution_ids(session)
+    # A task is as slow as its slowest solutions; only back it up when it is far behind
+    return run_stage(session, 'verify', ids, CHUNK_SQL, verify_chunk, SolutionRun, chunk_size, num_proc,
+                     initializer=init_verify_worker, initargs=(cpu_seconds, memory_bytes, wall_seconds),
+                     straggler_timeout=chunk_size * wall_seconds)
+
+def run_statuses(session):
+    """Map status -> number of solutions whose last run ended that way"""
+    return dict(session.query(SolutionRun.status, func.count(SolutionRun.solution_id)).group_by(SolutionRun.status).all())
@@ -0,0 +1,96 @@
+import queue
+import threading
+import time
+from database.db import SessionLocal
+from database.bulk import bulk_store_questions
+from database.checkpoints import mark_question_done
+from leetcode.dedup import DedupStats
+from config import WRITER_COMMIT_EVERY, WRITER_FLUSH_INTERVAL
+
+def checkpoint_record(record):
+    """Strip a fetched record down to what the checkpoint ledger needs"""
+    return {
+        'question': {'title_slug': record['question']['title_slug']},
+        'solutions': [
+            {'topic_id': sol['topic_id'], 'updated_at': sol['updated_at'], 'content_hash': sol.get('content_hash')}
+            for sol in record['solutions']
+        ],
+        'duplicates': record.get('duplicates', [])
+    }
+
+class DatabaseWriter:
+    """Single consumer that owns every crawl write to the database
+
+    The crawl puts ('store', record) messages on the queue for data to
+    persist, or ('checkpoint', record) when the data already went to a batch
+    file and only the ledger needs updating. This thread batches them into
+    large transactions so SQLite never sees competing writers.
+
+    Usage:
+        with DatabaseWriter(queue.Queue(WRITER_QUEUE_SIZE)) as writer:
+            ... put messages on writer.queue ...
+        print(writer.written, writer.dedup.report())
+    """
+
+    def __init__(self, write_queue, commit_every=WRITER_COMMIT_EVERY, flush_interval=WRITER_FLUSH_INTERVAL):
+        self.queue = write_queue
+        self.commit_every = commit_every
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dedup = DedupStats()
+        self.error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Flush whatever arrived even if the crawl failed, so a rerun resumes
+        # after the last stored question
+        self.queue.put(None)
+        self._thread.join()
+        if self.error is not None and exc_type is None:
+            raise Exception(f"Database writer failed: {self.error}") from self.error
+
+    def _flush(self, session, pending):
+        if not pending:
+            return
+        bulk_store_questions(session, [record for kind, record in pending if kind == 'store'])
+        for kind, record in pending:
+            mark_question_done(session, record['question']['title_slug'], record['solutions'], record.get('duplicates', []))
+            self.dedup.add(record)
+        session.commit()
+        self.written += len(pending)
+        pending.clear()
+
+    def _run(self):
+        session = SessionLocal()
+        pending = []
+        last_flush = time.monotonic()
+        try:
+            while True:
+                try:
+                    message = self.queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    message = ()
+
+                if message is None:
+                    break
+                if message:
+                    pending.append(message)
+
+                if len(pending) >= self.commit_every or time.monotonic() - last_flush >= self.flush_interval:
+                    self._flush(session, pending)
+                    last_flush = time.monotonic()
+
+            self._flush(session, pending)
+        except Exception as e:
+            print(f"Error in database writer: {str(e)}")
+            session.rollback()
+            self.error = e
+            # Keep draining so producers blocked on a full queue can finish
+            while self.queue.get() is not None:
+                pass
+        finally:
+            session.close()
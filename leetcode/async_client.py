@@ -0,0 +1,123 @@
+import asyncio
+import time
+import aiohttp
+from config import HTTP_TIMEOUT, HTTP_MAX_RETRIES, SOLUTION_DETAIL_BATCH_SIZE
+from .client import (
+    DEFAULT_BASE_URL, RETRY_STATUSES, build_headers, parse_solution_details,
+    retry_delay, solution_details_request
+)
+from .queries import GET_QUESTIONS, GET_PYTHON_SOLUTION_IDS
+
+class AsyncLeetCodeClient:
+    """Asyncio counterpart of LeetCodeClient
+
+    All requests share one aiohttp session and a semaphore, so at most
+    `max_in_flight` GraphQL calls are outstanding at any time no matter how
+    many questions are being fetched concurrently.
+
+    Usage:
+        async with AsyncLeetCodeClient(max_in_flight=32) as client:
+            solutions = await client.get_python_solutions('two-sum')
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, max_in_flight=16, max_retries=HTTP_MAX_RETRIES, timeout=HTTP_TIMEOUT, rate_limiter=None,
+                 cache=None):
+        self.base_url = base_url
+        self.headers = build_headers()
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self._semaphore = None
+        self._session = None
+
+    async def __aenter__(self):
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight)
+        self._session = aiohttp.ClientSession(
+            headers=self.headers,
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._session.close()
+
+    async def execute_query(self, query, variables=None):
+        # The cache is a local SQLite file, quick enough to query inline
+        if self.cache is not None:
+            cached = self.cache.get(query, variables)
+            if cached is not None:
+                return cached
+
+        payload = {'query': query, 'variables': variables}
+
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                await asyncio.sleep(self.rate_limiter.reserve())
+
+            # Backoff sleeps happen outside the semaphore so a throttled
+            # request does not hold a slot other requests could use
+            async with self._semaphore:
+                started = time.monotonic()
+                try:
+                    async with self._session.post(self.base_url, json=payload) as response:
+                        if self.rate_limiter is not None:
+                            self.rate_limiter.record(time.monotonic() - started, response.status == 429)
+                        if response.status not in RETRY_STATUSES or attempt == self.max_retries:
+                            response.raise_for_status()
+                            result = await response.json(content_type=None)
+                            if self.cache is not None:
+                                self.cache.put(query, variables, result)
+                            return result
+                        delay = retry_delay(attempt, response.headers.get('Retry-After'))
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    if attempt == self.max_retries:
+                        raise
+                    delay = retry_delay(attempt)
+            await asyncio.sleep(delay)
+
+    async def get_question_page(self, limit=50, skip=0):
+        """One page of the catalog as {'total': catalog size, 'questions': [...]}"""
+        variables = {
+            "categorySlug": "all-code-essentials",
+            "limit": limit,
+            "skip": skip,
+            "filters": {}
+        }
+        result = await self.execute_query(GET_QUESTIONS, variables)
+        return result['data']['problemsetQuestionList']
+
+    async def get_questions(self, limit=50, skip=0):
+        return (await self.get_question_page(limit, skip))['questions']
+
+    async def list_python_solutions(self, question_slug, skip=0, first=15, order_by="HOT", tag_slugs=["python3"]):
+        variables = {
+            "questionSlug": question_slug,
+            "skip": skip,
+            "first": first,
+            "orderBy": order_by,
+            "tagSlugs": tag_slugs
+        }
+        result = await self.execute_query(GET_PYTHON_SOLUTION_IDS, variables)
+        return [edge['node'] for edge in result['data']['ugcArticleSolutionArticles']['edges']]
+
+    async def get_solution_details(self, topic_ids):
+        chunks = [
+            topic_ids[start:start + SOLUTION_DETAIL_BATCH_SIZE]
+            for start in range(0, len(topic_ids), SOLUTION_DETAIL_BATCH_SIZE)
+        ]
+        # Chunks only exist when a question has more solutions than fit in
+        # one batched request; fetch those concurrently
+        results = await asyncio.gather(*(self.execute_query(*solution_details_request(chunk)) for chunk in chunks))
+        return [
+            detail
+            for chunk, result in zip(chunks, results)
+            for detail in parse_solution_details(chunk, result)
+        ]
+
+    async def get_python_solutions(self, question_slug, skip=0, first=15, order_by="HOT", tag_slugs=["python3"]):
+        nodes = await self.list_python_solutions(question_slug, skip, first, order_by, tag_slugs)
+        return await self.get_solution_details([node['topicId'] for node in nodes])
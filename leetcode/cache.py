@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zstandard
+from config import HTTP_CACHE_MAX_BYTES, HTTP_CACHE_TTLS, HTTP_CACHE_DEFAULT_TTL, SQLITE_BUSY_TIMEOUT_MS
+
+_OPERATION = re.compile(r'query\s+(\w+)')
+
+class CacheMiss(Exception):
+    """Raised in offline mode for a query that was never cached"""
+
+def operation_name(query):
+    """The GraphQL operation name, which selects the TTL of a query"""
+    match = _OPERATION.search(query)
+    return match.group(1) if match else None
+
+def cache_key(query, variables):
+    """Content address of a request: hash of the query text and its canonical variables"""
+    payload = json.dumps({'query': query, 'variables': variables}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class ResponseCache:
+    """On-disk cache of GraphQL responses shared by every process of a crawl
+
+    Responses are stored zstd-compressed in a SQLite file under `directory`,
+    keyed by cache_key. Entries expire after the TTL configured for their
+    operation, and once the cache outgrows `max_bytes` the least recently
+    used entries are evicted. In offline mode expired entries are still
+    served and a miss raises CacheMiss instead of going to the network.
+
+    Usage:
+        cache = ResponseCache('.http_cache')
+        client = LeetCodeClient(cache=cache)
+    """
+
+    def __init__(self, directory, max_bytes=HTTP_CACHE_MAX_BYTES, ttls=HTTP_CACHE_TTLS, offline=False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttls = ttls
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        self._pid = None
+        self._size = 0
+        self._lock = threading.RLock()
+
+    def __getstate__(self):
+        # Shipped to worker processes without the connection or lock
+        state = self.__dict__.copy()
+        state.update(_connection=None, _pid=None, _lock=None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def _connect(self):
+        # Connections cannot cross a fork, so each worker opens its own
+        if self._connection is None or self._pid != os.getpid():
+            os.makedirs(self.directory, exist_ok=True)
+            self._connection = sqlite3.connect(
+                os.path.join(self.directory, 'responses.sqlite'),
+                timeout=SQLITE_BUSY_TIMEOUT_MS / 1000, isolation_level=None, check_same_thread=False
+            )
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, operation TEXT, body BLOB NOT NULL, '
+                'size INTEGER NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            self._connection.execute('CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at)')
+            self._size = self._connection.execute('SELECT total(size) FROM responses').fetchone()[0]
+            self._pid = os.getpid()
+        return self._connection
+
+    def ttl(self, query):
+        return self.ttls.get(operation_name(query), HTTP_CACHE_DEFAULT_TTL)
+
+    def get(self, query, variables=None):
+        """Return the cached response, or None when missing or expired (online mode only)"""
+        key = cache_key(query, variables)
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute('SELECT body, stored_at FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                connection.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), key))
+
+        if row is None or (not self.offline and time.time() - row[1] > self.ttl(query)):
+            self.misses += 1
+            if self.offline:
+                raise CacheMiss(f"No cached response for {operation_name(query)} {json.dumps(variables)}")
+            return None
+
+        self.hits += 1
+        return json.loads(zstandard.ZstdDecompressor().decompress(row[0]))
+
+    def put(self, query, variables, response):
+        """Store a successful response; responses carrying GraphQL errors are not cached"""
+        if self.offline or response.get('errors'):
+            return
+        body = zstandard.ZstdCompressor().compress(json.dumps(response).encode('utf-8'))
+        now = time.time()
+        key = cache_key(query, variables)
+        with self._lock:
+            connection = self._connect()
+            replaced = connection.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            connection.execute(
+                'INSERT OR REPLACE INTO responses (key, operation, body, size, stored_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, operation_name(query), body, len(body), now, now)
+            )
+            # A replaced entry no longer counts towards the size
+            self._size += len(body) - (replaced[0] if replaced else 0)
+            if self._size > self.max_bytes:
+                self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the cache is 10% under its size limit"""
+        with self._lock:
+            connection = self._connect()
+            # Keep the most recently used entries that fit under the target
+            connection.execute(
+                'DELETE FROM responses WHERE key IN (SELECT key FROM ('
+                'SELECT key, sum(size) OVER (ORDER BY accessed_at DESC, key) AS kept FROM responses'
+                ') WHERE kept > ?)',
+                (self.max_bytes * 0.9,)
+            )
+            # Other processes share the file, so take its real size
+            self._size = connection.execute('SELECT total(size) FROM responses').fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._connect().execute('DELETE FROM responses')
+            self._size = 0
+
+    def counts(self):
+        """(hits, misses) so far, for workers to report back to the scheduling process"""
+        return self.hits, self.misses
+
+    def add_counts(self, hits, misses):
+        """Add hits and misses counted by a worker's copy of the cache"""
+        self.hits += hits
+        self.misses += misses
+
+    def stats(self):
+        total = self.hits + self.misses
+        return f"HTTP cache: {self.hits} hits, {self.misses} misses ({self.hits / total * 100 if total else 0:.0f}% hit rate)"
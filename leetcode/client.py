@@ -1,23 +1,141 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
 import requests
-from config import LEETCODE_SESSION_TOKEN, CSRF_TOKEN
-from .queries import GET_QUESTIONS, GET_PYTHON_SOLUTIONS, GET_SOLUTION_DETAIL
-from database.models import Attempt, DifficultyRating
+from requests.adapters import HTTPAdapter
+from config import (
+    LEETCODE_SESSION_TOKEN, CSRF_TOKEN, HTTP_POOL_SIZE, HTTP_TIMEOUT,
+    HTTP_MAX_RETRIES, HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX, HTTP_RETRY_AFTER_MAX, SOLUTION_DETAIL_BATCH_SIZE
+)
+from .queries import GET_QUESTIONS, GET_QUESTION_CONTENT, GET_PYTHON_SOLUTION_IDS, build_solution_details_query
+
+DEFAULT_BASE_URL = 'https://leetcode.com/graphql'
+
+# Throttling and transient server errors worth retrying
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def build_headers():
+    """Headers sent with every GraphQL request"""
+    return {
+        'Cookie': f'LEETCODE_SESSION={LEETCODE_SESSION_TOKEN}',
+        'x-csrftoken': CSRF_TOKEN,
+        'Content-Type': 'application/json'
+    }
+
+def parse_solution_detail(solution_data, topic_id=None):
+    """Keep only the solution fields we store"""
+    return {
+        'topic_id': str(topic_id) if topic_id is not None else None,
+        'content': solution_data['content'],
+        'summary': solution_data['summary'],
+        'author_name': solution_data['author']['userName'],
+        'created_at': solution_data['createdAt'],
+        'updated_at': solution_data['updatedAt']
+    }
+
+def solution_details_request(topic_ids):
+    """Query and variables fetching all `topic_ids` in one aliased request"""
+    variables = {f'topicId{i}': topic_id for i, topic_id in enumerate(topic_ids)}
+    return build_solution_details_query(len(topic_ids)), variables
+
+def parse_solution_details(topic_ids, result):
+    """Unpack an aliased detail response, skipping solutions that failed"""
+    data = result.get('data') or {}
+    detailed_solutions = []
+    for i, topic_id in enumerate(topic_ids):
+        solution_data = data.get(f'detail{i}')
+        if solution_data:
+            detailed_solutions.append(parse_solution_detail(solution_data, topic_id))
+        else:
+            print(f"Failed to get details for topicId: {topic_id}")
+            print(f"Response: {result.get('errors', result)}")
+    return detailed_solutions
+
+def retry_delay(attempt, retry_after=None):
+    """Seconds to wait before retry number `attempt` (0-based)
+
+    Honors a Retry-After header (delta-seconds or HTTP-date) when the server
+    sends one, up to HTTP_RETRY_AFTER_MAX seconds, otherwise uses
+    exponential backoff with full jitter.
+    """
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+                delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            return min(HTTP_RETRY_AFTER_MAX, max(0.0, delay))
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2 ** attempt))
 
 class LeetCodeClient:
-    def __init__(self, base_url='https://leetcode.com/graphql'):
+    """GraphQL client backed by a pooled keep-alive session
+
+    Create one client per process and reuse it: connections stay open across
+    queries, and 429/5xx responses are retried with backoff instead of
+    failing the caller. An optional ResponseCache answers repeated queries
+    from disk.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, pool_size=HTTP_POOL_SIZE, max_retries=HTTP_MAX_RETRIES, timeout=HTTP_TIMEOUT, rate_limiter=None,
+                 cache=None):
         self.base_url = base_url
-        self.headers = {
-            'Cookie': f'LEETCODE_SESSION={LEETCODE_SESSION_TOKEN}',
-            'x-csrftoken': CSRF_TOKEN,
-            'Content-Type': 'application/json'
-        }
+        self.headers = build_headers()
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def close(self):
+        self.session.close()
 
     def execute_query(self, query, variables=None):
-        response = requests.post(self.base_url, json={'query': query, 'variables': variables}, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        # Cache hits skip the rate limiter too; they never reach the server
+        if self.cache is not None:
+            cached = self.cache.get(query, variables)
+            if cached is not None:
+                return cached
 
-    def get_questions(self, limit=50, skip=0):
+        payload = {'query': query, 'variables': variables}
+
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                time.sleep(self.rate_limiter.reserve())
+
+            started = time.monotonic()
+            try:
+                response = self.session.post(self.base_url, json=payload, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(retry_delay(attempt))
+                continue
+
+            if self.rate_limiter is not None:
+                self.rate_limiter.record(time.monotonic() - started, response.status_code == 429)
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                time.sleep(retry_delay(attempt, response.headers.get('Retry-After')))
+                continue
+
+            response.raise_for_status()
+            result = response.json()
+            if self.cache is not None:
+                self.cache.put(query, variables, result)
+            return result
+
+    def get_question_page(self, limit=50, skip=0):
+        """One page of the catalog as {'total': catalog size, 'questions': [...]}"""
         variables = {
             "categorySlug": "all-code-essentials",
             "limit": limit,
@@ -25,13 +143,23 @@ class LeetCodeClient:
             "filters": {}
         }
         result = self.execute_query(GET_QUESTIONS, variables)
-        return result['data']['problemsetQuestionList']['questions']
+        return result['data']['problemsetQuestionList']
+
+    def get_questions(self, limit=50, skip=0):
+        return self.get_question_page(limit, skip)['questions']
+
+    def get_question_content(self, title_slug):
+        """Return the HTML statement of a question, None for paid-only questions"""
+        result = self.execute_query(GET_QUESTION_CONTENT, {"titleSlug": title_slug})
+        question = result['data']['question']
+        return question['content'] if question else None
 
     def get_total_questions(self):
-        return 5000
+        """Size of the catalog, as reported by the question list"""
+        return self.get_question_page(limit=1)['total']
 
-    def get_python_solutions(self, question_slug, skip=0, first=15, order_by="HOT", tag_slugs=["python3"]):
-        # First get the solution articles list
+    def list_python_solutions(self, question_slug, skip=0, first=15, order_by="HOT", tag_slugs=["python3"]):
+        """List solution articles for a question as {topicId, updatedAt} nodes"""
         variables = {
             "questionSlug": question_slug,
             "skip": skip,
@@ -39,60 +167,19 @@ class LeetCodeClient:
             "orderBy": order_by,
             "tagSlugs": tag_slugs
         }
-        result = self.execute_query(GET_PYTHON_SOLUTIONS, variables)
-        solutions = result['data']['ugcArticleSolutionArticles']['edges']
-        
-        # Then get detailed content for each solution
+        result = self.execute_query(GET_PYTHON_SOLUTION_IDS, variables)
+        return [edge['node'] for edge in result['data']['ugcArticleSolutionArticles']['edges']]
+
+    def get_solution_details(self, topic_ids):
+        """Fetch solution details, SOLUTION_DETAIL_BATCH_SIZE per request"""
         detailed_solutions = []
-        for solution in solutions:
-            node = solution['node']
-            detail_vars = {
-                "topicId": node['topicId']
-            }
-            
-            detail_result = self.execute_query(GET_SOLUTION_DETAIL, detail_vars)
-            
-            if 'data' in detail_result and detail_result['data']['ugcArticleSolutionArticle']:
-                solution_data = detail_result['data']['ugcArticleSolutionArticle']
-                detailed_solution = {
-                    'content': solution_data['content'],
-                    'summary': solution_data['summary'],
-                    'author_name': solution_data['author']['userName'],
-                    'created_at': solution_data['createdAt'],
-                    'updated_at': solution_data['updatedAt']
-                }
-                detailed_solutions.append(detailed_solution)
-            else:
-                print(f"Failed to get details for topicId: {detail_vars['topicId']}")
-                print(f"Response: {detail_result}")
-        
+        for start in range(0, len(topic_ids), SOLUTION_DETAIL_BATCH_SIZE):
+            chunk = topic_ids[start:start + SOLUTION_DETAIL_BATCH_SIZE]
+            result = self.execute_query(*solution_details_request(chunk))
+            detailed_solutions.extend(parse_solution_details(chunk, result))
         return detailed_solutions
 
-    def record_attempt(self, question_id: int, difficulty: DifficultyRating, session):
-        """
-        Record an attempt for a question and calculate next review date
-        
-        Args:
-            question_id: ID of the question attempted
-            difficulty: DifficultyRating enum value (HARD/MEDIUM/EASY)
-            session: SQLAlchemy session
-        
-        Returns:
-            Attempt: The created attempt object
-        """
-        attempt = Attempt(
-            question_id=question_id,
-            difficulty_rating=difficulty
-        )
-        
-        # Calculate next review date using SM-2 algorithm
-        attempt.calculate_next_review(difficulty)
-        
-        # Add and commit to database
-        session.add(attempt)
-        session.commit()
-        
-        print(f"\nRecorded attempt for question {question_id}")
-        print(f"Next review scheduled for: {attempt.next_review_at}")
-        
-        return attempt
\ No newline at end of file
+    def get_python_solutions(self, question_slug, skip=0, first=15, order_by="HOT", tag_slugs=["python3"]):
+        # One request for the article list, then one batched request for the details
+        nodes = self.list_python_solutions(question_slug, skip, first, order_by, tag_slugs)
+        return self.get_solution_details([node['topicId'] for node in nodes])
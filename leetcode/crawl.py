@@ -0,0 +1,372 @@
+import asyncio
+import multiprocessing
+import queue
+import time
+from contextlib import nullcontext
+from functools import partial
+from tqdm import tqdm
+from config import FETCH_RATE_LIMIT, WRITER_QUEUE_SIZE, CATALOG_PAGE_SIZE
+from database.db import SessionLocal
+from database.bulk import bulk_store_questions
+from database.writer import DatabaseWriter, checkpoint_record
+from database.checkpoints import (
+    completed_slugs, known_solution_versions, known_content_hashes, select_changed, mark_question_done
+)
+from .client import LeetCodeClient, DEFAULT_BASE_URL
+from .dedup import Deduplicator, DedupStats
+from .ratelimit import TokenBucket, ThroughputReporter, start_rate_limiter
+from .workpool import WorkScheduler
+
+def question_record(question_data):
+    """Map a problemsetQuestionList entry onto Question columns"""
+    return {
+        'title': question_data['title'],
+        'title_slug': question_data['titleSlug'],
+        'difficulty': question_data['difficulty'],
+        'frontend_id': question_data['frontendQuestionId'],
+        'ac_rate': str(question_data['acRate']),
+        'paid_only': question_data.get('paidOnly'),
+        'has_solution': question_data.get('hasSolution'),
+        'topic_tags': [{'name': tag['name'], 'slug': tag['slug']} for tag in question_data.get('topicTags') or []]
+    }
+
+def is_crawlable(question_data):
+    """Whether a listed question has solutions to fetch: not paid-only and marked hasSolution"""
+    return not question_data.get('paidOnly') and question_data.get('hasSolution', True)
+
+def fetch_question_solutions(client, question_data, versions=None, incremental=False):
+    """Fetch the solutions of a question that still need downloading
+
+    In incremental mode only solutions that are new or whose updatedAt differs
+    from the checkpoint ledger have their details fetched.
+    """
+    nodes = client.list_python_solutions(question_data['titleSlug'])
+    if incremental:
+        nodes = select_changed(nodes, versions or {})
+    return client.get_solution_details([node['topicId'] for node in nodes])
+
+def build_record(question_obj, solutions, deduplicator, known_hashes=None):
+    """Assemble a fetched question record, dropping duplicate solutions
+
+    Duplicates never reach the database or batch files; they travel in
+    record['duplicates'] so the checkpoint ledger remembers them.
+    """
+    kept, duplicates = deduplicator.filter(solutions, known_hashes)
+    return {'question': question_obj, 'solutions': kept, 'duplicates': duplicates}
+
+def store_batch(session, batch_results, storage_type):
+    """Persist fetched records and commit the session, ledger included
+
+    In file mode the records were already appended to a JSONL file as they
+    were fetched, so only the ledger is written here.
+    """
+    if storage_type == 'db':
+        bulk_store_questions(session, batch_results)
+    for record in batch_results:
+        mark_question_done(session, record['question']['title_slug'], record['solutions'], record.get('duplicates', []))
+    session.commit()
+
+def open_question_file(compression=None):
+    """Open this process's JSONL output file under batch_data/
+
+    Each process appends to its own file, so parallel workers never
+    interleave partial lines.
+    """
+    import os
+    from storage.jsonl import JsonlWriter, JSONL_SUFFIXES
+
+    return JsonlWriter(f'batch_data/questions-{os.getpid()}{JSONL_SUFFIXES[compression]}', compression)
+
+# One pooled client per worker process, reused by every task it handles
+_worker_client = None
+# This worker's JSONL file in file mode, opened by its first task
+_worker_output = None
+
+def get_worker_client(rate_limiter=None, http_cache=None, base_url=DEFAULT_BASE_URL):
+    """Return this process's shared LeetCodeClient, creating it on first use"""
+    global _worker_client
+    if _worker_client is None:
+        _worker_client = LeetCodeClient(base_url=base_url, rate_limiter=rate_limiter, cache=http_cache)
+    return _worker_client
+
+def get_worker_output(compression=None):
+    """Return this process's JSONL output file, opening it on first use
+
+    Every record is flushed as it is written, so nothing is lost when the
+    pool ends the worker without closing the file.
+    """
+    global _worker_output
+    if _worker_output is None:
+        _worker_output = open_question_file(compression)
+    return _worker_output
+
+def init_worker(rate_limiter=None, http_cache=None, base_url=DEFAULT_BASE_URL):
+    """Pool initializer creating the worker's client before its first task"""
+    get_worker_client(rate_limiter, http_cache, base_url)
+
+def process_question(task, incremental=False, storage_type='db', file_compression=None):
+    """Fetch the solutions of one listed question in a worker process
+
+    Args:
+        task (dict): The 'question' from the catalog listing, plus its
+            checkpoint 'versions' and content 'hashes' for incremental crawls
+        incremental (bool): Only fetch solutions that are new or changed
+        storage_type (str): 'file' appends the record to this worker's own
+            JSONL file as soon as it is fetched
+        file_compression (str): Compression of that file, see storage/jsonl.py
+
+    Workers never touch the database; the scheduling process stores what
+    they send back. A straggler backup may append a question twice in file
+    mode, which is harmless as loading upserts by topic_id.
+
+    Returns:
+        tuple: (the record as built by build_record, stripped to its
+        checkpoint in file mode, and the (hits, misses) of the HTTP cache
+        while fetching it)
+    """
+    client = get_worker_client()
+    hits, misses = client.cache.counts() if client.cache is not None else (0, 0)
+    question_data = task['question']
+    slug = question_data['titleSlug']
+    try:
+        solutions = fetch_question_solutions(client, question_data, task['versions'], incremental)
+    except Exception as e:
+        # Exceptions cross back to the parent pickled; keep them plain
+        raise Exception(f"Error fetching {slug}: {str(e)}")
+    record = build_record(question_record(question_data), solutions, Deduplicator(), task['hashes'])
+    if storage_type == 'file':
+        get_worker_output(file_compression).write({'question': record['question'], 'solutions': record['solutions']})
+        record = checkpoint_record(record)
+    if client.cache is None:
+        return record, (0, 0)
+    after_hits, after_misses = client.cache.counts()
+    return record, (after_hits - hits, after_misses - misses)
+
+def list_questions(client, total_questions=None, page_size=CATALOG_PAGE_SIZE):
+    """List the first `total_questions` questions of the catalog, all of them when None
+
+    The first page reports the catalog size, so the listing stops at the
+    real end of the catalog instead of paging past it.
+
+    Returns:
+        tuple: (catalog size, listed questions)
+    """
+    limit = page_size if total_questions is None else min(page_size, total_questions)
+    first = client.get_question_page(limit=limit, skip=0)
+    catalog_size = first['total']
+    wanted = catalog_size if total_questions is None else min(catalog_size, total_questions)
+    questions = first['questions']
+    while len(questions) < wanted:
+        page = client.get_questions(limit=min(page_size, wanted - len(questions)), skip=len(questions))
+        if not page:
+            break
+        questions.extend(page)
+    return catalog_size, questions[:wanted]
+
+def store_catalog(session, questions):
+    """Upsert every listed question, crawlable or not, and commit"""
+    bulk_store_questions(session, [{'question': question_record(question_data), 'solutions': []}
+                                   for question_data in questions])
+    session.commit()
+
+def select_crawlable(questions):
+    """Drop paid-only questions and those without solutions, reporting how many"""
+    crawlable = [question_data for question_data in questions if is_crawlable(question_data)]
+    print(f"Skipping {len(questions) - len(crawlable)} paid-only or solution-less questions")
+    return crawlable
+
+def fetch_questions(session, total_questions, storage_type='db', rate_limit=FETCH_RATE_LIMIT, incremental=False,
+                    file_compression=None, http_cache=None, num_proc=None, base_url=DEFAULT_BASE_URL):
+    """Fetch and store questions from LeetCode on a pool of worker processes
+
+    This process lists the first `total_questions` questions of the catalog
+    (all of them when None) in a few large pages and stores them, paid-only
+    ones included. Questions that are paid-only or have no solutions are not
+    crawled, neither are those already in the checkpoint ledger (unless
+    `incremental`). The rest are handed to a
+    WorkScheduler one question per task, one task at a time per free
+    worker, so a failing question is retried, backed up or given up on
+    alone. All workers draw from one token bucket hosted in a manager
+    process, so `rate_limit` requests per second is a global budget (0
+    disables it). In file mode each worker appends its records to its own
+    JSONL file as they are fetched. The records, or only their checkpoints
+    in file mode, come back to this process, which streams them to one
+    DatabaseWriter thread. `num_proc` defaults to one worker per CPU.
+
+    Returns:
+        int: Number of questions handed to the writer
+    """
+    print(f"Storage type: {storage_type}")
+
+    if rate_limit:
+        print(f"Rate limit: {rate_limit} requests/s across all workers")
+        limiter_manager, bucket = start_rate_limiter(rate_limit)
+        reporter = ThroughputReporter(bucket)
+    else:
+        limiter_manager, bucket = None, None
+        reporter = nullcontext()
+
+    try:
+        catalog_client = LeetCodeClient(base_url=base_url, rate_limiter=bucket, cache=http_cache)
+        catalog_size, questions = list_questions(catalog_client, total_questions)
+        catalog_client.close()
+        print(f"Listed {len(questions)} of {catalog_size} questions in the catalog")
+        store_catalog(session, questions)
+        questions = select_crawlable(questions)
+
+        slugs = [question_data['titleSlug'] for question_data in questions]
+        versions = known_solution_versions(session, slugs) if incremental else {}
+        hashes = known_content_hashes(session, slugs) if incremental else {}
+        if not incremental:
+            done = completed_slugs(session, slugs)
+            pending = [question_data for question_data in questions if question_data['titleSlug'] not in done]
+            print(f"Skipping {len(questions) - len(pending)} questions already in the checkpoint ledger")
+            questions = pending
+        # End the read transaction so it does not pin the WAL for the whole crawl
+        session.commit()
+
+        tasks = [{
+            'question': question_data,
+            'versions': versions.get(question_data['titleSlug']),
+            'hashes': hashes.get(question_data['titleSlug'])
+        } for question_data in questions]
+
+        num_proc = max(1, min(num_proc or multiprocessing.cpu_count(), len(tasks)))
+        print(f"Using {num_proc} workers")
+
+        fetch = partial(process_question, incremental=incremental, storage_type=storage_type,
+                        file_compression=file_compression)
+        scheduler = WorkScheduler(fetch, num_proc, initializer=init_worker, initargs=(bucket, http_cache, base_url))
+        write_queue = queue.Queue(WRITER_QUEUE_SIZE)
+        started = time.monotonic()
+        with scheduler, DatabaseWriter(write_queue) as writer, reporter, \
+                tqdm(total=len(questions), desc="Fetching questions", unit='question') as progress:
+            for _, (record, cache_counts) in scheduler.run(tasks):
+                if http_cache is not None:
+                    http_cache.add_counts(*cache_counts)
+                write_queue.put(('store' if storage_type == 'db' else 'checkpoint', record))
+                progress.update(1)
+                progress.set_postfix(retried=scheduler.retried, backups=scheduler.backups, failed=len(scheduler.failed))
+        elapsed = time.monotonic() - started
+    finally:
+        if limiter_manager is not None:
+            limiter_manager.shutdown()
+    print(f"Database writer committed {writer.written} questions")
+    print(writer.dedup.report())
+    print(f"Questions: {scheduler.completed} completed, {scheduler.retried} retried, "
+          f"{scheduler.backups} straggler backups, {len(scheduler.failed)} failed")
+    for task, error in scheduler.failed:
+        print(f"  Gave up on {task['question']['titleSlug']}: {error}")
+
+    total_fetched = writer.written
+    print(f"\nFetched {total_fetched} questions with their solutions in {elapsed:.1f}s "
+          f"({total_fetched / elapsed if elapsed else 0:.1f} questions/s)!")
+    if http_cache is not None:
+        print(http_cache.stats())
+    return total_fetched
+
+async def fetch_questions_async(total_questions, storage_type='db', batch_size=10, max_in_flight=16, base_url=None,
+                                rate_limit=FETCH_RATE_LIMIT, incremental=False, file_compression=None, http_cache=None):
+    """Fetch and store questions using the asyncio engine
+
+    Questions are pipelined: up to `max_in_flight` questions are being fetched
+    at once, their solution detail calls fan out concurrently, and results are
+    stored in completion order from this single process. The catalog is
+    listed, stored and filtered, and the checkpoint ledger honored, the same
+    way as in fetch_questions. Questions that still fail after the client's
+    retries are skipped and listed once the crawl ends.
+    """
+    from .async_client import AsyncLeetCodeClient
+
+    print(f"Storage type: {storage_type}")
+    print(f"Async engine with {max_in_flight} requests in flight")
+
+    # Everything runs in this process, so the bucket needs no manager
+    bucket = TokenBucket(rate_limit) if rate_limit else None
+
+    async with AsyncLeetCodeClient(base_url=base_url or DEFAULT_BASE_URL, max_in_flight=max_in_flight, rate_limiter=bucket,
+                                   cache=http_cache) as client:
+        # The first page reports the catalog size; the rest are listed concurrently
+        limit = CATALOG_PAGE_SIZE if total_questions is None else min(CATALOG_PAGE_SIZE, total_questions)
+        first = await client.get_question_page(limit=limit)
+        wanted = first['total'] if total_questions is None else min(first['total'], total_questions)
+        pages = await asyncio.gather(*(
+            client.get_questions(limit=min(CATALOG_PAGE_SIZE, wanted - skip), skip=skip)
+            for skip in range(len(first['questions']), wanted, CATALOG_PAGE_SIZE)
+        ))
+        questions = [*first['questions'], *(question_data for page in pages for question_data in page)][:wanted]
+        print(f"Listed {len(questions)} of {first['total']} questions in the catalog")
+
+        session = SessionLocal()
+        store_catalog(session, questions)
+        questions = select_crawlable(questions)
+        done = completed_slugs(session)
+        versions = known_solution_versions(session) if incremental else {}
+        hashes = known_content_hashes(session) if incremental else {}
+        if not incremental:
+            pending = [question_data for question_data in questions if question_data['titleSlug'] not in done]
+            print(f"Skipping {len(questions) - len(pending)} questions already in the checkpoint ledger")
+            questions = pending
+
+        # Bound the number of questions in flight so results start streaming
+        # back before every list call has been queued
+        question_slots = asyncio.Semaphore(max_in_flight)
+        failed = []
+
+        async def fetch_one(question_data):
+            async with question_slots:
+                slug = question_data['titleSlug']
+                try:
+                    nodes = await client.list_python_solutions(slug)
+                    if incremental:
+                        nodes = select_changed(nodes, versions.get(slug, {}))
+                    solutions = await client.get_solution_details([node['topicId'] for node in nodes])
+                except Exception as e:
+                    # Reported together at the end, like the sync engine's give-ups
+                    failed.append((slug, e))
+                    return None
+                return question_record(question_data), solutions
+
+        tasks = [asyncio.create_task(fetch_one(question_data)) for question_data in questions]
+
+        deduplicator = Deduplicator()
+        dedup = DedupStats()
+        batch_results = []
+        total_fetched = 0
+        reporter = ThroughputReporter(bucket) if bucket is not None else nullcontext()
+        output = open_question_file(file_compression) if storage_type == 'file' else nullcontext()
+        try:
+            with reporter, output:
+                for future in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Fetching questions"):
+                    result = await future
+                    if result is None:
+                        continue
+                    question_obj, solutions = result
+
+                    record = build_record(question_obj, solutions, deduplicator, hashes.get(question_obj['title_slug']))
+                    dedup.add(record)
+                    if storage_type == 'file':
+                        output.write({'question': question_obj, 'solutions': record['solutions']})
+                        record = checkpoint_record(record)
+                    batch_results.append(record)
+                    total_fetched += 1
+
+                    if total_fetched % batch_size == 0:
+                        store_batch(session, batch_results, storage_type)
+                        batch_results = []
+
+            store_batch(session, batch_results, storage_type)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    print(dedup.report())
+    print(f"Questions: {total_fetched} completed, {len(failed)} failed")
+    for slug, error in failed:
+        print(f"  Gave up on {slug}: {error}")
+    print(f"\nFetched {total_fetched} questions with their solutions!")
+    if http_cache is not None:
+        print(http_cache.stats())
+    return total_fetched
@@ -0,0 +1,129 @@
+import hashlib
+import re
+import zlib
+import numpy as np
+from config import NEAR_DUPLICATE_THRESHOLD, MINHASH_PERMUTATIONS, SHINGLE_SIZE
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_TOKEN = re.compile(r'\w+')
+
+def normalize_content(content):
+    """Lowercase, unescape literal \\n sequences and collapse whitespace"""
+    return ' '.join(content.replace('\\n', '\n').lower().split())
+
+def content_hash(content):
+    """Hash of the normalized content, equal for copies differing only in whitespace or case"""
+    return hashlib.sha1(normalize_content(content).encode('utf-8')).hexdigest()
+
+class MinHasher:
+    """MinHash signatures over word shingles
+
+    The fraction of equal signature slots between two documents estimates
+    the Jaccard similarity of their shingle sets.
+    """
+
+    def __init__(self, num_perm=MINHASH_PERMUTATIONS, shingle_size=SHINGLE_SIZE, seed=1):
+        rng = np.random.RandomState(seed)
+        self.shingle_size = shingle_size
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, content):
+        tokens = _TOKEN.findall(normalize_content(content))
+        size = min(self.shingle_size, len(tokens)) or 1
+        return {
+            zlib.crc32(' '.join(tokens[i:i + size]).encode('utf-8'))
+            for i in range(max(1, len(tokens) - size + 1))
+        }
+
+    def signature(self, content):
+        hashes = np.fromiter(self.shingles(content), dtype=np.uint64)
+        # 32-bit shingle hashes times 32-bit coefficients cannot overflow uint64
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME).min(axis=1)
+
+    @staticmethod
+    def similarity(left, right):
+        return float(np.mean(left == right))
+
+class Deduplicator:
+    """Drop exact and near-duplicate solutions of a question before storage
+
+    Exact copies are detected by content hash, also against `known_hashes`
+    from earlier crawls; near copies by MinHash similarity among the
+    solutions fetched together for one question.
+    """
+
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD, hasher=None):
+        self.threshold = threshold
+        self.hasher = hasher or MinHasher()
+
+    def filter(self, solutions, known_hashes=None):
+        """Split solutions into kept ones and duplicates
+
+        Args:
+            solutions: Parsed solution dicts, in ranking order, so the most
+                popular copy is the one kept
+            known_hashes: {content_hash: topic_id} already stored for the question
+
+        Returns:
+            tuple: (kept solutions with 'content_hash' set, duplicate ledger
+            entries with topic_id, updated_at, duplicate_of and reason)
+        """
+        known_hashes = dict(known_hashes or {})
+        kept = []
+        signatures = []
+        duplicates = []
+
+        for sol in solutions:
+            digest = content_hash(sol['content'])
+            original = known_hashes.get(digest)
+            if original is not None and original != sol['topic_id']:
+                duplicates.append(self._duplicate(sol, original, 'exact'))
+                continue
+
+            signature = self.hasher.signature(sol['content'])
+            near = next(
+                (other for other, other_signature in zip(kept, signatures)
+                 if self.hasher.similarity(signature, other_signature) >= self.threshold),
+                None
+            )
+            if near is not None:
+                duplicates.append(self._duplicate(sol, near['topic_id'], 'near'))
+                continue
+
+            known_hashes[digest] = sol['topic_id']
+            kept.append({**sol, 'content_hash': digest})
+            signatures.append(signature)
+
+        return kept, duplicates
+
+    @staticmethod
+    def _duplicate(sol, original, reason):
+        return {
+            'topic_id': sol['topic_id'],
+            'updated_at': sol['updated_at'],
+            'duplicate_of': original,
+            'reason': reason
+        }
+
+class DedupStats:
+    """Running counts of stored and skipped solutions"""
+
+    def __init__(self):
+        self.kept = 0
+        self.exact = 0
+        self.near = 0
+
+    def add(self, record):
+        self.kept += len(record['solutions'])
+        for duplicate in record.get('duplicates', []):
+            if duplicate['reason'] == 'exact':
+                self.exact += 1
+            else:
+                self.near += 1
+
+    def report(self):
+        total = self.kept + self.exact + self.near
+        ratio = (self.exact + self.near) / total * 100 if total else 0.0
+        return (f"Deduplicated {self.exact + self.near} of {total} solutions ({ratio:.1f}%): "
+                f"{self.exact} exact, {self.near} near-duplicate")
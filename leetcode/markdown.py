@@ -0,0 +1,36 @@
+import re
+
+# Opening fence, language and body up to a closing fence of the same kind.
+# LeetCode appends tab labels to the language, as in ```Python3 [].
+_FENCE = re.compile(r'^[ \t]*(`{3,}|~{3,})[ \t]*([^\s`\[]*)[^\n]*\n(.*?)^[ \t]*\1[ \t]*$', re.M | re.S)
+_ESCAPE = re.compile(r'\\(["\\nt])')
+_ESCAPES = {'n': '\n', 't': '\t', '"': '"', '\\': '\\'}
+
+# Untagged blocks count as Python; solutions are listed under the python3 tag
+PYTHON_LANGUAGES = {'', 'python', 'python3', 'py', 'py3'}
+
+def unescape(content):
+    """Undo the backslash escaping of crawled markdown
+
+    Only content without real newlines is treated as escaped, so markdown
+    loaded from elsewhere keeps its backslashes.
+    """
+    if '\n' in content:
+        return content
+    return _ESCAPE.sub(lambda match: _ESCAPES[match.group(1)], content)
+
+def parse_solution(content):
+    """Split solution markdown into explanation text and Python code
+
+    Returns:
+        dict: 'explanation' (the markdown without its code blocks), 'code'
+        (the Python blocks, separated by blank lines) and 'code_blocks'
+        (how many there were)
+    """
+    markdown = unescape(content)
+    blocks = [
+        body.rstrip() for _, language, body in _FENCE.findall(markdown)
+        if language.lower() in PYTHON_LANGUAGES
+    ]
+    explanation = re.sub(r'\n{3,}', '\n\n', _FENCE.sub('', markdown)).strip()
+    return {'explanation': explanation, 'code': '\n\n'.join(blocks), 'code_blocks': len(blocks)}
@@ -39,6 +39,14 @@ query problemsetQuestionList($categorySlug: String, $limit: Int, $skip: Int, $fi
 }
 """
 
+GET_QUESTION_CONTENT = """
+query questionContent($titleSlug: String!) {
+  question(titleSlug: $titleSlug) {
+    content
+  }
+}
+"""
+
 GET_PYTHON_SOLUTIONS = """
 query ugcArticleSolutionArticles($questionSlug: String!, $orderBy: ArticleOrderByEnum, $userInput: String, $tagSlugs: [String!], $skip: Int, $before: String, $after: String, $first: Int, $last: Int, $isMine: Boolean) {
   ugcArticleSolutionArticles(
@@ -188,4 +196,47 @@ fragment ugcSolutionArticleFragment on SolutionArticleNode {
     topLevelCommentCount
   }
 }
-"""
\ No newline at end of file
+"""
+# Trimmed variants used by the crawler: only the fields we actually store
+
+GET_PYTHON_SOLUTION_IDS = """
+query ugcArticleSolutionArticles($questionSlug: String!, $orderBy: ArticleOrderByEnum, $tagSlugs: [String!], $skip: Int, $first: Int) {
+  ugcArticleSolutionArticles(
+    questionSlug: $questionSlug
+    orderBy: $orderBy
+    tagSlugs: $tagSlugs
+    skip: $skip
+    first: $first
+  ) {
+    edges {
+      node {
+        topicId
+        updatedAt
+      }
+    }
+  }
+}
+"""
+
+SOLUTION_DETAIL_FIELDS = """
+    content
+    summary
+    createdAt
+    updatedAt
+    author {
+      userName
+    }
+"""
+
+def build_solution_details_query(count):
+    """Build one aliased query fetching `count` solution details
+
+    Variables are named topicId0..topicId{count-1} and each result comes back
+    under the matching detail0..detail{count-1} key of `data`.
+    """
+    params = ', '.join(f'$topicId{i}: ID' for i in range(count))
+    fields = ''.join(
+        f'  detail{i}: ugcArticleSolutionArticle(topicId: $topicId{i}) {{{SOLUTION_DETAIL_FIELDS}  }}\n'
+        for i in range(count)
+    )
+    return f'\nquery ugcArticleSolutionArticleBatch({params}) {{\n{fields}}}\n'
@@ -0,0 +1,120 @@
+import threading
+import time
+from multiprocessing.managers import BaseManager
+
+class TokenBucket:
+    """Requests-per-second budget shared by every fetch worker
+
+    Callers reserve a token before each request and sleep for the returned
+    delay, so the bucket itself never blocks. When the server answers with a
+    throttling response the rate is halved, then recovers additively towards
+    the configured target on every successful request.
+
+    A single instance lives in a manager process (see `start_rate_limiter`);
+    workers talk to it through a proxy over a local socket.
+    """
+
+    def __init__(self, rate, burst=None, min_rate=None):
+        self.target_rate = float(rate)
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1.0, rate))
+        self.min_rate = float(min_rate or max(self.target_rate / 20, 0.1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.completed = 0
+        self.throttled = 0
+        self.latency_total = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take one token and return the seconds to wait before using it"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def record(self, latency, throttled=False):
+        """Record a finished request and adapt the rate"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.completed += 1
+            self.latency_total += latency
+            if throttled:
+                self.throttled += 1
+                self.rate = max(self.min_rate, self.rate / 2)
+            else:
+                self.rate = min(self.target_rate, self.rate + self.target_rate / 100)
+
+    def snapshot(self):
+        """Cumulative counters used by ThroughputReporter"""
+        with self._lock:
+            return {
+                'completed': self.completed,
+                'throttled': self.throttled,
+                'latency_total': self.latency_total,
+                'rate': self.rate
+            }
+
+class RateLimiterManager(BaseManager):
+    pass
+
+RateLimiterManager.register('TokenBucket', TokenBucket)
+
+def start_rate_limiter(rate, burst=None):
+    """Start a manager process hosting a TokenBucket
+
+    Returns:
+        tuple: (manager, bucket proxy). The proxy can be pickled into worker
+        processes; call manager.shutdown() when the crawl is finished.
+    """
+    manager = RateLimiterManager()
+    manager.start()
+    return manager, manager.TokenBucket(rate, burst)
+
+class ThroughputReporter:
+    """Background thread printing per-second request counters from a bucket
+
+    Lines are written with tqdm.write so they appear above the progress bar
+    instead of breaking it.
+    """
+
+    def __init__(self, bucket, interval=1.0):
+        self.bucket = bucket
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        from tqdm import tqdm
+
+        previous = self.bucket.snapshot()
+        previous_time = time.monotonic()
+        while not self._stop.wait(self.interval):
+            current = self.bucket.snapshot()
+            now = time.monotonic()
+            completed = current['completed'] - previous['completed']
+            throttled = current['throttled'] - previous['throttled']
+            latency = current['latency_total'] - previous['latency_total']
+            avg_latency_ms = latency / completed * 1000 if completed else 0.0
+
+            tqdm.write(
+                f"[throughput] {completed / (now - previous_time):6.1f} req/s | "
+                f"avg latency {avg_latency_ms:6.0f} ms | "
+                f"throttled {throttled} | "
+                f"budget {current['rate']:.1f} req/s"
+            )
+            previous, previous_time = current, now
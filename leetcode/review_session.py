@@ -0,0 +1,134 @@
+import heapq
+import html
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from database.db import SessionLocal
+from database.models import Question, Solution, ParsedSolution
+from database.reviews import record_review, due_reviews
+from config import REVIEW_PREFETCH, REVIEW_COMMIT_EVERY
+
+# Among questions due the same day, harder ones come first
+DIFFICULTY_PRIORITY = {'Hard': 0, 'Medium': 1, 'Easy': 2}
+
+def review_priority(question, state):
+    """Heap key: due day, then question difficulty, then the most overdue"""
+    return (
+        state.next_review_at.date(),
+        DIFFICULTY_PRIORITY.get(question.difficulty, len(DIFFICULTY_PRIORITY)),
+        state.next_review_at,
+        question.id
+    )
+
+def plain_text(markup):
+    """Render a question statement or solution for the terminal"""
+    text = re.sub(r'<[^>]+>', '', markup.replace('\\n', '\n'))
+    return re.sub(r'\n{3,}', '\n\n', html.unescape(text)).strip()
+
+def load_card(question_id, client=None):
+    """Gather what a card shows: the question, its statement and its top solution
+
+    Runs on a prefetch thread, so it uses its own session.
+    """
+    session = SessionLocal()
+    try:
+        question = session.get(Question, question_id)
+        # Solutions are stored in the order the crawl ranked them
+        solution = (
+            session.query(Solution.summary, Solution.content, Solution.author_name,
+                          ParsedSolution.explanation, ParsedSolution.code)
+            .outerjoin(ParsedSolution, ParsedSolution.solution_id == Solution.id)
+            .filter(Solution.question_id == question_id)
+            .order_by(Solution.id)
+            .first()
+        )
+        card = {
+            'question_id': question.id,
+            'title': question.title,
+            'title_slug': question.title_slug,
+            'difficulty': question.difficulty,
+            'statement': None,
+            'statement_error': None,
+            'solution': dict(solution._mapping) if solution else None
+        }
+    finally:
+        session.close()
+
+    if client is not None:
+        try:
+            card['statement'] = client.get_question_content(card['title_slug'])
+        except Exception as e:
+            # Reported with the card rather than from this thread, over the card on screen
+            card['statement_error'] = type(e).__name__
+    return card
+
+class ReviewSession:
+    """Serve due questions in priority order and record their grades
+
+    Due questions go on a heap keyed by review_priority. The next
+    `prefetch` cards are loaded on background threads while the current one
+    is being reviewed, and grades are committed every `commit_every` cards
+    and when the session closes.
+
+    Usage:
+        with ReviewSession(session, client) as review:
+            for card in review:
+                review.grade(card, DifficultyRating.MEDIUM)
+    """
+
+    def __init__(self, session, client=None, prefetch=REVIEW_PREFETCH, commit_every=REVIEW_COMMIT_EVERY, now=None,
+                 limit=None):
+        self.session = session
+        self.client = client
+        self.prefetch = prefetch
+        self.commit_every = commit_every
+        self.graded = 0
+        self._pending = 0
+        self._heap = [(review_priority(question, state), question.id)
+                      for question, state in due_reviews(session, now or datetime.utcnow(), limit)]
+        heapq.heapify(self._heap)
+        self._upcoming = deque()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, prefetch))
+
+    def __len__(self):
+        return len(self._heap) + len(self._upcoming)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _fill(self):
+        while self._heap and len(self._upcoming) <= self.prefetch:
+            _, question_id = heapq.heappop(self._heap)
+            self._upcoming.append(self._executor.submit(load_card, question_id, self.client))
+
+    def __iter__(self):
+        self._fill()
+        while self._upcoming:
+            card = self._upcoming.popleft().result()
+            self._fill()
+            yield card
+
+    def grade(self, card, difficulty):
+        """Record the grade of a card; committed in batches"""
+        attempt = record_review(self.session, card['question_id'], difficulty)
+        self.graded += 1
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.commit()
+        return attempt
+
+    def commit(self):
+        self.session.commit()
+        self._pending = 0
+
+    def close(self):
+        """Commit outstanding grades and stop the prefetch threads"""
+        try:
+            if self._pending:
+                self.commit()
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
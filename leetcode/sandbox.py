@@ -0,0 +1,228 @@
+"""Run untrusted solution code in resource-limited child processes
+
+`python -I leetcode/sandbox.py` is a fork server: it imports the modules
+LeetCode solutions expect once, then for every request read from stdin
+forks a child that runs the code under CPU-time, address-space and
+file-size limits, reaps it with os.wait4 for its CPU time and peak memory,
+and answers on stdout. Forking a warm interpreter costs a fraction of
+starting a new one per solution.
+
+Each child gets its own session, /dev/null for its standard streams, no
+other file descriptors and a scratch working directory. This limits
+resources, it does not confine the code: network access and the file
+system stay reachable, so only run code you are prepared to execute.
+
+Only the standard library is imported at module level, as the server runs
+in isolated mode outside the project.
+"""
+import json
+import os
+import resource
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# What the LeetCode judge has in scope before a Python solution
+PRELUDE = '''
+from typing import *
+from collections import *
+from heapq import *
+from bisect import *
+from functools import *
+from itertools import *
+from math import *
+import collections, heapq, bisect, functools, itertools, math, operator, random, re, string, sys
+
+class ListNode:
+    def __init__(self, val=0, next=None):
+        self.val = val
+        self.next = next
+
+class TreeNode:
+    def __init__(self, val=0, left=None, right=None):
+        self.val = val
+        self.left = left
+        self.right = right
+'''
+
+# Child exit codes
+RAN, FAILED, SYNTAX_ERROR, OUT_OF_MEMORY = 0, 1, 2, 3
+
+def _describe(error):
+    return f"{type(error).__name__}: {error}"[:500]
+
+def _child(code, report_fd, namespace, cpu_seconds, memory_bytes):
+    """Compile and run `code`; returns the exit code. The compiled marker and any error go to `report_fd`"""
+    os.setsid()
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.closerange(3, report_fd)
+    os.closerange(report_fd + 1, 65536)
+    sys.stdin = open(os.devnull)
+    sys.stdout = sys.stderr = open(os.devnull, 'w')
+
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+    # Ignored for root, but keeps fork bombs in check for everyone else
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+
+    try:
+        compiled = compile(code, '<solution>', 'exec')
+    except MemoryError:
+        os.write(report_fd, b'MemoryError')
+        return OUT_OF_MEMORY
+    except (SyntaxError, ValueError) as e:
+        os.write(report_fd, _describe(e).encode())
+        return SYNTAX_ERROR
+    os.write(report_fd, b'C')
+
+    try:
+        exec(compiled, dict(namespace))
+    except MemoryError:
+        os.write(report_fd, b'MemoryError')
+        return OUT_OF_MEMORY
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            os.write(report_fd, _describe(e).encode())
+            return FAILED
+    except BaseException as e:
+        os.write(report_fd, _describe(e).encode())
+        return FAILED
+    return RAN
+
+def run(code, namespace, cpu_seconds, memory_bytes, wall_seconds):
+    """Run `code` in a forked child and describe how it went
+
+    Returns:
+        dict: status ('ok', 'syntax_error', 'error', 'timeout', 'memory' or
+        'crashed'), compiled, runtime (wall seconds), cpu_time (seconds),
+        peak_memory_kb (including the interpreter) and error
+    """
+    report_read, report_write = os.pipe()
+    started = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        os.close(report_read)
+        status = FAILED
+        try:
+            status = _child(code, report_write, namespace, cpu_seconds, memory_bytes)
+        finally:
+            os._exit(status)
+
+    os.close(report_write)
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    timer = threading.Timer(wall_seconds, kill)
+    timer.start()
+    _, wait_status, usage = os.wait4(pid, 0)
+    timer.cancel()
+    runtime = time.perf_counter() - started
+    # Anything the code left running in its session goes too
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+    with os.fdopen(report_read, 'rb') as report:
+        message = report.read(4096)
+    compiled = message.startswith(b'C')
+    error = (message[1:] if compiled else message).decode('utf-8', 'replace') or None
+
+    if os.WIFSIGNALED(wait_status):
+        signum = os.WTERMSIG(wait_status)
+        if signum == signal.SIGXCPU or timed_out.is_set():
+            status = 'timeout'
+        else:
+            status = 'crashed'
+        error = error or signal.Signals(signum).name
+    else:
+        status = {RAN: 'ok', SYNTAX_ERROR: 'syntax_error', OUT_OF_MEMORY: 'memory'}.get(
+            os.WEXITSTATUS(wait_status), 'error'
+        )
+
+    return {
+        'status': status,
+        'compiled': compiled,
+        'runtime': runtime,
+        'cpu_time': usage.ru_utime + usage.ru_stime,
+        'peak_memory_kb': usage.ru_maxrss,
+        'error': error,
+    }
+
+def serve():
+    """Fork server loop: one JSON request per stdin line, one JSON result per stdout line"""
+    namespace = {'__name__': '__main__', '__builtins__': __builtins__}
+    exec(PRELUDE, namespace)
+    with tempfile.TemporaryDirectory(prefix='sandbox-') as scratch:
+        os.chdir(scratch)
+        for line in sys.stdin:
+            request = json.loads(line)
+            result = run(request['code'], namespace, request['cpu_seconds'], request['memory_bytes'],
+                         request['wall_seconds'])
+            sys.stdout.write(json.dumps(result) + '\n')
+            sys.stdout.flush()
+
+class Sandbox:
+    """Client of a fork server subprocess, restarted if it dies
+
+    Usage:
+        with Sandbox(cpu_seconds=2, memory_bytes=256 << 20, wall_seconds=5) as sandbox:
+            result = sandbox.run(code)
+    """
+
+    def __init__(self, cpu_seconds, memory_bytes, wall_seconds):
+        self.limits = {'cpu_seconds': cpu_seconds, 'memory_bytes': memory_bytes, 'wall_seconds': wall_seconds}
+        self._server = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _start(self):
+        self._server = subprocess.Popen(
+            [sys.executable, '-I', os.path.abspath(__file__)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+        )
+
+    def close(self):
+        if self._server is not None:
+            self._server.stdin.close()
+            self._server.wait()
+            self._server = None
+
+    def run(self, code):
+        """Run `code` once under the limits; see run() for the result"""
+        if self._server is None:
+            self._start()
+        try:
+            self._server.stdin.write(json.dumps({'code': code, **self.limits}) + '\n')
+            self._server.stdin.flush()
+            line = self._server.stdout.readline()
+        except BrokenPipeError:
+            line = ''
+        if line:
+            return json.loads(line)
+
+        # The code took the server down with it, e.g. by killing its parent
+        self._server.kill()
+        self._server.wait()
+        self._server = None
+        return {'status': 'crashed', 'compiled': False, 'runtime': None, 'cpu_time': None,
+                'peak_memory_kb': None, 'error': 'Sandbox server exited'}
+
+if __name__ == '__main__':
+    serve()
@@ -0,0 +1,158 @@
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from config import CRAWL_TASK_RETRIES, CRAWL_STRAGGLER_TIMEOUT, CRAWL_TASKS_PER_WORKER
+
+class _TrackedContext:
+    """Multiprocessing context that keeps a handle on every process it starts"""
+
+    def __init__(self):
+        self._context = multiprocessing.get_context()
+        self.processes = []
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+    def Process(self, *args, **kwargs):
+        process = self._context.Process(*args, **kwargs)
+        self.processes.append(process)
+        return process
+
+class WorkScheduler:
+    """Run tasks on a process pool with retries and backup copies of stragglers
+
+    Only `tasks_per_worker` tasks per worker are queued at a time, so a
+    worker that frees up takes the next task instead of waiting behind a slow
+    one. A task that raises is resubmitted until it has failed
+    `max_retries` times. A task still unfinished after `straggler_timeout`
+    seconds gets one backup copy, and the first copy to finish wins. If a
+    worker process dies, the pool is rebuilt and the tasks it had not
+    finished are resubmitted.
+
+    Usage:
+        with WorkScheduler(fetch, num_workers=8) as scheduler:
+            for task, result in scheduler.run(tasks):
+                ...
+        print(scheduler.failed)
+    """
+
+    def __init__(self, fn, num_workers, initializer=None, initargs=(), max_retries=CRAWL_TASK_RETRIES,
+                 straggler_timeout=CRAWL_STRAGGLER_TIMEOUT, tasks_per_worker=CRAWL_TASKS_PER_WORKER):
+        self.fn = fn
+        self.num_workers = num_workers
+        self.initializer = initializer
+        self.initargs = initargs
+        self.max_retries = max_retries
+        self.straggler_timeout = straggler_timeout
+        self.tasks_per_worker = tasks_per_worker
+        self.completed = 0
+        self.retried = 0
+        self.backups = 0
+        self.failed = []
+        self._executor = None
+        self._context = _TrackedContext()
+        self._running = {}
+        self._losers = []
+
+    def __enter__(self):
+        self._start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Whatever still runs is a losing copy or an abandoned run; nobody
+        # needs its result, so do not wait for it
+        if any(not future.done() for future in [*self._running, *self._losers]):
+            for process in self._context.processes:
+                if process.is_alive():
+                    process.terminate()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _start(self):
+        self._executor = ProcessPoolExecutor(self.num_workers, mp_context=self._context, initializer=self.initializer,
+                                             initargs=self.initargs)
+
+    def run(self, tasks):
+        """Yield (task, result) for every task that succeeds, in completion order
+
+        Tasks that exhaust their retries are collected in self.failed as
+        (task, exception) pairs instead of stopping the run. `tasks` is only
+        consumed as workers free up, so a generator can build each task when
+        it is about to be submitted.
+        """
+        fresh = enumerate(tasks)
+        exhausted = False
+        pending = deque()
+        failures = {}
+        running = self._running = {}
+        finished = set()
+        backed_up = set()
+
+        def retry(task_id, task, error):
+            # Another copy may still succeed; only the last copy standing counts
+            if task_id in finished or any(other == task_id for other, _, _ in running.values()):
+                return
+            failures[task_id] = failures.get(task_id, 0) + 1
+            if failures[task_id] <= self.max_retries:
+                self.retried += 1
+                pending.append((task_id, task))
+            else:
+                finished.add(task_id)
+                self.failed.append((task, error))
+
+        def next_task():
+            # Retries go first, then tasks not yet submitted
+            nonlocal exhausted
+            if pending:
+                return pending.popleft()
+            if not exhausted:
+                item = next(fresh, None)
+                if item is not None:
+                    return item
+                exhausted = True
+            return None
+
+        while True:
+            while len(running) < self.num_workers * self.tasks_per_worker and (item := next_task()) is not None:
+                task_id, task = item
+                running[self._executor.submit(self.fn, task)] = (task_id, task, time.monotonic())
+            if not running:
+                break
+
+            done, _ = wait(running, timeout=1.0, return_when=FIRST_COMPLETED)
+            broken = next((future.exception() for future in done
+                           if isinstance(future.exception(), BrokenProcessPool)), None)
+            if broken is not None:
+                # Tasks the broken pool had not finished are lost, but those
+                # that did finish keep their results; go on with a fresh pool
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                done = list(running)
+            for future in done:
+                task_id, task, _ = running.pop(future)
+                if not future.done() or future.cancelled():
+                    retry(task_id, task, broken)
+                    continue
+                if future.exception() is not None:
+                    retry(task_id, task, future.exception())
+                    continue
+
+                if task_id in finished:
+                    continue
+                finished.add(task_id)
+                self.completed += 1
+                yield task, future.result()
+            if broken is not None:
+                self._start()
+
+            now = time.monotonic()
+            for task_id, task, submitted in list(running.values()):
+                if task_id not in backed_up and task_id not in finished and now - submitted > self.straggler_timeout:
+                    backed_up.add(task_id)
+                    self.backups += 1
+                    running[self._executor.submit(self.fn, task)] = (task_id, task, now)
+
+            # Losing copies of finished tasks run on until they end or the scheduler exits
+            for future in [future for future, (task_id, _, _) in running.items() if task_id in finished]:
+                self._losers.append(future)
+                del running[future]
@@ -0,0 +1,109 @@
+import os
+import pyarrow as pa
+import pyarrow.parquet as pq
+from database.models import Question, Solution, ParsedSolution
+from database.tags import filter_questions
+from config import EXPORT_SHARD_ROWS, EXPORT_BATCH_ROWS, EXPORT_COMPRESSION
+
+# One row per solution, denormalized with its question; explanation and code
+# come from the parse stage and are null for solutions not parsed yet
+EXPORT_SCHEMA = pa.schema([
+    ('question_id', pa.int64()),
+    ('frontend_id', pa.string()),
+    ('title', pa.string()),
+    ('title_slug', pa.string()),
+    ('difficulty', pa.string()),
+    ('ac_rate', pa.string()),
+    ('solution_id', pa.int64()),
+    ('topic_id', pa.string()),
+    ('summary', pa.string()),
+    ('content', pa.string()),
+    ('explanation', pa.string()),
+    ('code', pa.string()),
+    ('author_name', pa.string()),
+    ('created_at', pa.string()),
+    ('updated_at', pa.string()),
+])
+
+EXPORT_COLUMNS = [
+    Question.id, Question.frontend_id, Question.title, Question.title_slug,
+    Question.difficulty, Question.ac_rate, Solution.id, Solution.topic_id,
+    Solution.summary, Solution.content, ParsedSolution.explanation, ParsedSolution.code, Solution.author_name,
+    Solution.created_at, Solution.updated_at,
+]
+
+class ShardedParquetWriter:
+    """Write record batches into numbered Parquet shards of at most `shard_rows` rows"""
+
+    def __init__(self, output_dir, schema, shard_rows=EXPORT_SHARD_ROWS, compression=EXPORT_COMPRESSION):
+        self.output_dir = output_dir
+        self.schema = schema
+        self.shard_rows = shard_rows
+        self.compression = compression
+        self.shards = []
+        self.rows = 0
+        self._writer = None
+        self._rows_in_shard = 0
+
+    def _open_shard(self):
+        path = os.path.join(self.output_dir, f'train-{len(self.shards):05d}.parquet')
+        self._writer = pq.ParquetWriter(path, self.schema, compression=self.compression)
+        self._rows_in_shard = 0
+        self.shards.append(path)
+
+    def write(self, columns):
+        """Append a dict of equal-length column lists"""
+        batch = pa.RecordBatch.from_pydict(columns, schema=self.schema)
+        offset = 0
+        while offset < batch.num_rows:
+            if self._writer is None or self._rows_in_shard >= self.shard_rows:
+                self.close()
+                self._open_shard()
+            take = min(batch.num_rows - offset, self.shard_rows - self._rows_in_shard)
+            self._writer.write_batch(batch.slice(offset, take))
+            self._rows_in_shard += take
+            self.rows += take
+            offset += take
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+def export_parquet(session, output_dir, shard_rows=EXPORT_SHARD_ROWS, batch_rows=EXPORT_BATCH_ROWS, compression=EXPORT_COMPRESSION,
+                   tags=None, difficulty=None):
+    """Stream questions joined with their solutions into sharded Parquet files
+
+    Rows are pulled from the database `batch_rows` at a time with yield_per
+    and written straight to the current shard, so memory stays bounded by
+    one batch whatever the dataset size. `tags` and `difficulty` restrict
+    the export to a subset of questions, see filter_questions.
+
+    Returns:
+        tuple: (rows written, list of shard paths)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    names = EXPORT_SCHEMA.names
+
+    query = (
+        session.query(*EXPORT_COLUMNS)
+        .join(Solution, Solution.question_id == Question.id)
+        .outerjoin(ParsedSolution, ParsedSolution.solution_id == Solution.id)
+    )
+    query = filter_questions(query, tags, difficulty).order_by(Solution.id).yield_per(batch_rows)
+
+    writer = ShardedParquetWriter(output_dir, EXPORT_SCHEMA, shard_rows, compression)
+    try:
+        columns = {name: [] for name in names}
+        for row in query:
+            for name, value in zip(names, row):
+                columns[name].append(value)
+            if len(columns['solution_id']) >= batch_rows:
+                writer.write(columns)
+                columns = {name: [] for name in names}
+        if columns['solution_id']:
+            writer.write(columns)
+    finally:
+        writer.close()
+
+    return writer.rows, writer.shards
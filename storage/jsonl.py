@@ -0,0 +1,108 @@
+import contextlib
+import gzip
+import json
+import os
+
+# File suffix for each supported compression
+JSONL_SUFFIXES = {
+    None: '.jsonl',
+    'gzip': '.jsonl.gz',
+    'zstd': '.jsonl.zst',
+}
+
+def _compressor(compression):
+    if compression is None:
+        return lambda data: data
+    if compression == 'gzip':
+        return gzip.compress
+    if compression == 'zstd':
+        import zstandard
+        return zstandard.ZstdCompressor().compress
+    raise ValueError(f"Unknown compression: {compression}")
+
+def is_jsonl(path):
+    return path.endswith(tuple(JSONL_SUFFIXES.values()))
+
+class JsonlWriter:
+    """Append records to a newline-delimited JSON file, one line per record
+
+    Every record is flushed as soon as it is written. With compression each
+    record becomes its own gzip member or zstd frame, so the file stays
+    valid after a crash and later runs can keep appending to it.
+    """
+
+    def __init__(self, path, compression=None):
+        self.path = path
+        self._compress = _compressor(compression)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._file = open(path, 'ab')
+
+    def write(self, record):
+        self._file.write(self._compress((json.dumps(record) + '\n').encode('utf-8')))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def _zstd_lines(path, chunk_size=1 << 16):
+    """Yield the lines of a file of zstd frames, raising ZstdError if the last frame is incomplete
+
+    A streaming reader would silently stop at a cut-off frame, hiding the
+    lost record.
+    """
+    import zstandard
+
+    decompressor = zstandard.ZstdDecompressor()
+    with open(path, 'rb') as f:
+        frame = decompressor.decompressobj()
+        in_frame = False
+        pending = b''
+        while chunk := f.read(chunk_size):
+            while chunk:
+                pending += frame.decompress(chunk)
+                in_frame = not frame.eof
+                chunk = frame.unused_data if frame.eof else b''
+                if frame.eof:
+                    frame = decompressor.decompressobj()
+            *lines, pending = pending.split(b'\n')
+            for line in lines:
+                yield line + b'\n'
+        if in_frame:
+            raise zstandard.ZstdError(f"incomplete frame at the end of {path}")
+        if pending:
+            yield pending
+
+def _open_lines(path):
+    """Open a possibly compressed JSONL file, returning (lines, truncation errors)"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb'), (EOFError,)
+    if path.endswith('.zst'):
+        import zstandard
+        return contextlib.closing(_zstd_lines(path)), (zstandard.ZstdError,)
+    return open(path, 'rb'), ()
+
+def iter_jsonl(path):
+    """Yield records from a JSONL file one line at a time
+
+    A record cut short by a crash can only be the last one in the file; it
+    is reported and skipped.
+    """
+    opened, truncation_errors = _open_lines(path)
+    with opened as lines:
+        try:
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Skipping truncated record at the end of {path}")
+                    return
+        except truncation_errors:
+            print(f"Skipping truncated record at the end of {path}")
@@ -0,0 +1,12 @@
+import pytest
+from database.db import make_engine
+from database.migrations import migrate
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """A scratch SQLite database with every migration applied"""
+    engine = make_engine(f"sqlite:///{tmp_path / 'leetcode.db'}")
+    list(migrate(engine))
+    yield engine
+    engine.dispose()
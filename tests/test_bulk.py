@@ -0,0 +1,66 @@
+from sqlalchemy.orm import Session
+from database.bulk import bulk_store_questions
+from database.models import Question, Solution
+from leetcode.dedup import content_hash
+
+
+def record(slug, title, solutions=(), **question):
+    return {
+        'question': {'title': title, 'title_slug': slug, 'difficulty': 'Easy', **question},
+        'solutions': [
+            {'topic_id': topic_id, 'summary': f'Summary {topic_id}', 'content': content, 'author_name': 'alice',
+             'created_at': '2024-01-01', 'updated_at': '2024-01-01'}
+            for topic_id, content in solutions
+        ]
+    }
+
+
+def test_questions_and_solutions_are_upserted_by_slug_and_topic_id(engine):
+    with Session(engine) as session:
+        stored = bulk_store_questions(session, [
+            record('two-sum', 'Two Sum', [('1', 'Use a hash map.'), ('2', 'Sort first.')]),
+            record('add-two-numbers', 'Add Two Numbers', [('3', 'Walk both lists.')]),
+        ])
+        session.commit()
+        assert stored == (2, 3)
+        ids = dict(session.query(Solution.topic_id, Solution.id))
+
+        # A chunk size of one makes every record its own round trip
+        stored = bulk_store_questions(session, [
+            record('two-sum', 'Two Sum', [('1', 'Use a hash map.'), ('2', 'Sort, then two pointers.')],
+                   difficulty='Medium'),
+            record('add-two-numbers', 'Add Two Numbers', [('3', 'Walk both lists.')]),
+            record('two-sum', 'Two Sum', [('4', 'Brute force.')], difficulty='Hard'),
+        ], chunk_size=1)
+        session.commit()
+        assert stored == (3, 4)
+
+        assert session.query(Question).count() == 2
+        assert session.query(Question).filter_by(title_slug='two-sum').one().difficulty == 'Hard'
+        solutions = {sol.topic_id: sol for sol in session.query(Solution)}
+        assert len(solutions) == 4
+        # Existing rows keep their ids, changed or not
+        assert {topic_id: solutions[topic_id].id for topic_id in ids} == ids
+        assert solutions['1'].content == 'Use a hash map.'
+        assert solutions['2'].content == 'Sort, then two pointers.'
+        assert solutions['2'].content_hash == content_hash('Sort, then two pointers.')
+
+
+def test_later_records_for_a_slug_win_within_a_chunk(engine):
+    with Session(engine) as session:
+        stored = bulk_store_questions(session, [
+            record('two-sum', 'Two Sum', [('1', 'First.')]),
+            record('two-sum', 'Two Sum', [('1', 'Second.')], difficulty='Medium'),
+        ])
+        session.commit()
+        assert stored == (1, 1)
+        assert session.query(Question).one().difficulty == 'Medium'
+        assert session.query(Solution).one().content == 'Second.'
+
+
+def test_solutions_without_topic_id_are_always_inserted(engine):
+    with Session(engine) as session:
+        for _ in range(2):
+            bulk_store_questions(session, [record('two-sum', 'Two Sum', [(None, 'Legacy batch file.')])])
+        session.commit()
+        assert session.query(Solution).count() == 2
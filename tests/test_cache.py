@@ -0,0 +1,69 @@
+import pytest
+from leetcode.cache import CacheMiss, ResponseCache
+
+QUERY = 'query questionList($skip: Int) { questionList(skip: $skip) { total } }'
+
+
+def stored_size(cache):
+    return cache._connect().execute('SELECT total(size) FROM responses').fetchone()[0]
+
+
+def test_replacing_an_entry_keeps_the_size_exact(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put(QUERY, {'skip': 0}, {'data': {'total': 1}})
+    cache.put(QUERY, {'skip': 0}, {'data': {'total': 'x' * 100}})
+    cache.put(QUERY, {'skip': 100}, {'data': {'total': 2}})
+    assert cache._size == stored_size(cache)
+
+
+def test_worker_counts_add_up(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put(QUERY, {'skip': 0}, {'data': {'total': 1}})
+    assert cache.get(QUERY, {'skip': 0}) == {'data': {'total': 1}}
+    assert cache.get(QUERY, {'skip': 100}) is None
+    cache.add_counts(3, 1)
+    assert cache.counts() == (4, 2)
+    assert cache.stats() == 'HTTP cache: 4 hits, 2 misses (67% hit rate)'
+
+
+def age(cache, seconds):
+    """Make every entry look stored and last used `seconds` earlier"""
+    cache._connect().execute('UPDATE responses SET stored_at = stored_at - ?, accessed_at = accessed_at - ?',
+                             (seconds, seconds))
+
+
+def test_entries_expire_after_the_ttl_of_their_operation(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttls={'questionList': 60})
+    cache.put(QUERY, {'skip': 0}, {'data': {'total': 1}})
+    age(cache, 30)
+    assert cache.get(QUERY, {'skip': 0}) == {'data': {'total': 1}}
+    age(cache, 60)
+    assert cache.get(QUERY, {'skip': 0}) is None
+    assert cache.counts() == (1, 1)
+
+
+def test_eviction_keeps_the_most_recently_used_entries(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    for skip in range(4):
+        cache.put(QUERY, {'skip': skip}, {'data': {'total': skip}})
+        age(cache, 1)
+    # Reading the oldest entry makes it the most recently used
+    cache.get(QUERY, {'skip': 0})
+    cache.max_bytes = stored_size(cache) // 2
+    cache.evict()
+    assert cache._size == stored_size(cache) <= cache.max_bytes * 0.9
+    assert cache.get(QUERY, {'skip': 0}) == {'data': {'total': 0}}
+    assert cache.get(QUERY, {'skip': 1}) is None
+
+
+def test_offline_mode_serves_expired_entries_and_raises_on_misses(tmp_path):
+    ResponseCache(str(tmp_path)).put(QUERY, {'skip': 0}, {'data': {'total': 1}})
+    cache = ResponseCache(str(tmp_path), ttls={'questionList': 60}, offline=True)
+    age(cache, 3600)
+    assert cache.get(QUERY, {'skip': 0}) == {'data': {'total': 1}}
+    with pytest.raises(CacheMiss, match='questionList'):
+        cache.get(QUERY, {'skip': 100})
+    # Nothing new is written while offline
+    cache.put(QUERY, {'skip': 100}, {'data': {'total': 2}})
+    assert cache._connect().execute('SELECT count(*) FROM responses').fetchone()[0] == 1
+    assert cache.counts() == (1, 1)
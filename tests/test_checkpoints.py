@@ -0,0 +1,50 @@
+from sqlalchemy.orm import Session
+from database.checkpoints import (
+    completed_slugs, known_solution_versions, known_content_hashes, select_changed, mark_question_done
+)
+from leetcode.crawl import fetch_question_solutions
+
+
+class SolutionClient:
+    """Lists fixed solution nodes and records which details were asked for"""
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.fetched = []
+
+    def list_python_solutions(self, slug):
+        return self.nodes
+
+    def get_solution_details(self, topic_ids):
+        self.fetched.extend(topic_ids)
+        return [{'topic_id': str(topic_id)} for topic_id in topic_ids]
+
+
+def test_select_changed_keeps_new_and_updated_solutions():
+    nodes = [{'topicId': 1, 'updatedAt': 'a'}, {'topicId': 2, 'updatedAt': 'b'}, {'topicId': 3, 'updatedAt': 'c'}]
+    # The ledger keys topic ids as strings, the listing returns integers
+    assert select_changed(nodes, {'1': 'a', '2': 'old'}) == nodes[1:]
+    assert select_changed(nodes, {}) == nodes
+
+
+def test_the_ledger_skips_finished_questions_and_unchanged_solutions(engine):
+    with Session(engine) as session:
+        mark_question_done(session, 'two-sum', [{'topic_id': '1', 'updated_at': 'a', 'content_hash': 'h1'}],
+                           [{'topic_id': '2', 'updated_at': 'b', 'duplicate_of': '1', 'reason': 'exact'}])
+        session.commit()
+        assert completed_slugs(session, ['two-sum', 'add-two-numbers']) == {'two-sum'}
+        versions = known_solution_versions(session)
+        assert versions == {'two-sum': {'1': 'a', '2': 'b'}}
+        # Duplicates are remembered but never offered as the copy to keep
+        assert known_content_hashes(session) == {'two-sum': {'h1': '1'}}
+
+        client = SolutionClient([{'topicId': 1, 'updatedAt': 'a'}, {'topicId': 2, 'updatedAt': 'b'},
+                                 {'topicId': 3, 'updatedAt': 'c'}])
+        fetch_question_solutions(client, {'titleSlug': 'two-sum'}, versions['two-sum'], incremental=True)
+        assert client.fetched == [3]
+
+        # A later crawl updates the ledger in place
+        mark_question_done(session, 'two-sum', [{'topic_id': '1', 'updated_at': 'a2', 'content_hash': 'h2'}])
+        session.commit()
+        assert known_solution_versions(session, ['two-sum']) == {'two-sum': {'1': 'a2', '2': 'b'}}
+        assert known_content_hashes(session, ['two-sum']) == {'two-sum': {'h2': '1'}}
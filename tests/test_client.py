@@ -0,0 +1,22 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import pytest
+from leetcode.client import retry_delay
+from config import HTTP_BACKOFF_MAX, HTTP_RETRY_AFTER_MAX
+
+
+@pytest.mark.parametrize('retry_after, delay', [('2', 2.0), ('-5', 0.0), ('86400', HTTP_RETRY_AFTER_MAX)])
+def test_retry_after_seconds_are_honored_up_to_the_cap(retry_after, delay):
+    assert retry_delay(0, retry_after) == delay
+
+
+def test_retry_after_dates_are_capped_too():
+    far = format_datetime(datetime.now(timezone.utc) + timedelta(days=1), usegmt=True)
+    assert retry_delay(0, far) == HTTP_RETRY_AFTER_MAX
+    past = format_datetime(datetime.now(timezone.utc) - timedelta(minutes=1), usegmt=True)
+    assert retry_delay(0, past) == 0.0
+
+
+def test_unparseable_retry_after_falls_back_to_backoff():
+    for attempt in range(10):
+        assert 0 <= retry_delay(attempt, 'soon') <= HTTP_BACKOFF_MAX
@@ -0,0 +1,84 @@
+import random
+import pytest
+import zstandard
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from database.compression import ContentCodec, compact, content_codec, train_dictionary
+from database.models import Question, Solution
+
+WORDS = ['array', 'hash', 'map', 'two', 'pointers', 'window', 'sliding', 'stack', 'queue', 'heap', 'return',
+         'for', 'in', 'range', 'len', 'nums', 'target', 'left', 'right', 'while', 'if', 'else', 'self']
+
+
+@pytest.fixture
+def codec_state(monkeypatch):
+    """Undo the dictionaries a test registers on the shared codec"""
+    monkeypatch.setattr(content_codec, '_dictionaries', dict(content_codec._dictionaries))
+    monkeypatch.setattr(content_codec, '_current', content_codec._current)
+
+
+def solution_text(rng):
+    lines = [' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 12))) for _ in range(rng.randint(5, 15))]
+    return '```python\n' + '\n'.join(lines) + '\n```'
+
+
+def add_solutions(session, question_id, rng, count):
+    solutions = [Solution(question_id=question_id, summary='Summary', content=solution_text(rng)) for _ in range(count)]
+    session.add_all(solutions)
+    session.commit()
+    return {solution.id: solution.content for solution in solutions}
+
+
+def stored_dict_ids(session):
+    return {zstandard.get_frame_parameters(content).dict_id
+            for content, in session.execute(text('SELECT content FROM solutions'))}
+
+
+def test_content_round_trips_across_dictionary_changes(engine, codec_state):
+    rng = random.Random(0)
+    with Session(engine) as session:
+        question = Question(title='Two Sum', title_slug='two-sum', difficulty='Easy')
+        session.add(question)
+        session.commit()
+
+        expected = add_solutions(session, question.id, rng, 250)
+        assert stored_dict_ids(session) == {0}
+
+        first, rewritten = compact(engine)
+        assert rewritten == 250
+        assert stored_dict_ids(session) == {first}
+        expected.update(add_solutions(session, question.id, rng, 10))
+
+        # A retrained dictionary is used for new rows only
+        with engine.begin() as connection:
+            second = train_dictionary(connection)
+        assert second not in (None, first)
+        expected.update(add_solutions(session, question.id, rng, 10))
+        assert stored_dict_ids(session) == {first, second}
+
+        session.expunge_all()
+        assert dict(session.query(Solution.id, Solution.content)) == expected
+        assert dict(session.execute(text('SELECT id, lc_decompress(content) FROM solutions')).all()) == expected
+
+        third, rewritten = compact(engine)
+        assert rewritten == 270
+        assert stored_dict_ids(session) == {third}
+        assert dict(session.query(Solution.id, Solution.content)) == expected
+
+
+def test_a_new_process_reads_rows_with_the_stored_dictionaries(engine, codec_state):
+    rng = random.Random(1)
+    with Session(engine) as session:
+        question = Question(title='Two Sum', title_slug='two-sum', difficulty='Easy')
+        session.add(question)
+        session.commit()
+        add_solutions(session, question.id, rng, 250)
+        compact(engine)
+        rows = session.execute(text('SELECT content FROM solutions')).all()
+
+    codec = ContentCodec()
+    with engine.connect() as connection:
+        codec.load(connection.connection.dbapi_connection)
+    assert [codec.decompress(content) for content, in rows] == [content_codec.decompress(content) for content, in rows]
+    with pytest.raises(ValueError, match='unknown compression dictionary'):
+        ContentCodec().decompress(rows[0][0])
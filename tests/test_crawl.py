@@ -0,0 +1,26 @@
+import pytest
+from leetcode.crawl import list_questions
+
+
+class CatalogClient:
+    """Serves a catalog of `size` questions and records the page limits asked for"""
+
+    def __init__(self, size):
+        self.catalog = [{'titleSlug': f'question-{i}'} for i in range(size)]
+        self.limits = []
+
+    def get_questions(self, limit, skip):
+        self.limits.append(limit)
+        return self.catalog[skip:skip + limit]
+
+    def get_question_page(self, limit, skip):
+        return {'total': len(self.catalog), 'questions': self.get_questions(limit, skip)}
+
+
+@pytest.mark.parametrize('total_questions, listed', [(None, 25), (0, 0), (7, 7), (100, 25)])
+def test_list_questions_stops_at_the_requested_count(total_questions, listed):
+    client = CatalogClient(25)
+    catalog_size, questions = list_questions(client, total_questions, page_size=10)
+    assert catalog_size == 25
+    assert len(questions) == listed
+    assert all(limit <= 10 for limit in client.limits)
@@ -0,0 +1,44 @@
+from leetcode.dedup import Deduplicator, DedupStats, content_hash
+
+SOLUTION = ('Keep a hash map from each value to its index. For every number look up the complement '
+            'target minus number, and return both indices as soon as it has been seen before.')
+
+
+def solution(topic_id, content):
+    return {'topic_id': topic_id, 'updated_at': '2024-01-01', 'content': content}
+
+
+def test_exact_copies_differing_in_whitespace_or_case_are_dropped():
+    kept, duplicates = Deduplicator().filter([
+        solution('1', SOLUTION),
+        solution('2', SOLUTION.upper().replace(' ', '  \\n')),
+    ])
+    assert [sol['topic_id'] for sol in kept] == ['1']
+    assert kept[0]['content_hash'] == content_hash(SOLUTION)
+    assert duplicates == [{'topic_id': '2', 'updated_at': '2024-01-01', 'duplicate_of': '1', 'reason': 'exact'}]
+
+
+def test_near_copies_point_at_the_first_kept_solution():
+    kept, duplicates = Deduplicator().filter([
+        solution('1', SOLUTION),
+        solution('2', SOLUTION + ' Done.'),
+        solution('3', 'Sort the array and walk two pointers towards each other until they meet the target.'),
+    ])
+    assert [sol['topic_id'] for sol in kept] == ['1', '3']
+    assert [(dup['topic_id'], dup['duplicate_of'], dup['reason']) for dup in duplicates] == [('2', '1', 'near')]
+
+
+def test_known_hashes_catch_copies_of_earlier_crawls_but_not_the_solution_itself():
+    known_hashes = {content_hash(SOLUTION): '1'}
+    kept, duplicates = Deduplicator().filter([solution('1', SOLUTION), solution('2', SOLUTION)], known_hashes)
+    assert [sol['topic_id'] for sol in kept] == ['1']
+    assert [(dup['topic_id'], dup['duplicate_of'], dup['reason']) for dup in duplicates] == [('2', '1', 'exact')]
+    # The caller's mapping is left alone
+    assert known_hashes == {content_hash(SOLUTION): '1'}
+
+
+def test_stats_report_the_share_of_duplicates():
+    stats = DedupStats()
+    kept, duplicates = Deduplicator().filter([solution('1', SOLUTION), solution('2', SOLUTION)])
+    stats.add({'solutions': kept, 'duplicates': duplicates})
+    assert stats.report() == 'Deduplicated 1 of 2 solutions (50.0%): 1 exact, 0 near-duplicate'
@@ -0,0 +1,27 @@
+import os
+import pytest
+from storage.jsonl import JSONL_SUFFIXES, JsonlWriter, iter_jsonl
+
+RECORDS = [{'question': {'title_slug': f'question-{i}'}, 'solutions': [{'content': 'x' * 200}]} for i in range(3)]
+
+
+@pytest.mark.parametrize('compression', list(JSONL_SUFFIXES))
+def test_appended_files_read_back(tmp_path, compression):
+    path = str(tmp_path / f'questions{JSONL_SUFFIXES[compression]}')
+    # A second writer appends, as a rerun of the crawl does
+    for records in (RECORDS[:2], RECORDS[2:]):
+        with JsonlWriter(path, compression) as writer:
+            for record in records:
+                writer.write(record)
+    assert list(iter_jsonl(path)) == RECORDS
+
+
+@pytest.mark.parametrize('compression', list(JSONL_SUFFIXES))
+def test_a_record_cut_short_by_a_crash_is_skipped(tmp_path, compression, capsys):
+    path = str(tmp_path / f'questions{JSONL_SUFFIXES[compression]}')
+    with JsonlWriter(path, compression) as writer:
+        for record in RECORDS:
+            writer.write(record)
+    os.truncate(path, os.path.getsize(path) - 20)
+    assert list(iter_jsonl(path)) == RECORDS[:2]
+    assert 'Skipping truncated record' in capsys.readouterr().out
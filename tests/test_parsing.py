@@ -0,0 +1,49 @@
+from sqlalchemy.orm import Session
+from database.bulk import bulk_store_questions
+from database.models import Question, Solution, ParsedSolution
+from database.parsing import parse_solutions
+
+CONTENT = 'Use a set.\n```python\nclass Solution:\n    pass\n```'
+
+
+def test_only_changed_content_is_parsed_again(engine):
+    with Session(engine) as session:
+        question = Question(title='Two Sum', title_slug='two-sum', difficulty='Easy')
+        session.add(question)
+        session.flush()
+        session.add_all([Solution(question_id=question.id, summary=f'Set {i}', content=CONTENT) for i in range(3)])
+        session.commit()
+
+        assert parse_solutions(session, num_proc=1) == 3
+        assert parse_solutions(session, num_proc=1) == 0
+
+        # Whitespace-only edits keep the dedup hash but still change the code
+        solution = session.query(Solution).first()
+        solution.content = CONTENT.replace('    pass', '        pass')
+        session.commit()
+        assert parse_solutions(session, num_proc=1) == 1
+        parsed = session.get(ParsedSolution, solution.id)
+        assert parsed.code == 'class Solution:\n        pass'
+        assert parse_solutions(session, num_proc=1) == 0
+
+
+def test_bulk_stores_are_parsed_again_only_when_the_content_changes(engine):
+    def records(content):
+        return [{'question': {'title': 'Two Sum', 'title_slug': 'two-sum', 'difficulty': 'Easy'},
+                 'solutions': [{'topic_id': '1', 'summary': 'Set', 'content': content, 'author_name': 'alice',
+                                'created_at': '2024-01-01', 'updated_at': '2024-01-01'}]}]
+
+    with Session(engine) as session:
+        bulk_store_questions(session, records(CONTENT))
+        session.commit()
+        assert parse_solutions(session, num_proc=1) == 1
+
+        # Re-crawling the same content leaves the parse alone
+        bulk_store_questions(session, records(CONTENT))
+        session.commit()
+        assert parse_solutions(session, num_proc=1) == 0
+
+        bulk_store_questions(session, records(CONTENT.replace('set', 'dict')))
+        session.commit()
+        assert parse_solutions(session, num_proc=1) == 1
+        assert session.query(ParsedSolution).one().explanation == 'Use a dict.'
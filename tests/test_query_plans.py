@@ -0,0 +1,12 @@
+from sqlalchemy import text
+from database.plans import check_query_plans
+
+
+def test_hot_queries_use_their_indexes(engine):
+    assert check_query_plans(engine) == []
+
+
+def test_missing_index_is_reported(engine):
+    with engine.begin() as connection:
+        connection.execute(text('DROP INDEX ix_attempts_attempted_at'))
+    assert [name for name, _, _ in check_query_plans(engine)] == ['recent attempts']
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy.orm import Session
+from database.models import Attempt, DifficultyRating, Question, ReviewState
+from database.reviews import due_reviews, record_review
+
+START = datetime(2024, 1, 1, 9)
+
+
+def test_record_review_carries_the_state_between_attempts(engine):
+    with Session(engine) as session:
+        question = Question(title='Two Sum', title_slug='two-sum', difficulty='Easy')
+        session.add(question)
+        session.flush()
+
+        first = record_review(session, question.id, DifficultyRating.EASY, now=START)
+        session.commit()
+        state = session.get(ReviewState, question.id)
+        assert (state.attempt_count, state.repetition_number, state.interval) == (1, 1, 1)
+        assert state.next_review_at == first.next_review_at == START + timedelta(days=1)
+
+        # The second attempt continues from the stored state, not the defaults
+        second = record_review(session, question.id, DifficultyRating.EASY, now=START + timedelta(days=1))
+        session.commit()
+        assert (second.repetition_number, second.interval) == (2, 6)
+        # Each easy rating lowers the easiness factor by 0.14 from where the last left it
+        assert second.easiness_factor == pytest.approx(first.easiness_factor - 0.14)
+        state = session.get(ReviewState, question.id)
+        assert (state.attempt_count, state.repetition_number, state.interval) == (2, 2, 6)
+        assert state.easiness_factor == second.easiness_factor
+        assert state.last_rating == DifficultyRating.EASY
+        assert state.last_reviewed_at == START + timedelta(days=1)
+        assert state.next_review_at == START + timedelta(days=7)
+
+        # A hard attempt starts the repetitions over
+        record_review(session, question.id, DifficultyRating.HARD, now=START + timedelta(days=7))
+        session.commit()
+        assert (state.attempt_count, state.repetition_number, state.interval) == (3, 0, 1)
+        assert session.query(Attempt).count() == 3
+
+
+def test_due_reviews_follow_the_review_state(engine):
+    with Session(engine) as session:
+        questions = [Question(title=slug, title_slug=slug, difficulty='Easy') for slug in ('a', 'b')]
+        session.add_all(questions)
+        session.flush()
+        record_review(session, questions[0].id, DifficultyRating.EASY, now=START)
+        record_review(session, questions[1].id, DifficultyRating.HARD, now=START - timedelta(days=1))
+        session.commit()
+
+        assert [question.title_slug for question, _ in due_reviews(session, now=START - timedelta(hours=1))] == []
+        assert [question.title_slug for question, _ in due_reviews(session, now=START)] == ['b']
+        due = due_reviews(session, now=START + timedelta(days=1))
+        assert [question.title_slug for question, _ in due] == ['b', 'a']
+        assert [question.title_slug for question, _ in due_reviews(session, now=START + timedelta(days=1), limit=1)] == ['b']
@@ -0,0 +1,56 @@
+from datetime import datetime
+import numpy as np
+import pytest
+from database.scheduler import (
+    DeckState, apply_reviews, read_review_csv, review_states, schedule_scalar, simulate_load, synthetic_reviews
+)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_apply_reviews_matches_calculate_next_review(seed):
+    # About 50 reviews per question, so long streaks reach large intervals
+    question_ids, qualities, reviewed_at = synthetic_reviews(5000, 100, seed)
+    expected = schedule_scalar(question_ids, qualities, reviewed_at)
+    reviews = apply_reviews(DeckState.empty(), question_ids, qualities, reviewed_at)
+    assert review_states(reviews) == expected
+
+
+def test_apply_reviews_resumes_the_deck():
+    question_ids, qualities, reviewed_at = synthetic_reviews(2000, 50, 3)
+    expected = schedule_scalar(question_ids, qualities, reviewed_at)
+
+    # The same reviews split at a point in time, the second batch resuming the deck
+    deck = DeckState.empty()
+    early = reviewed_at < np.sort(reviewed_at)[len(reviewed_at) // 2]
+    apply_reviews(deck, question_ids[early], qualities[early], reviewed_at[early])
+    reviews = apply_reviews(deck, question_ids[~early], qualities[~early], reviewed_at[~early])
+
+    in_scalar_order = early[np.lexsort((reviewed_at, question_ids))]
+    assert review_states(reviews) == [state for state, is_early in zip(expected, in_scalar_order) if not is_early]
+
+
+def test_read_review_csv_converts_offsets_to_utc(tmp_path):
+    path = tmp_path / 'reviews.csv'
+    path.write_text(
+        'question_id,difficulty,reviewed_at\n'
+        '1,easy,2024-01-01T10:00:00\n'
+        '2,Hard,2024-01-01T10:00:00+02:00\n'
+        '3,MEDIUM,2024-01-01T10:00:00Z\n'
+    )
+    question_ids, qualities, reviewed_at = read_review_csv(path)
+    assert question_ids.tolist() == [1, 2, 3]
+    assert qualities.tolist() == [3, 1, 2]
+    assert reviewed_at.astype(str).tolist() == [
+        '2024-01-01T10:00:00.000000', '2024-01-01T08:00:00.000000', '2024-01-01T10:00:00.000000'
+    ]
+
+
+def test_simulate_load_counts_calendar_days():
+    # After a 22:00 start: overdue, due at 23:30 the same day and due at 00:30 the next day
+    deck = DeckState([1, 2, 3], [2.5] * 3, [1] * 3, [1] * 3, np.array(
+        ['2023-12-31T12:00', '2024-01-01T23:30', '2024-01-02T00:30'], dtype='datetime64[us]'))
+    load = simulate_load(deck, 2, [3], [1.0], start=datetime(2024, 1, 1, 22))
+    assert load.tolist() == [2, 1]
+    assert simulate_load(deck, 0, [3], [1.0], start=datetime(2024, 1, 1, 22)).tolist() == []
+    with pytest.raises(ValueError, match='negative'):
+        simulate_load(deck, -1, [3], [1.0])
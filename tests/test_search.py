@@ -0,0 +1,24 @@
+from sqlalchemy.orm import Session
+from database.models import Question, Solution
+from database.search import search_solutions
+
+ESCAPED = '# Approach\\nUse a stack.\\n```python\\nclass Solution:\\n    pass\\n```'
+
+
+def test_escaped_content_is_searchable(engine):
+    with Session(engine) as session:
+        question = Question(title='Valid Parentheses', title_slug='valid-parentheses', difficulty='Easy')
+        session.add(question)
+        session.flush()
+        session.add(Solution(question_id=question.id, summary='Stack', content=ESCAPED))
+        session.commit()
+
+        results = search_solutions(session, 'class')
+        assert [result['title'] for result in results] == ['Valid Parentheses']
+        assert '\\n' not in results[0]['snippet']
+        assert search_solutions(session, 'nclass') == []
+
+        solution = session.query(Solution).one()
+        solution.content = ESCAPED.replace('stack', 'queue')
+        session.commit()
+        assert [result['title'] for result in search_solutions(session, 'queue')] == ['Valid Parentheses']
@@ -0,0 +1,60 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from database.models import Question, Tag, question_tags
+from database.tags import filter_questions, store_question_tags
+
+ARRAY = {'name': 'Array', 'slug': 'array'}
+HASH_TABLE = {'name': 'Hash Table', 'slug': 'hash-table'}
+GRAPH = {'name': 'Graph', 'slug': 'graph'}
+
+
+def add_questions(session):
+    questions = {
+        slug: Question(title=slug.title(), title_slug=slug, difficulty=difficulty)
+        for slug, difficulty in [('two-sum', 'Easy'), ('three-sum', 'Medium'), ('course-schedule', 'Medium')]
+    }
+    session.add_all(questions.values())
+    session.flush()
+    return {slug: question.id for slug, question in questions.items()}
+
+
+def tag_links(session):
+    return sorted(session.execute(select(question_tags.c.question_id, question_tags.c.tag_id)).all())
+
+
+def test_tags_are_replaced_per_question_and_shared_by_slug(engine):
+    with Session(engine) as session:
+        ids = add_questions(session)
+        store_question_tags(session, {ids['two-sum']: [ARRAY, HASH_TABLE], ids['three-sum']: [ARRAY]})
+        store_question_tags(session, {ids['two-sum']: [HASH_TABLE], ids['course-schedule']: [GRAPH, GRAPH]})
+        session.commit()
+
+        tag_ids = dict(session.query(Tag.slug, Tag.id))
+        assert sorted(tag_ids) == ['array', 'graph', 'hash-table']
+        assert tag_links(session) == sorted([
+            (ids['two-sum'], tag_ids['hash-table']),
+            (ids['three-sum'], tag_ids['array']),
+            (ids['course-schedule'], tag_ids['graph']),
+        ])
+
+        store_question_tags(session, {ids['three-sum']: []})
+        session.commit()
+        assert (ids['three-sum'], tag_ids['array']) not in tag_links(session)
+
+
+def test_filter_questions_by_tags_and_difficulty(engine):
+    with Session(engine) as session:
+        ids = add_questions(session)
+        store_question_tags(session, {ids['two-sum']: [ARRAY, HASH_TABLE], ids['three-sum']: [ARRAY],
+                                      ids['course-schedule']: [GRAPH]})
+        session.commit()
+
+        def slugs(**filters):
+            return sorted(slug for slug, in filter_questions(session.query(Question.title_slug), **filters))
+
+        assert slugs() == ['course-schedule', 'three-sum', 'two-sum']
+        # A question carrying several of the tags comes back once
+        assert slugs(tags=['array', 'hash-table']) == ['three-sum', 'two-sum']
+        assert slugs(difficulty='Medium') == ['course-schedule', 'three-sum']
+        assert slugs(tags=['array'], difficulty='Medium') == ['three-sum']
+        assert slugs(tags=['unknown']) == []
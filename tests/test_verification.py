@@ -0,0 +1,37 @@
+from sqlalchemy.orm import Session
+from database.models import Question, Solution, SolutionRun
+from database.parsing import parse_solutions
+from database.verification import verify_solutions, run_statuses
+
+CONTENT = 'Use a set.\n```python\nclass Solution:\n    pass\n```'
+
+
+def test_only_changed_code_is_run_again(engine):
+    with Session(engine) as session:
+        question = Question(title='Two Sum', title_slug='two-sum', difficulty='Easy')
+        session.add(question)
+        session.flush()
+        session.add_all([
+            Solution(question_id=question.id, summary='Set', content=CONTENT),
+            Solution(question_id=question.id, summary='Broken', content='```python\nraise ValueError\n```'),
+            Solution(question_id=question.id, summary='Prose', content='No code here'),
+        ])
+        session.commit()
+
+        parse_solutions(session, num_proc=1)
+        assert verify_solutions(session, num_proc=1) == 3
+        assert run_statuses(session) == {'ok': 1, 'error': 1, 'no_code': 1}
+        assert verify_solutions(session, num_proc=1) == 0
+
+        # A new explanation is parsed again, but the code it runs is the same
+        solution = session.query(Solution).filter_by(summary='Set').one()
+        solution.content = CONTENT.replace('Use a set.', 'Use a hash set.')
+        session.commit()
+        assert parse_solutions(session, num_proc=1) == 1
+        assert verify_solutions(session, num_proc=1) == 0
+
+        solution.content = CONTENT.replace('pass', 'x = 1 / 0')
+        session.commit()
+        assert parse_solutions(session, num_proc=1) == 1
+        assert verify_solutions(session, num_proc=1) == 1
+        assert session.get(SolutionRun, solution.id).error == 'ZeroDivisionError: division by zero'
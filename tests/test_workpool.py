@@ -0,0 +1,64 @@
+import os
+import time
+from leetcode.workpool import WorkScheduler
+
+
+def attempt(directory, name):
+    """Count an attempt at task `name` in a file, as the workers share no memory; returns the count"""
+    path = os.path.join(directory, name)
+    with open(path, 'a') as f:
+        f.write('.')
+    with open(path) as f:
+        return len(f.read())
+
+
+def flaky(task):
+    directory, name, failures = task
+    if attempt(directory, name) <= failures:
+        raise ValueError(f'{name} failed')
+    return name
+
+
+def slow_first(task):
+    directory, name, seconds = task
+    if attempt(directory, name) == 1:
+        time.sleep(seconds)
+    return name
+
+
+def crash_first(task):
+    directory, name = task
+    if name == 'crash' and attempt(directory, name) == 1:
+        # Let the other task finish first, so the broken pool holds a result
+        time.sleep(0.5)
+        os._exit(1)
+    return name
+
+
+def test_failed_tasks_are_retried_until_they_give_up(tmp_path):
+    tasks = [(str(tmp_path), 'ok', 0), (str(tmp_path), 'flaky', 2), (str(tmp_path), 'broken', 5)]
+    with WorkScheduler(flaky, 2, max_retries=2) as scheduler:
+        results = sorted(result for _, result in scheduler.run(tasks))
+    assert results == ['flaky', 'ok']
+    assert scheduler.retried == 4
+    assert [(task[1], str(error)) for task, error in scheduler.failed] == [('broken', 'broken failed')]
+
+
+def test_stragglers_get_a_backup_and_the_loser_is_not_waited_for(tmp_path):
+    start = time.monotonic()
+    with WorkScheduler(slow_first, 2, straggler_timeout=0.2) as scheduler:
+        results = [result for _, result in scheduler.run([(str(tmp_path), 'slow', 60)])]
+    assert results == ['slow']
+    assert scheduler.backups == 1
+    assert time.monotonic() - start < 30
+
+
+def test_a_broken_pool_keeps_finished_results_and_reruns_the_rest(tmp_path):
+    tasks = [(str(tmp_path), 'crash'), (str(tmp_path), 'quick')]
+    with WorkScheduler(crash_first, 2) as scheduler:
+        results = sorted(result for _, result in scheduler.run(tasks))
+    assert results == ['crash', 'quick']
+    assert scheduler.completed == 2
+    assert scheduler.failed == []
+    # Only the crashed task ran twice
+    assert attempt(str(tmp_path), 'quick') == 1